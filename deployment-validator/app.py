@@ -1,6 +1,8 @@
 import logging
 from util.args_util import load_args
 from facade.resource_validator import run_validator
+from util.load_probe import LoadProbe
+from util.timing import export_at_exit
 
 
 logger = logging.getLogger(__name__)
@@ -13,4 +15,9 @@ logging.basicConfig(
 
 if __name__ == "__main__":
     args = load_args()
-    run_validator(args.output_file, args.config_file)
\ No newline at end of file
+    if args.timings_file:
+        export_at_exit(args.timings_file)
+    load_probe = LoadProbe(args.probe_requests, args.probe_concurrency, args.slo_p95_ms, args.slo_p99_ms,
+                           args.slo_error_rate)
+    if not run_validator(args.output_file, args.config_file, args.report_file, args.wait_timeout, load_probe):
+        exit(1)
\ No newline at end of file
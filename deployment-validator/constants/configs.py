@@ -0,0 +1,28 @@
+# Settings for the shared boto3 clients in util/aws_clients.py
+AWS_MAX_POOL_CONNECTIONS = 10
+AWS_RETRY_MODE = "standard"
+AWS_MAX_ATTEMPTS = 5
+
+# Maximum number of validation checks running at the same time
+MAX_CHECK_WORKERS = 8
+
+# describe_load_balancers accepts at most this many ARNs per call
+LOAD_BALANCER_ARNS_PER_CALL = 20
+
+# Waiting for resources that are still being created (see util/waiter.py), in seconds
+WAIT_TIMEOUT = 600
+WAIT_INITIAL_DELAY = 2
+WAIT_MAX_DELAY = 30
+WAIT_BACKOFF = 2
+PING_TIMEOUT = 15
+
+# Default number of concurrent requests of the ALB load probe (see util/load_probe.py)
+PROBE_CONCURRENCY = 10
+
+# Namespace and name of the deployment installed by the k8s-primer for each ingress type
+INGRESS_CONTROLLER_DEPLOYMENTS = {
+    "aws": ("kube-system", "aws-load-balancer-controller")
+}
+
+# Seconds after which EKS tokens (see util/eks_auth.py) are generated again, EKS accepts them for 15 minutes
+EKS_TOKEN_REFRESH = 600
@@ -0,0 +1,135 @@
+# Runs validation checks as a dependency graph. k8s-primer/utils/task_graph.py has the same scheduling loop for
+# primer tasks, keep fixes to it in sync.
+import json
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, NamedTuple
+
+from constants.configs import MAX_CHECK_WORKERS
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] (deployment_validator - checks) %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+
+PASSED = "passed"
+FAILED = "failed"
+ERROR = "error"
+SKIPPED = "skipped"
+
+
+class Check(NamedTuple):
+    name: str
+    func: Callable[[], bool]
+    depends_on: tuple = ()
+
+
+class CheckResult(NamedTuple):
+    name: str
+    status: str
+    duration: float
+    message: str = None
+
+
+def run_checks(checks: list, max_workers: int = MAX_CHECK_WORKERS) -> list:
+    """
+    Runs validation checks concurrently, starting each check as soon as every check it depends on has passed.
+    Checks whose dependencies did not pass are skipped.
+    :param checks: List of Check, dependencies must refer to checks in the list
+    :param max_workers: Maximum number of checks running at the same time
+    :return: List of CheckResult, in the order of checks
+    """
+    by_name = {check.name: check for check in checks}
+    _check_graph(by_name)
+
+    results = {}
+    pending = dict(by_name)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running = {}
+        while pending or running:
+            for name, check in list(pending.items()):
+                dependency_results = [results.get(dependency) for dependency in check.depends_on]
+                not_passed = [result.name for result in dependency_results
+                              if result is not None and result.status != PASSED]
+                if not_passed:
+                    results[name] = CheckResult(name, SKIPPED, 0.0, f"Skipped, {', '.join(not_passed)} did not pass")
+                    logger.warning(f"{name} - {results[name].message}")
+                    del pending[name]
+                elif all(result is not None for result in dependency_results):
+                    running[executor.submit(_run_check, check)] = name
+                    del pending[name]
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                results[result.name] = result
+                del running[future]
+
+    return [results[check.name] for check in checks]
+
+
+def write_report(results: list, path: str, duration: float):
+    """
+    Writes the check results to a JSON report
+    :param results: List of CheckResult
+    :param path: Path of the report file
+    :param duration: Wall time of the whole run in seconds
+    """
+    report = {
+        "passed": all(result.status == PASSED for result in results),
+        "duration": round(duration, 3),
+        "checks": [
+            {"name": result.name, "status": result.status, "duration": round(result.duration, 3),
+             "message": result.message}
+            for result in results
+        ]
+    }
+    with open(path, "w") as file:
+        json.dump(report, file, indent=2)
+    logger.info(f"write_report - Wrote check report to {path}")
+
+
+def _run_check(check: Check) -> CheckResult:
+    """
+    ->Internal method<-
+    Runs a single check, turning unexpected exceptions into an error result
+    """
+    start = time.perf_counter()
+    try:
+        status = PASSED if check.func() else FAILED
+        message = None
+    except Exception as e:
+        status, message = ERROR, f"{type(e).__name__}: {e}"
+        logger.error(f"{check.name} - {message}")
+    duration = time.perf_counter() - start
+    logger.info(f"{check.name} - {status} in {duration:.3f}s")
+    return CheckResult(check.name, status, duration, message)
+
+
+def _check_graph(by_name: dict):
+    """
+    ->Internal method<-
+    Rejects dependencies on unknown checks and dependency cycles
+    """
+    for check in by_name.values():
+        unknown = [dependency for dependency in check.depends_on if dependency not in by_name]
+        if unknown:
+            raise ValueError(f"Check {check.name} depends on unknown checks {', '.join(unknown)}")
+
+    visited = set()
+
+    def visit(name: str, path: tuple):
+        if name in path:
+            raise ValueError(f"Checks depend on each other: {' -> '.join(path + (name,))}")
+        if name in visited:
+            return
+        for dependency in by_name[name].depends_on:
+            visit(dependency, path + (name,))
+        visited.add(name)
+
+    for name in by_name:
+        visit(name, ())
@@ -1,12 +1,20 @@
 # Import necessary libraries
 import os
-import boto3 as boto
 import json
 import yaml
 import logging
 import requests
-import subprocess
-from botocore.exceptions import ClientError
+import time
+import urllib3
+from botocore.exceptions import BotoCoreError, ClientError
+from kubernetes.client.rest import ApiException
+from constants.configs import INGRESS_CONTROLLER_DEPLOYMENTS, PING_TIMEOUT, WAIT_TIMEOUT
+from facade.check_runner import PASSED, Check, run_checks, write_report
+from util.k8s_connection import KubernetesConnection
+from util.load_probe import LoadProbe, run_load_probe, slo_violations
+from util.resource_snapshot import ResourceSnapshot
+from util.timing import timed
+from util.waiter import ResourceFailed, wait_until
 
 
 logger = logging.getLogger(__name__)
@@ -16,6 +24,7 @@ logging.basicConfig(
         datefmt="%Y-%m-%d %H:%M:%S"
 )
 
+@timed("load_config")
 def load_config(yaml_output: str):
     """
     Read the AWS region from the YAML file
@@ -45,44 +54,45 @@ def load_json_data(file_name: str) -> dict:
         exit(1)
 
 
-def check_vpc(vpc_id, region_name):
+@timed("check.check_vpc")
+def check_vpc(vpc_id, snapshot: ResourceSnapshot):
     """
     Check if a specified VPC exists and is available
     :param vpc_id: the VPC ID of cluster
+    :param snapshot: the resource snapshot of this run
     :return: true for successful or false for not successful
     """
     try:
-        ec2 = boto.client('ec2', region_name=region_name)
-        response = ec2.describe_vpcs(VpcIds=[vpc_id])
-
-        if len(response['Vpcs']) == 1:
-            vpc = response['Vpcs'][0]
-            if vpc['State'] == 'available':
-                logger.info(f"VPC {vpc_id} exists and is available.")
-                return True
-            else:
-                logger.warning(f"VPC {vpc_id} exists but is not available.")
-                return False
-        else:
+        vpc = snapshot.vpcs().get(vpc_id)
+        if vpc is None:
             logger.warning(f"VPC {vpc_id} does not exist.")
             return False
+        if vpc['State'] == 'available':
+            logger.info(f"VPC {vpc_id} exists and is available.")
+            return True
+        logger.warning(f"VPC {vpc_id} exists but is not available.")
+        return False
     except ClientError as e:
         logger.warning(f"An error occurred: {e}")
         return False
 
 
-def check_subnets(subnet_ids, config):
+@timed("check.check_subnets")
+def check_subnets(subnet_ids, snapshot: ResourceSnapshot):
     """
     Check if the specified subnets exist and are available
     :param subnet_ids: the subnet IDs of cluster
+    :param snapshot: the resource snapshot of this run
     :return: true for successful or false for not successful
     """
     try:
-        ec2 = boto.client('ec2', region_name=config["aws_region"])
-        response = ec2.describe_subnets(SubnetIds=subnet_ids)
-        for subnet in response['Subnets']:
-            if subnet['State'] != 'available':
-                logger.warning(f"Subnet {subnet['SubnetId']} does not exist.")
+        subnets = snapshot.subnets()
+        for subnet_id in subnet_ids:
+            if subnet_id not in subnets:
+                logger.warning(f"Subnet {subnet_id} does not exist.")
+                return False
+            if subnets[subnet_id]['State'] != 'available':
+                logger.warning(f"Subnet {subnet_id} is not available.")
                 return False
         logger.info("All subnets exist.")
         return True
@@ -91,81 +101,119 @@ def check_subnets(subnet_ids, config):
         return False
 
 
-def check_alb(alb_arn, config):
+@timed("check.check_alb")
+def check_alb(alb_arn, snapshot: ResourceSnapshot, timeout: float = WAIT_TIMEOUT):
     """
-    Check if a specified Application Load Balancer (ALB) exists and is active
+    Check if a specified Application Load Balancer (ALB) exists and is active, waiting while it is provisioning
     :param alb_arn: the ALB ARN of cluster
+    :param snapshot: the resource snapshot of this run
+    :param timeout: seconds to wait for the ALB to become active
     :return: true for successful or false for not successful
     """
+    def probe(attempt: int) -> bool:
+        load_balancer = snapshot.load_balancers(refresh=attempt > 0).get(alb_arn)
+        if load_balancer is None:
+            raise ResourceFailed(f"ALB {alb_arn} does not exist.")
+        state = load_balancer['State']['Code']
+        if state not in ('active', 'provisioning'):
+            raise ResourceFailed(f"ALB {alb_arn} is {state}.")
+        return state == 'active'
+
     try:
-        ec2 = boto.client('ec2', region_name=config["aws_region"])
-        response = ec2.describe_load_balancers(LoadBalancerArns=[alb_arn])
-        if response['LoadBalancers'][0]['State']['Code'] == 'active':
-            logger.info(f"ALB {alb_arn} exists.")
-            return True
-        else:
-            logger.warning(f"ALB {alb_arn} does not exist.")
-            return False
+        result = wait_until(f"ALB {alb_arn}", probe, timeout)
     except ClientError as e:
         logger.warning(f"An error occurred: {e}")
         return False
+    if result.ready:
+        logger.info(f"ALB {alb_arn} exists.")
+        return True
+    logger.warning(f"ALB {alb_arn} is not active - {result.message}")
+    return False
 
 
-def check_eks(cluster_name, config):
+@timed("check.check_eks")
+def check_eks(cluster_name, snapshot: ResourceSnapshot, timeout: float = WAIT_TIMEOUT):
     """
-    Check if a specified EKS cluster exists and is active
+    Check if a specified EKS cluster exists and is active, waiting while it is being created or updated
     :param cluster_name: the name of the cluster
+    :param snapshot: the resource snapshot of this run
+    :param timeout: seconds to wait for the cluster to become active
     :return: true for successful or false for not successful
     """
+    def probe(attempt: int) -> bool:
+        status = snapshot.clusters(refresh=attempt > 0)[cluster_name]['status']
+        if status not in ('ACTIVE', 'CREATING', 'UPDATING', 'PENDING'):
+            raise ResourceFailed(f"EKS cluster {cluster_name} is {status}.")
+        return status == 'ACTIVE'
+
     try:
-        eks = boto.client('eks', region_name=config["aws_region"])
-        response = eks.describe_cluster(name=cluster_name)
-        if response['cluster']['status'] == 'ACTIVE':
-            logger.info(f"EKS cluster {cluster_name} exists and is active.")
-            return True
-        else:
-            logger.warning(
-                f"EKS cluster {cluster_name} does not exist or is not active.")
-            return False
+        result = wait_until(f"EKS cluster {cluster_name}", probe, timeout)
     except ClientError as e:
         logger.warning(f"An error occurred: {e}")
         return False
+    if result.ready:
+        logger.info(f"EKS cluster {cluster_name} exists and is active.")
+        return True
+    logger.warning(f"EKS cluster {cluster_name} does not exist or is not active - {result.message}")
+    return False
 
 
-def ping_alb(alb_dns_name):
+@timed("check.ping_alb")
+def ping_alb(alb_dns_name, timeout: float = WAIT_TIMEOUT, load_probe: LoadProbe = None):
     """
-    Trigger ping checks to the ALB controller
+    Trigger ping checks to the ALB controller, retrying until DNS has propagated and the ALB answers.
+    Once it answers, the optional load probe is run against it and checked against its SLO thresholds.
     :param alb_dns_name: DNS name for the ALB Controller
+    :param timeout: seconds to wait for the ALB to answer
+    :param load_probe: optional number of concurrent requests to send and latency / error thresholds
     :return: Boolean for pass or fail
     """
-    try:
-        response = requests.get(
-            url='http://' + alb_dns_name + '/ping', timeout=(15,))
-        if response.text == 'pong':
-            logger.info(f"ALB {alb_dns_name} is responding to pings.")
-            return True
-        else:
-            logger.warning(f"ALB {alb_dns_name} is not responding to pings.")
+    url = 'http://' + alb_dns_name + '/ping'
+
+    def probe(attempt: int) -> bool:
+        try:
+            response = requests.get(url=url, timeout=PING_TIMEOUT)
+        except requests.RequestException as e:
+            logger.info(f"ALB {alb_dns_name} ping failed - {e}")
             return False
-    except ClientError as e:
-        logger.warning(f"An error occurred: {e}")
-        return False
+        return response.text == 'pong'
 
+    result = wait_until(f"ALB {alb_dns_name} ping", probe, timeout)
+    if not result.ready:
+        logger.warning(f"ALB {alb_dns_name} is not responding to pings - {result.message}")
+        return False
+    logger.info(f"ALB {alb_dns_name} is responding to pings.")
+    if not load_probe or load_probe.requests <= 0:
+        return True
 
-def check_availability_zones(private_subnets, public_subnets, config):
-    ec2 = boto.client('ec2', region_name=config["aws_region"])
+    stats = run_load_probe(url, load_probe, expected_text='pong')
+    logger.info(
+        f"ALB {alb_dns_name} load probe - {stats.requests} requests, {load_probe.concurrency} concurrent, "
+        f"{stats.throughput:.1f} req/s, {stats.error_rate:.1%} errors, "
+        f"p50 {stats.p50_ms:.1f}ms, p95 {stats.p95_ms:.1f}ms, p99 {stats.p99_ms:.1f}ms"
+    )
+    violations = slo_violations(stats, load_probe)
+    if violations:
+        logger.warning(f"ALB {alb_dns_name} misses its SLO - {', '.join(violations)}")
+        return False
+    return True
 
-    azs = set(config["availability_zones"])
-    private_azs_found = set()
-    public_azs_found = set()
 
-    for subnet_id in private_subnets:
-        subnet_az = ec2.describe_subnets(SubnetIds=[subnet_id])['Subnets'][0]['AvailabilityZone']
-        private_azs_found.add(subnet_az)
+@timed("check.check_availability_zones")
+def check_availability_zones(private_subnets, public_subnets, config, snapshot: ResourceSnapshot):
+    """
+    Check that every configured availability zone has a private and a public subnet
+    :param private_subnets: the private subnet IDs of cluster
+    :param public_subnets: the public subnet IDs of cluster
+    :param config: the config dictionary
+    :param snapshot: the resource snapshot of this run
+    :return: true for successful or false for not successful
+    """
+    subnets = snapshot.subnets()
 
-    for subnet_id in public_subnets:
-        subnet_az = ec2.describe_subnets(SubnetIds=[subnet_id])['Subnets'][0]['AvailabilityZone']
-        public_azs_found.add(subnet_az)
+    azs = set(config["availability_zones"])
+    private_azs_found = {subnets[subnet_id]['AvailabilityZone'] for subnet_id in private_subnets}
+    public_azs_found = {subnets[subnet_id]['AvailabilityZone'] for subnet_id in public_subnets}
 
     if azs == private_azs_found and azs == public_azs_found:
         logger.info("All availability zones are valid.")
@@ -175,61 +223,199 @@ def check_availability_zones(private_subnets, public_subnets, config):
         return False
 
 
-def check_k8s_connection(cluster_name, region):
+@timed("check.check_k8s_connection")
+def check_k8s_connection(connection: KubernetesConnection):
     """
-    Check if you can successfully run a 'kubectl get nodes' command,
-      indicating a working connection to the Kubernetes cluster
+    Check that the Kubernetes API of the cluster can be reached and authenticated against
+    :param connection: the Kubernetes connection of this run
     :return: true for successful or false for not successful
     """
     try:
-        output = subprocess.run(f"aws eks update-kubeconfig --name {cluster_name} --region {region}", shell=True, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        output = subprocess.run(["kubectl get nodes"], shell=True, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        logger.info("Connection to Kubernetes cluster is working.")
+        version = connection.version()
+        logger.info(f"Connection to Kubernetes cluster is working (Kubernetes {version}).")
         return True
-    except subprocess.CalledProcessError as e:
-        logger.warning(e.output,"")
-        logger.warning("Connection to Kubernetes cluster is not working.")
+    except (ClientError, BotoCoreError) as e:
+        logger.warning(f"Failed to authenticate against the EKS cluster - {e}")
+    except (ApiException, urllib3.exceptions.HTTPError, OSError) as e:
+        logger.warning(f"An error occurred: {e}")
+    logger.warning("Connection to Kubernetes cluster is not working.")
+    return False
+
+
+@timed("check.check_k8s_nodes")
+def check_k8s_nodes(connection: KubernetesConnection, fargate: bool):
+    """
+    Check that every node of the cluster is ready. Clusters with node groups must have at least one node,
+    fargate clusters only have nodes while pods are running.
+    :param connection: the Kubernetes connection of this run
+    :param fargate: whether the cluster runs on fargate
+    :return: true for successful or false for not successful
+    """
+    try:
+        nodes = connection.core().list_node().items
+    except ApiException as e:
+        logger.warning(f"An error occurred: {e}")
+        return False
+
+    not_ready = [node.metadata.name for node in nodes if not _is_node_ready(node)]
+    if not nodes and not fargate:
+        logger.warning("The cluster has no nodes.")
+        return False
+    if not_ready:
+        logger.warning(f"Nodes {', '.join(not_ready)} are not ready.")
         return False
+    logger.info(f"All {len(nodes)} nodes are ready.")
+    return True
 
 
-def run_validator(output_file: str, yaml_file: str):
+def _is_node_ready(node) -> bool:
+    return any(condition.type == 'Ready' and condition.status == 'True'
+               for condition in node.status.conditions or [])
+
+
+@timed("check.check_namespaces")
+def check_namespaces(connection: KubernetesConnection, namespaces: list):
     """
-    Run all the validation checks
+    Check that every configured namespace exists and is active
+    :param connection: the Kubernetes connection of this run
+    :param namespaces: the namespaces from the config
+    :return: true for successful or false for not successful
+    """
+    try:
+        existing = {item.metadata.name: item.status.phase for item in connection.core().list_namespace().items}
+    except ApiException as e:
+        logger.warning(f"An error occurred: {e}")
+        return False
+
+    missing = [name for name in namespaces if existing.get(name) != 'Active']
+    if missing:
+        logger.warning(f"Namespaces {', '.join(missing)} do not exist or are not active.")
+        return False
+    logger.info("All namespaces exist.")
+    return True
+
+
+@timed("check.check_ingress_controller")
+def check_ingress_controller(connection: KubernetesConnection, ingress_type: str, timeout: float = WAIT_TIMEOUT):
+    """
+    Check that the deployment of the ingress controller has all of its replicas available, waiting while it
+    rolls out
+    :param connection: the Kubernetes connection of this run
+    :param ingress_type: the ingress type from the config
+    :param timeout: seconds to wait for the deployment to become available
+    :return: true for successful or false for not successful
+    """
+    namespace, name = INGRESS_CONTROLLER_DEPLOYMENTS[ingress_type]
+    apps = connection.apps()
+
+    def probe(attempt: int) -> bool:
+        try:
+            deployment = apps.read_namespaced_deployment(name, namespace)
+        except ApiException as e:
+            if e.status == 404:
+                raise ResourceFailed(f"Deployment {namespace}/{name} does not exist.")
+            raise
+        replicas = deployment.spec.replicas or 0
+        return replicas > 0 and (deployment.status.available_replicas or 0) >= replicas
+
+    try:
+        result = wait_until(f"Deployment {namespace}/{name}", probe, timeout)
+    except ApiException as e:
+        logger.warning(f"An error occurred: {e}")
+        return False
+    if result.ready:
+        logger.info(f"Ingress controller {namespace}/{name} is available.")
+        return True
+    logger.warning(f"Ingress controller {namespace}/{name} is not available - {result.message}")
+    return False
+
+
+def build_checks(terraform_outputs: dict, config: dict, wait_timeout: float = WAIT_TIMEOUT,
+                 load_probe: LoadProbe = None) -> list:
+    """
+    Builds the validation checks for the resources present in the terraform outputs, with the checks each
+    one depends on. The checks share one resource snapshot, so every kind of resource is described once.
+    :param terraform_outputs: the terraform outputs
+    :param config: the config dictionary
+    :param wait_timeout: seconds the EKS cluster and ALB checks wait for their resource to become ready
+    :param load_probe: optional load probe to run against the ALB once it answers pings
+    :return: list of Check
+    """
+    def output(name: str):
+        value = terraform_outputs.get(name)
+        return value["value"] if value else None
+
+    vpc_id = output("vpc_id")
+    private_subnets = output("private_subnets") or []
+    public_subnets = output("public_subnets") or []
+    subnet_ids = private_subnets + public_subnets
+    alb_arn = output("alb_arn")
+    cluster_name = config["cluster_name"]
+    snapshot = ResourceSnapshot(config["aws_region"], [vpc_id] if vpc_id else [], subnet_ids,
+                                [alb_arn] if alb_arn else [], [cluster_name] if cluster_name else [])
+
+    checks = []
+    if vpc_id:
+        checks.append(Check("vpc", lambda: check_vpc(vpc_id, snapshot)))
+
+    if subnet_ids:
+        checks.append(Check("subnets", lambda: check_subnets(subnet_ids, snapshot)))
+        if vpc_id:
+            checks.append(Check("availability_zones",
+                                lambda: check_availability_zones(private_subnets, public_subnets, config, snapshot),
+                                ("vpc", "subnets")))
+
+    if alb_arn:
+        checks.append(Check("alb", lambda: check_alb(alb_arn, snapshot, wait_timeout)))
+
+    if cluster_name:
+        checks.append(Check("eks", lambda: check_eks(cluster_name, snapshot, wait_timeout)))
+
+    alb_dns_name = output("alb_dns_name")
+    if alb_dns_name:
+        checks.append(Check("ping_alb", lambda: ping_alb(alb_dns_name, wait_timeout, load_probe), ("alb",) if alb_arn else ()))
+
+    # The Kubernetes checks share one API client, created by whichever check runs first
+    connection = KubernetesConnection(cluster_name, config["aws_region"], snapshot)
+    checks.append(Check("k8s_connection", lambda: check_k8s_connection(connection), ("eks",) if cluster_name else ()))
+    checks.append(Check("k8s_nodes", lambda: check_k8s_nodes(connection, config.get("fargate", False)),
+                        ("k8s_connection",)))
+    checks.append(Check("namespaces", lambda: check_namespaces(connection, config.get("cluster_namespaces") or []),
+                        ("k8s_connection",)))
+    if config.get("ingress_type") in INGRESS_CONTROLLER_DEPLOYMENTS:
+        checks.append(Check("ingress_controller",
+                            lambda: check_ingress_controller(connection, config["ingress_type"], wait_timeout),
+                            ("k8s_connection",)))
+    return checks
+
+
+def run_validator(output_file: str, yaml_file: str, report_file: str = None, wait_timeout: float = WAIT_TIMEOUT,
+                  load_probe: LoadProbe = None) -> bool:
+    """
+    Run all the validation checks, independent checks concurrently
     :param output_file: the output file
+    :param yaml_file: the config file
+    :param report_file: optional path to write a JSON report of the check results to
+    :param wait_timeout: seconds to wait for resources that are still being created to become ready
+    :param load_probe: optional load probe to run against the ALB once it answers pings
     :return: true for successful or false for not successful
     """
     config = load_config(yaml_file)
     terraform_outputs = load_json_data(output_file)
-    
-    vpc_id = terraform_outputs.get("vpc_id")
-    if vpc_id and not check_vpc(vpc_id["value"], config["aws_region"]):
-        quit(1)
-
-    subnet_ids = terraform_outputs.get("private_subnets")["value"] + terraform_outputs.get("public_subnets")["value"]
-    if subnet_ids and not check_subnets(subnet_ids, config):
-        quit(1)
-        
-    if subnet_ids and vpc_id and not check_availability_zones(terraform_outputs.get("private_subnets")["value"], terraform_outputs.get("public_subnets")["value"], config):
-        quit(1)
-        
-    # Check ALB
-    alb_arn = terraform_outputs.get("alb_arn")
-    if alb_arn and not check_alb(alb_arn["value"], config):
-        quit(1)
-
-    # Check EKS Cluster
-    cluster_name = config["cluster_name"]
-    if cluster_name and not check_eks(cluster_name, config):
-        quit(1)
 
-    # Ping ALB
-    alb_dns_name = terraform_outputs.get("alb_dns_name")
-    if alb_dns_name and not ping_alb(alb_dns_name["value"]):
-        quit(1)
+    start = time.perf_counter()
+    results = run_checks(build_checks(terraform_outputs, config, wait_timeout, load_probe))
+    duration = time.perf_counter() - start
+    if report_file:
+        write_report(results, report_file, duration)
 
-    # Check K8s Connection
-    if not check_k8s_connection(cluster_name, config["aws_region"]):
-        quit(1)
+    not_passed = [result for result in results if result.status != PASSED]
+    for result in not_passed:
+        logger.warning(f"Check {result.name} {result.status}" + (f" - {result.message}" if result.message else ""))
+    if not_passed:
+        logger.warning(f"{len(not_passed)} of {len(results)} resource validation checks did not pass in {duration:.2f}s.")
+        return False
 
     # If all checks pass, log a success message
-    logger.info("All resource validation checks passed.")
+    logger.info(f"All resource validation checks passed in {duration:.2f}s.")
+    return True
@@ -1,6 +1,8 @@
 import argparse
 import logging
 
+from constants.configs import PROBE_CONCURRENCY, WAIT_TIMEOUT
+
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(
@@ -10,6 +12,22 @@ logging.basicConfig(
 )
 
 
+def _positive_int(value: str) -> int:
+    """
+    ->Internal method<-
+    Argparse type for counts that must be at least 1
+    :param value: Command-line value
+    :return: The value as an int
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
 def load_args():
     """Defines and loads the command-line arguments for the application
 
@@ -18,4 +36,17 @@ def load_args():
     parser = argparse.ArgumentParser(description="Deployment validator")
     parser.add_argument("output_file", help="Path to terraform output file")
     parser.add_argument("config_file", help="Path to config file")
+    parser.add_argument("--report-file", help="Path to write a JSON report of the check results to")
+    parser.add_argument("--wait-timeout", type=float, default=WAIT_TIMEOUT,
+                        help="Seconds to wait for the EKS cluster and ALB to become ready (0 checks once)")
+    parser.add_argument("--probe-requests", type=_positive_int, default=0,
+                        help="Number of requests the ALB load probe sends once the ALB answers pings (omit to disable it)")
+    parser.add_argument("--probe-concurrency", type=_positive_int, default=PROBE_CONCURRENCY,
+                        help="Number of concurrent requests of the ALB load probe")
+    parser.add_argument("--slo-p95-ms", type=float, help="Fail if the p95 latency of the load probe is above this")
+    parser.add_argument("--slo-p99-ms", type=float, help="Fail if the p99 latency of the load probe is above this")
+    parser.add_argument("--slo-error-rate", type=float, default=0.0,
+                        help="Fail if the share of failed load probe requests is above this (0 to 1)")
+    parser.add_argument("--timings-file",
+                        help="Write how long each check took to this file on exit (JSON for .json, else OpenMetrics)")
     return parser.parse_args()
\ No newline at end of file
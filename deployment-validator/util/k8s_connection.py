@@ -0,0 +1,59 @@
+import threading
+
+from kubernetes import client as k8s_client
+
+from util.aws_clients import get_client
+from util.eks_auth import client_configuration
+
+
+class KubernetesConnection:
+    """
+    Lazily created Kubernetes API client for an EKS cluster, shared by every check of a run so all API calls
+    reuse one connection pool
+    """
+    def __init__(self, cluster_name: str, region: str, snapshot=None) -> None:
+        """Constructor for the KubernetesConnection class
+
+        :param cluster_name: The name of the EKS cluster
+        :param region: The AWS region the cluster is in
+        :param snapshot: Optional ResourceSnapshot including the cluster, whose description is reused
+        """
+        self.cluster_name = cluster_name
+        self.region = region
+        self.snapshot = snapshot
+        self._api_client = None
+        self._lock = threading.Lock()
+
+    def api_client(self) -> k8s_client.ApiClient:
+        """
+        Returns the API client, connecting on first use
+        :return: The shared ApiClient
+        """
+        with self._lock:
+            if self._api_client is None:
+                self._api_client = self._connect()
+            return self._api_client
+
+    def core(self) -> k8s_client.CoreV1Api:
+        return k8s_client.CoreV1Api(self.api_client())
+
+    def apps(self) -> k8s_client.AppsV1Api:
+        return k8s_client.AppsV1Api(self.api_client())
+
+    def version(self) -> str:
+        """
+        :return: The git version of the Kubernetes API server
+        """
+        return k8s_client.VersionApi(self.api_client()).get_code().git_version
+
+    def _connect(self) -> k8s_client.ApiClient:
+        """
+        ->Internal method<-
+        Creates an API client from the cluster's endpoint and CA certificate, authenticating with EKS tokens
+        generated in-process. No kubeconfig is written and the aws cli is not needed.
+        """
+        if self.snapshot is not None and self.cluster_name in self.snapshot.cluster_names:
+            cluster = self.snapshot.clusters()[self.cluster_name]
+        else:
+            cluster = get_client("eks", self.region).describe_cluster(name=self.cluster_name)["cluster"]
+        return k8s_client.ApiClient(client_configuration(cluster, self.region))
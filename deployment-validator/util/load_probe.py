@@ -0,0 +1,118 @@
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from constants.configs import PING_TIMEOUT
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] (deployment-validator) %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+
+
+class LoadProbe(NamedTuple):
+    requests: int
+    concurrency: int
+    max_p95_ms: float = None
+    max_p99_ms: float = None
+    max_error_rate: float = 0.0
+
+
+class ProbeStats(NamedTuple):
+    requests: int
+    errors: int
+    duration: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.duration if self.duration else 0.0
+
+
+def run_load_probe(url: str, probe: LoadProbe, expected_text: str = None, timeout: float = PING_TIMEOUT) -> ProbeStats:
+    """
+    Sends probe.requests GET requests to a URL, probe.concurrency at a time, over one pooled HTTP session
+    :param url: The URL to request
+    :param probe: Number of requests and concurrency
+    :param expected_text: Optional response body, other bodies count as errors
+    :param timeout: Timeout of each request in seconds
+    :return: ProbeStats with latency percentiles of the successful requests
+    """
+    session = requests.Session()
+    # One keep-alive connection per concurrent request, instead of a new connection per request
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=probe.concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def send(_):
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            response = session.get(url, timeout=timeout)
+            ok = response.ok and (expected_text is None or response.text == expected_text)
+        except requests.RequestException:
+            ok = False
+        latency = (time.perf_counter() - start) * 1000
+        with lock:
+            if ok:
+                latencies.append(latency)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=probe.concurrency) as executor:
+            list(executor.map(send, range(probe.requests)))
+    finally:
+        session.close()
+    duration = time.perf_counter() - start
+
+    latencies.sort()
+    return ProbeStats(probe.requests, errors, duration,
+                      _percentile(latencies, 50), _percentile(latencies, 95), _percentile(latencies, 99))
+
+
+def slo_violations(stats: ProbeStats, probe: LoadProbe) -> list:
+    """
+    Compares probe results against the thresholds of the probe
+    :param stats: The probe results
+    :param probe: The probe with its thresholds
+    :return: List of violated thresholds, empty if every threshold is met
+    """
+    violations = []
+    if stats.error_rate > probe.max_error_rate:
+        violations.append(f"error rate {stats.error_rate:.1%} above {probe.max_error_rate:.1%}")
+    if probe.max_p95_ms is not None and not stats.p95_ms <= probe.max_p95_ms:
+        violations.append(f"p95 latency {stats.p95_ms:.1f}ms above {probe.max_p95_ms:g}ms")
+    if probe.max_p99_ms is not None and not stats.p99_ms <= probe.max_p99_ms:
+        violations.append(f"p99 latency {stats.p99_ms:.1f}ms above {probe.max_p99_ms:g}ms")
+    return violations
+
+
+def _percentile(sorted_values: list, percentile: float) -> float:
+    """
+    ->Internal method<-
+    Nearest-rank percentile of sorted values, NaN if there are none
+    """
+    if not sorted_values:
+        return math.nan
+    rank = max(1, math.ceil(percentile / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
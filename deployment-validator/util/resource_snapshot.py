@@ -0,0 +1,95 @@
+import threading
+
+from constants.configs import LOAD_BALANCER_ARNS_PER_CALL
+from util.aws_clients import get_client
+
+
+class ResourceSnapshot:
+    """
+    Per-run view of the deployed resources shared by every check. Each kind of resource is fetched at most
+    once, for all ids at the same time, the first time a check asks for it. Concurrent checks asking for
+    the same kind wait for the one fetch in progress.
+    """
+    def __init__(self, region: str, vpc_ids=(), subnet_ids=(), load_balancer_arns=(), cluster_names=()) -> None:
+        """Constructor for the ResourceSnapshot class
+
+        :param region: AWS region of the resources
+        :param vpc_ids: VPC ids to describe
+        :param subnet_ids: Subnet ids to describe
+        :param load_balancer_arns: Load balancer ARNs to describe
+        :param cluster_names: EKS cluster names to describe
+        """
+        self.region = region
+        self.vpc_ids = list(vpc_ids)
+        self.subnet_ids = list(subnet_ids)
+        self.load_balancer_arns = list(load_balancer_arns)
+        self.cluster_names = list(cluster_names)
+        self._values = {}
+        self._locks = {kind: threading.Lock() for kind in ("vpcs", "subnets", "load_balancers", "clusters")}
+
+    def vpcs(self, refresh: bool = False) -> dict:
+        """
+        :param refresh: Whether to describe the resources again instead of using the previous result
+        :return: Dictionary of VPC id to VPC description
+        """
+        return self._get("vpcs", self._fetch_vpcs, refresh)
+
+    def subnets(self, refresh: bool = False) -> dict:
+        """
+        :param refresh: Whether to describe the resources again instead of using the previous result
+        :return: Dictionary of subnet id to subnet description
+        """
+        return self._get("subnets", self._fetch_subnets, refresh)
+
+    def load_balancers(self, refresh: bool = False) -> dict:
+        """
+        :param refresh: Whether to describe the resources again instead of using the previous result
+        :return: Dictionary of load balancer ARN to load balancer description
+        """
+        return self._get("load_balancers", self._fetch_load_balancers, refresh)
+
+    def clusters(self, refresh: bool = False) -> dict:
+        """
+        :param refresh: Whether to describe the resources again instead of using the previous result
+        :return: Dictionary of EKS cluster name to cluster description
+        """
+        return self._get("clusters", self._fetch_clusters, refresh)
+
+    def _get(self, kind: str, fetch, refresh: bool = False):
+        """
+        ->Internal method<-
+        Returns the resources of a kind, fetching them on first use or when asked to refresh. A failed fetch
+        is not remembered, so the next caller tries again.
+        """
+        with self._locks[kind]:
+            if refresh or kind not in self._values:
+                self._values[kind] = fetch()
+            return self._values[kind]
+
+    def _fetch_vpcs(self) -> dict:
+        if not self.vpc_ids:
+            return {}
+        pages = get_client("ec2", self.region).get_paginator("describe_vpcs").paginate(VpcIds=self.vpc_ids)
+        return {vpc["VpcId"]: vpc for page in pages for vpc in page["Vpcs"]}
+
+    def _fetch_subnets(self) -> dict:
+        if not self.subnet_ids:
+            return {}
+        pages = get_client("ec2", self.region).get_paginator("describe_subnets").paginate(SubnetIds=self.subnet_ids)
+        return {subnet["SubnetId"]: subnet for page in pages for subnet in page["Subnets"]}
+
+    def _fetch_load_balancers(self) -> dict:
+        elbv2 = get_client("elbv2", self.region)
+        load_balancers = {}
+        # describe_load_balancers accepts a limited number of ARNs per call
+        for start in range(0, len(self.load_balancer_arns), LOAD_BALANCER_ARNS_PER_CALL):
+            arns = self.load_balancer_arns[start:start + LOAD_BALANCER_ARNS_PER_CALL]
+            for page in elbv2.get_paginator("describe_load_balancers").paginate(LoadBalancerArns=arns):
+                for load_balancer in page["LoadBalancers"]:
+                    load_balancers[load_balancer["LoadBalancerArn"]] = load_balancer
+        return load_balancers
+
+    def _fetch_clusters(self) -> dict:
+        # EKS has no batch describe call
+        eks = get_client("eks", self.region)
+        return {name: eks.describe_cluster(name=name)["cluster"] for name in self.cluster_names}
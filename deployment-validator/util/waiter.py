@@ -0,0 +1,66 @@
+import logging
+import random
+import time
+from typing import Callable, NamedTuple
+
+from constants.configs import WAIT_BACKOFF, WAIT_INITIAL_DELAY, WAIT_MAX_DELAY
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] (deployment-validator) %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+
+
+class ResourceFailed(Exception):
+    """
+    Raised by a probe when the resource reached a state it will not recover from, which ends the wait
+    """
+
+
+class WaitResult(NamedTuple):
+    name: str
+    ready: bool
+    attempts: int
+    duration: float
+    message: str = None
+
+
+def wait_until(name: str, probe: Callable[[int], bool], timeout: float, initial_delay: float = WAIT_INITIAL_DELAY,
+               max_delay: float = WAIT_MAX_DELAY, backoff: float = WAIT_BACKOFF) -> WaitResult:
+    """
+    Calls probe until it reports the resource ready or the deadline passes, sleeping an exponentially growing,
+    jittered delay between attempts. With a timeout of 0 the probe is called exactly once.
+    :param name: Name of the resource for logging
+    :param probe: Callable taking the attempt number (starting at 0) and returning True once the resource is
+    ready, False while it is still pending, or raising ResourceFailed if it will never become ready
+    :param timeout: Seconds to wait for at most
+    :param initial_delay: Seconds to wait after the first attempt
+    :param max_delay: Upper bound of the delay between attempts
+    :param backoff: Factor the delay grows by after every attempt
+    :return: WaitResult with the time it took the resource to become ready
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    delay = initial_delay
+    attempt = 0
+    while True:
+        try:
+            ready = probe(attempt)
+        except ResourceFailed as e:
+            return WaitResult(name, False, attempt + 1, time.monotonic() - start, str(e))
+        attempt += 1
+        now = time.monotonic()
+        if ready:
+            if attempt > 1:
+                logger.info(f"wait_until - {name} ready after {now - start:.1f}s ({attempt} attempts)")
+            return WaitResult(name, True, attempt, now - start)
+        if now >= deadline:
+            return WaitResult(name, False, attempt, now - start, f"Not ready after {timeout:g}s")
+
+        # Equal jitter keeps concurrent waiters from polling in lockstep while still backing off
+        sleep = min(delay / 2 + random.uniform(0, delay / 2), deadline - now)
+        logger.info(f"wait_until - {name} not ready yet, checking again in {sleep:.1f}s")
+        time.sleep(sleep)
+        delay = min(delay * backoff, max_delay)
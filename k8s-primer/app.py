@@ -1,9 +1,11 @@
 import yaml
 import logging
-from facade.create_ingress_controller import create_ingress_controller
+from facade.create_ingress_controller import get_ingress_controller
 from facade.setup_connection import initialise_k8s_connection
 from facade.create_namespaces import create_namespaces
 from utils.args_util import load_args
+from utils.task_graph import SUCCEEDED, Task, run_tasks
+from utils.timing import export_at_exit
 
 
 logger = logging.getLogger(__name__)
@@ -15,10 +17,26 @@ logging.basicConfig(
 
 
 args = load_args()
+if args.timings_file:
+    export_at_exit(args.timings_file)
 
 with open(args.config_file, "r") as file:
     config = yaml.safe_load(file)
 
-initialise_k8s_connection(config["cluster_name"], config["aws_region"])
-create_namespaces(config["cluster_namespaces"])
-create_ingress_controller(config["ingress_type"], config["cluster_name"], config["aws_region"])
+# The ingress controller's AWS side (eksctl, OIDC provider, IAM policy, service account) does not need the
+# cluster connection, so it runs alongside the connection setup and namespace creation
+controller = get_ingress_controller(config["ingress_type"], config["cluster_name"], config["aws_region"])
+tasks = [
+    Task("initialise_k8s_connection",
+         lambda: initialise_k8s_connection(config["cluster_name"], config["aws_region"])),
+    Task("create_namespaces", lambda: create_namespaces(config["cluster_namespaces"]),
+         ("initialise_k8s_connection",)),
+    *controller.tasks(connection_task="initialise_k8s_connection")
+]
+
+results = run_tasks(tasks, max_workers=args.workers)
+failed = [result.name for result in results if result.status != SUCCEEDED]
+if failed:
+    logger.error(f"Priming failed, {', '.join(failed)} did not succeed")
+    quit(1)
+logger.info("Priming complete")
@@ -0,0 +1,26 @@
+# Settings for the shared boto3 clients in utils/aws_clients.py
+AWS_MAX_POOL_CONNECTIONS = 10
+AWS_RETRY_MODE = "standard"
+AWS_MAX_ATTEMPTS = 5
+
+# External commands (see utils/command_runner.py): default timeout in seconds, the longer timeout of eksctl
+# commands waiting on CloudFormation, the number of output lines kept for error messages and the seconds to
+# wait for the output pipes to close after killing a command
+COMMAND_TIMEOUT = 300
+EKSCTL_TIMEOUT = 1200
+COMMAND_OUTPUT_TAIL = 20
+COMMAND_KILL_GRACE = 5
+
+# Maximum number of primer tasks running at the same time (see utils/task_graph.py)
+MAX_TASK_WORKERS = 4
+
+# Reconciling namespaces (see facade/create_namespaces.py)
+NAMESPACE_WORKERS = 8
+NAMESPACE_LIST_PAGE_SIZE = 500
+
+# Pinned so reruns converge on a known release instead of whatever chart is newest
+AWS_LOAD_BALANCER_CONTROLLER_CHART_VERSION = "1.6.1"
+AWS_LOAD_BALANCER_CONTROLLER_POLICY_NAME = "AWSLoadBalancerControllerIAMPolicy"
+
+# Seconds after which EKS tokens (see utils/eks_auth.py) are generated again, EKS accepts them for 15 minutes
+EKS_TOKEN_REFRESH = 600
@@ -10,22 +10,33 @@ logging.basicConfig(
 )
 
 
-def create_ingress_controller(ingress_type, cluster_name, region, vpc_id=None):
-    """Creates and installs an ingress controller
+def get_ingress_controller(ingress_type, cluster_name, region, vpc_id=None):
+    """Creates an ingress controller without installing it
 
     :param ingress_type: The type of ingress controller to create
     :param cluster_name: The name of the cluster to install into
     :param region: The AWS region the cluster is in
     :param vpc_id: The ID of the VPC the cluster is in, defaults to None
+    :return: The ingress controller
     """
     match ingress_type:
         case "aws":
-            controller = AWSIngressController(
+            return AWSIngressController(
                 cluster_name=cluster_name,
                 region=region,
                 vpc_id=vpc_id
             )
         case _:
             logger.error(f"Unknown ingress type {ingress_type}")
-        
-    controller.install()
\ No newline at end of file
+            raise ValueError(f"Unknown ingress type {ingress_type}")
+
+
+def create_ingress_controller(ingress_type, cluster_name, region, vpc_id=None):
+    """Creates and installs an ingress controller
+
+    :param ingress_type: The type of ingress controller to create
+    :param cluster_name: The name of the cluster to install into
+    :param region: The AWS region the cluster is in
+    :param vpc_id: The ID of the VPC the cluster is in, defaults to None
+    """
+    get_ingress_controller(ingress_type, cluster_name, region, vpc_id).install()
@@ -1,5 +1,9 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
 from kubernetes import client as k8s_client
+from kubernetes.client.rest import ApiException
+from constants.configs import NAMESPACE_LIST_PAGE_SIZE, NAMESPACE_WORKERS
 
 
 logger = logging.getLogger(__name__)
@@ -9,33 +13,108 @@ logging.basicConfig(
     datefmt="%Y-%m-%d %H:%M:%S"
 )
 
+CREATED = "created"
+LABELLED = "labelled"
+UNCHANGED = "unchanged"
+FAILED = "failed"
 
-def create_namespaces(namespaces_to_create: list):
-    """Creates k8s namespaces in the cluster
+
+class NamespaceResult(NamedTuple):
+    name: str
+    action: str
+    message: str = None
+
+
+def create_namespaces(namespaces_to_create: list, max_workers: int = NAMESPACE_WORKERS) -> list:
+    """Reconciles k8s namespaces in the cluster: missing namespaces are created and existing namespaces
+    missing the primer's labels are patched. Every namespace is attempted before failing.
 
     :param namespaces_to_create: List of namespaces to create
+    :param max_workers: Maximum number of namespaces created or patched at the same time
+    :return: List of NamespaceResult, one per namespace
     """
-    v1 = k8s_client.CoreV1Api()
+    # One pooled connection per worker, so concurrent requests do not open and discard connections
+    configuration = k8s_client.Configuration.get_default_copy()
+    configuration.connection_pool_maxsize = max(configuration.connection_pool_maxsize, max_workers)
+    v1 = k8s_client.CoreV1Api(k8s_client.ApiClient(configuration))
     try:
-        existing_namespaces = [item.metadata.name for item in v1.list_namespace().items]
-    except Exception as e:
+        existing_labels = _list_namespace_labels(v1)
+    except Exception:
         logger.exception("Failed to retrieve existing namespaces")
-        quit(1)
-    
-    for name in namespaces_to_create:
-        if name in existing_namespaces:
-            continue
-
-        ns = k8s_client.V1Namespace(metadata=k8s_client.V1ObjectMeta(
-            name=name, 
-            labels={
-                "name": name
-            })
-        )
-        
-        try:
-            v1.create_namespace(ns)
-            logger.info(f"Namespace {name} created successfully")
-        except Exception as e:
-            logger.exception(f"Failed to create namespace {name}")
-            quit(1)
+        raise
+
+    # dict.fromkeys drops duplicates while keeping the configured order
+    names = list(dict.fromkeys(namespaces_to_create))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda name: _reconcile_namespace(v1, name, existing_labels.get(name)), names))
+
+    counts = {}
+    for result in results:
+        counts[result.action] = counts.get(result.action, 0) + 1
+    logger.info("Namespaces reconciled: " + ", ".join(f"{count} {action}" for action, count in counts.items()))
+
+    failed = [result.name for result in results if result.action == FAILED]
+    if failed:
+        raise RuntimeError(f"Failed to reconcile namespaces {', '.join(failed)}")
+    return results
+
+
+def _list_namespace_labels(v1: k8s_client.CoreV1Api) -> dict:
+    """
+    ->Internal method<-
+    Lists every namespace in the cluster, page by page
+    :return: Dictionary of namespace name to its labels
+    """
+    labels = {}
+    continue_token = None
+    while True:
+        kwargs = {"limit": NAMESPACE_LIST_PAGE_SIZE}
+        if continue_token:
+            kwargs["_continue"] = continue_token
+        page = v1.list_namespace(**kwargs)
+        for item in page.items:
+            labels[item.metadata.name] = item.metadata.labels or {}
+        continue_token = page.metadata._continue if page.metadata else None
+        if not continue_token:
+            return labels
+
+
+def _reconcile_namespace(v1: k8s_client.CoreV1Api, name: str, current_labels: dict = None) -> NamespaceResult:
+    """
+    ->Internal method<-
+    Creates a namespace, or patches its labels if it already exists
+    :param current_labels: Labels of the existing namespace, None if it did not exist when listed
+    """
+    labels = _namespace_labels(name)
+    try:
+        if current_labels is None:
+            try:
+                v1.create_namespace(k8s_client.V1Namespace(
+                    metadata=k8s_client.V1ObjectMeta(name=name, labels=labels)
+                ))
+                logger.info(f"Namespace {name} created successfully")
+                return NamespaceResult(name, CREATED)
+            except ApiException as e:
+                # Created by someone else since the namespaces were listed
+                if e.status != 409:
+                    raise
+                current_labels = v1.read_namespace(name).metadata.labels or {}
+
+        missing_labels = {key: value for key, value in labels.items() if current_labels.get(key) != value}
+        if not missing_labels:
+            return NamespaceResult(name, UNCHANGED)
+        v1.patch_namespace(name, {"metadata": {"labels": missing_labels}})
+        logger.info(f"Namespace {name} labelled successfully")
+        return NamespaceResult(name, LABELLED)
+
+    except Exception as e:
+        logger.error(f"Failed to reconcile namespace {name}: {e}")
+        return NamespaceResult(name, FAILED, str(e))
+
+
+def _namespace_labels(name: str) -> dict:
+    """
+    ->Internal method<-
+    :return: The labels the primer sets on a namespace
+    """
+    return {"name": name}
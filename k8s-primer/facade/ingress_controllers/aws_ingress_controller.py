@@ -1,7 +1,15 @@
 import os
+import json
+import shutil
 import logging
-import subprocess
+import tempfile
+import threading
+from constants.configs import AWS_LOAD_BALANCER_CONTROLLER_CHART_VERSION, AWS_LOAD_BALANCER_CONTROLLER_POLICY_NAME, \
+    EKSCTL_TIMEOUT
 from facade.ingress_controllers.ingress_controller_base import IngressControllerBase
+from utils.aws_clients import get_client
+from utils.command_runner import CommandError, run_command
+from utils.task_graph import Task
 
 
 logger = logging.getLogger(__name__)
@@ -37,82 +45,156 @@ class AWSIngressController(IngressControllerBase):
             name="aws-load-balancer-controller",
             helm_repo="https://aws.github.io/eks-charts",
             helm_chart="aws-load-balancer-controller",
+            chart_version=AWS_LOAD_BALANCER_CONTROLLER_CHART_VERSION,
             set_flags=set_flags
         )
 
         self.cluster_name = cluster_name
         self.region = region
+        self._account_id = None
+        self._account_id_lock = threading.Lock()
 
     def _pre_install_tasks(self):
-        logger.info("Starting pre-install tasks")
-        self._install_eksctl()
-        self._create_oidc_provider()
-        self._create_iam_policy()
-        self._create_service_account()
-        logger.info("Pre-install tasks complete")
+        # The IAM policy does not need eksctl and is created while the OIDC provider is associated
+        eksctl = f"{self.name}.install_eksctl"
+        oidc_provider = f"{self.name}.create_oidc_provider"
+        iam_policy = f"{self.name}.create_iam_policy"
+        return [
+            Task(eksctl, self._install_eksctl),
+            Task(oidc_provider, self._create_oidc_provider, (eksctl,)),
+            Task(iam_policy, self._create_iam_policy),
+            Task(f"{self.name}.create_service_account", self._create_service_account,
+                 (eksctl, oidc_provider, iam_policy))
+        ]
 
     def _install_eksctl(self):
         # check if eksctl is installed
         try:
-            subprocess.run("eksctl version", shell=True, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            run_command(["eksctl", "version"])
             logger.info("eksctl is already installed")
             return
         
-        except Exception as e:
+        except CommandError as e:
             # Install eksctl
             platform = "Linux_amd64"
-            download_command = f'curl -sLO "https://github.com/eksctl-io/eksctl/releases/latest/download/eksctl_{platform}.tar.gz"'
-            unzip_command = f'tar -xzf eksctl_{platform}.tar.gz -C /tmp && rm eksctl_{platform}.tar.gz'
-            move_command = f'sudo mv /tmp/eksctl /usr/local/bin'
+            download_dir = tempfile.mkdtemp(prefix="eksctl-")
+            archive_path = os.path.join(download_dir, f"eksctl_{platform}.tar.gz")
 
             try:
-                subprocess.run(download_command, shell=True, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                subprocess.run(unzip_command, shell=True, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                subprocess.run(move_command, shell=True, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                run_command(["curl", "-sSfL", "-o", archive_path,
+                             f"https://github.com/eksctl-io/eksctl/releases/latest/download/eksctl_{platform}.tar.gz"])
+                run_command(["tar", "-xzf", archive_path, "-C", download_dir])
+                run_command(["sudo", "mv", os.path.join(download_dir, "eksctl"), "/usr/local/bin"])
                 logger.info("eksctl installed successfully")
             except Exception as e:
                 logger.exception("Failed to install eksctl")
-                quit(1)
+                raise
+            finally:
+                shutil.rmtree(download_dir, ignore_errors=True)
 
     def _create_oidc_provider(self):
-        oidc_command = f'eksctl utils associate-iam-oidc-provider --cluster {self.cluster_name} --approve --region {self.region}'
+        try:
+            if self._oidc_provider_exists():
+                logger.info("OIDC provider for AWS ingress controller already exists")
+                return
+        except Exception as e:
+            logger.exception("Failed to look up OIDC provider for AWS ingress controller")
+            raise
+
+        oidc_command = ["eksctl", "utils", "associate-iam-oidc-provider", "--cluster", self.cluster_name, "--approve",
+                        "--region", self.region]
 
         try:
-            subprocess.run(oidc_command, shell=True, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            run_command(oidc_command, timeout=EKSCTL_TIMEOUT)
             logger.info("OIDC provider for AWS ingress controller created successfully")
         except Exception as e:
             logger.exception("Failed to create OIDC provider for AWS ingress controller")
-            quit(1)
+            raise
 
     def _create_iam_policy(self):
         cwd = os.path.dirname(os.path.abspath(__file__))
         policy_path = os.path.join(cwd, "../../static/iam_policy.json")
+        iam = get_client("iam")
 
-        policy_command = f'aws iam create-policy --policy-name AWSLoadBalancerControllerIAMPolicy --policy-document file://{policy_path} --region {self.region}'
-        
         try:
-            subprocess.run(policy_command, shell=True, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            iam.get_policy(PolicyArn=self._policy_arn())
+            logger.info("IAM policy for AWS ingress controller already exists")
+            return
+        except iam.exceptions.NoSuchEntityException:
+            pass
+        except Exception as e:
+            logger.exception("Failed to look up IAM policy for AWS ingress controller")
+            raise
+
+        try:
+            with open(policy_path, "r") as file:
+                iam.create_policy(PolicyName=AWS_LOAD_BALANCER_CONTROLLER_POLICY_NAME, PolicyDocument=file.read())
             logger.info("IAM policy for AWS ingress controller created successfully")
+        except iam.exceptions.EntityAlreadyExistsException:
+            logger.info("IAM policy for AWS ingress controller already exists")
         except Exception as e:
             logger.exception("Failed to create IAM policy for AWS ingress controller")
-            quit(1)
+            raise
 
     def _create_service_account(self):
-        account_id_command = f'aws sts get-caller-identity --query Account --output text --region {self.region}'
-        account_id = subprocess.check_output(account_id_command, shell=True, stderr=subprocess.PIPE).decode().strip()
-
-        sa_command = f'eksctl create iamserviceaccount\
-            --cluster {self.cluster_name}\
-            --namespace kube-system\
-            --name aws-load-balancer-controller\
-            --attach-policy-arn arn:aws:iam::{account_id}:policy/AWSLoadBalancerControllerIAMPolicy\
-            --override-existing-serviceaccounts\
-            --region {self.region}\
-            --approve'
+        try:
+            if self._service_account_exists():
+                logger.info("Service account for AWS ingress controller already exists")
+                return
+        except Exception as e:
+            logger.exception("Failed to look up service account for AWS ingress controller")
+            raise
+
+        sa_command = [
+            "eksctl", "create", "iamserviceaccount",
+            "--cluster", self.cluster_name,
+            "--namespace", "kube-system",
+            "--name", "aws-load-balancer-controller",
+            "--attach-policy-arn", self._policy_arn(),
+            "--override-existing-serviceaccounts",
+            "--region", self.region,
+            "--approve"
+        ]
         
         try:
-            subprocess.run(sa_command, shell=True, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            run_command(sa_command, timeout=EKSCTL_TIMEOUT)
             logger.info("Service account for AWS ingress controller created successfully")
         except Exception as e:
             logger.exception("Failed to create service account for AWS ingress controller")
-            quit(1)
+            raise
+
+    def _policy_arn(self) -> str:
+        """
+        ->Internal method<-
+        :return: ARN of the controller's IAM policy, looking up the account id once per controller
+        """
+        with self._account_id_lock:
+            if self._account_id is None:
+                self._account_id = get_client("sts", self.region).get_caller_identity()["Account"]
+        return f"arn:aws:iam::{self._account_id}:policy/{AWS_LOAD_BALANCER_CONTROLLER_POLICY_NAME}"
+
+    def _oidc_provider_exists(self) -> bool:
+        """
+        ->Internal method<-
+        :return: Whether an IAM OIDC provider exists for the cluster's OIDC issuer
+        """
+        cluster = get_client("eks", self.region).describe_cluster(name=self.cluster_name)["cluster"]
+        issuer = cluster["identity"]["oidc"]["issuer"].removeprefix("https://")
+        providers = get_client("iam").list_open_id_connect_providers()["OpenIDConnectProviderList"]
+        return any(provider["Arn"].endswith(f":oidc-provider/{issuer}") for provider in providers)
+
+    def _service_account_exists(self) -> bool:
+        """
+        ->Internal method<-
+        :return: Whether eksctl manages the controller's service account with the controller's policy attached
+        """
+        result = run_command(
+            ["eksctl", "get", "iamserviceaccount", "--cluster", self.cluster_name, "--namespace", "kube-system",
+             "--name", "aws-load-balancer-controller", "--region", self.region, "--output", "json"],
+            check=False, capture=True
+        )
+        # eksctl exits non-zero when no service account matches
+        if result.returncode != 0:
+            return False
+        policy_arn = self._policy_arn()
+        return any(policy_arn in (account.get("attachPolicyARNs") or []) for account in json.loads(result.stdout or "[]"))
@@ -1,5 +1,8 @@
+import json
 import logging
-import subprocess
+from facade.setup_connection import helm_environment
+from utils.command_runner import run_command
+from utils.task_graph import SUCCEEDED, Task, run_tasks
 
 
 logger = logging.getLogger(__name__)
@@ -43,31 +46,98 @@ class IngressControllerBase:
         """
         Installs the Ingress Controller into the cluster
         """
-        self._pre_install_tasks()
-        self._helm_install()
+        results = run_tasks(self.tasks())
+        failed = [result.name for result in results if result.status != SUCCEEDED]
+        if failed:
+            raise RuntimeError(f"Failed to install {self.name}, {', '.join(failed)} did not succeed")
 
-    def _pre_install_tasks(self):
+    def tasks(self, connection_task: str = None) -> list:
         """
-        Override this function definition in the inheriting class to perform any pre-install tasks
+        Returns the install as primer tasks: the pre-install tasks, then the Helm install once they all succeeded
+        :param connection_task: Name of the task setting up the cluster connection, which the Helm install
+        also waits for, defaults to None
+        :return: List of Task
         """
-        pass
+        pre_install_tasks = self._pre_install_tasks()
+        helm_depends_on = tuple(task.name for task in pre_install_tasks)
+        if connection_task:
+            helm_depends_on += (connection_task,)
+        return pre_install_tasks + [Task(f"{self.name}.helm_install", self._helm_install, helm_depends_on)]
+
+    def _pre_install_tasks(self) -> list:
+        """
+        Override this function definition in the inheriting class to return any pre-install tasks
+
+        :return: List of Task, which may depend on each other
+        """
+        return []
 
     def _helm_install(self):
+        try:
+            if self._release_up_to_date():
+                logger.info(f"{self.name} is already installed at chart version {self.chart_version}")
+                return
+        except Exception:
+            logger.exception(f"Failed to look up the {self.name} release")
+            raise
+
         logger.info(f"Installing {self.name}")
-        helm_command = f"helm install {self.name} {self.helm_chart}\
-                        --repo {self.helm_repo}\
-                        -n {self.namespace}"
+        # upgrade --install installs the release if missing and upgrades it otherwise, so reruns do not fail
+        helm_command = ["helm", "upgrade", "--install", self.name, self.helm_chart,
+                        "--repo", self.helm_repo,
+                        "-n", self.namespace]
 
         if self.chart_version:
-            helm_command += f" --version {self.chart_version}"
+            helm_command += ["--version", self.chart_version]
 
         if self.set_flags and self.set_flags != {}:
             for key, value in self.set_flags.items():
-                helm_command += f" --set {key}={value}"
+                helm_command += ["--set", f"{key}={value}"]
 
         try:
-            subprocess.run(helm_command, shell=True, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            run_command(helm_command, env=helm_environment())
             logger.info(f"{self.name} installed successfully")
         except Exception as e:
             logger.exception(f"Failed to install {self.name}")
-            quit(1)
+            raise
+
+    def _release_up_to_date(self) -> bool:
+        """
+        ->Internal method<-
+        Checks whether the Helm release is deployed with the pinned chart version and the same --set values.
+        Releases of unpinned charts are never up to date, so they are always upgraded to the latest chart.
+        :return: Whether the Helm install can be skipped
+        """
+        if not self.chart_version:
+            return False
+        # helm status leaves the chart out of its JSON output, helm list has it as <chart>-<version>
+        result = run_command(["helm", "list", "-n", self.namespace, "--filter", f"^{self.name}$", "--output", "json"],
+                             capture=True, env=helm_environment())
+        releases = [release for release in json.loads(result.stdout or "[]") if release.get("name") == self.name]
+        if not releases:
+            return False
+        release = releases[0]
+        if release.get("status") != "deployed" or release.get("chart") != f"{self.helm_chart}-{self.chart_version}":
+            return False
+
+        # Only the user supplied values, i.e. those set with --set, not the chart's defaults
+        result = run_command(["helm", "get", "values", self.name, "-n", self.namespace, "--output", "json"],
+                             capture=True, env=helm_environment())
+        values = json.loads(result.stdout or "null") or {}
+        return _flatten_values(values) == _flatten_values(self.set_flags or {})
+
+
+def _flatten_values(values: dict, prefix: str = "") -> dict:
+    """
+    ->Internal method<-
+    Flattens Helm values into --set style dotted keys with the values as --set would spell them
+    """
+    flat = {}
+    for key, value in values.items():
+        if isinstance(value, dict):
+            flat.update(_flatten_values(value, f"{prefix}{key}."))
+        elif isinstance(value, bool):
+            flat[f"{prefix}{key}"] = str(value).lower()
+        else:
+            flat[f"{prefix}{key}"] = str(value)
+    return flat
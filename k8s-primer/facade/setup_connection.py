@@ -1,7 +1,8 @@
 import os
 import logging
-import subprocess
-from kubernetes import config as k8s_config
+from kubernetes import client as k8s_client
+from utils.aws_clients import get_client
+from utils.eks_auth import client_configuration
 
 
 logger = logging.getLogger(__name__)
@@ -12,24 +13,34 @@ logging.basicConfig(
 )
 
 def initialise_k8s_connection(cluster_name, region):
-    """Initialises the connection to the k8s cluster
+    """Initialises the connection to the k8s cluster, configuring the Kubernetes client in memory from the
+    cluster's endpoint and CA certificate and an EKS token generated in-process
 
     :param cluster_name: The name of the cluster
     :param region: The AWS region the cluster is in
     """
-    current_path = os.getcwd()
-    kubeconfig_path = os.path.join(current_path, 'kubeconfig')
-
     try:
-        _generate_kubeconfig_file(cluster_name, region, kubeconfig_path)
-        k8s_config.load_kube_config()
-        logger.info("Kubeconfig loaded successfully")
+        cluster = get_client("eks", region).describe_cluster(name=cluster_name)["cluster"]
+        k8s_client.Configuration.set_default(client_configuration(cluster, region))
+        logger.info("Kubernetes client configured successfully")
         
     except Exception as e:
-        logger.exception("Failed to load kubeconfig")
-        quit(1)
+        logger.exception("Failed to configure the Kubernetes client")
+        raise
+
 
+def helm_environment() -> dict:
+    """Returns the environment for helm commands, pointing helm at the cluster set up by
+    initialise_k8s_connection. The token is passed in the environment rather than as an argument so it does
+    not show up in process listings.
 
-def _generate_kubeconfig_file(cluster_name, region, kubeconfig_path):
-    command = f'aws eks update-kubeconfig --name {cluster_name} --region {region}'
-    subprocess.run(command, shell=True, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    :return: The environment of the primer with the helm connection variables added
+    """
+    configuration = k8s_client.Configuration.get_default_copy()
+    token = configuration.get_api_key_with_prefix("authorization").removeprefix("Bearer ")
+    return {
+        **os.environ,
+        "HELM_KUBEAPISERVER": configuration.host,
+        "HELM_KUBETOKEN": token,
+        "HELM_KUBECAFILE": configuration.ssl_ca_cert
+    }
@@ -0,0 +1,91 @@
+# Stand-in for the boto3 clients the primer uses (STS, EKS and IAM), replacing utils.aws_clients.get_client.
+# The primer no longer runs the aws cli, so this is the only AWS fake it needs.
+import os
+import threading
+import time
+
+ACCOUNT_ID = "123456789012"
+OIDC_ISSUER = "oidc.eks.eu-west-2.amazonaws.com/id/EXAMPLE"
+
+
+class _Exceptions:
+    class NoSuchEntityException(Exception):
+        pass
+
+    class EntityAlreadyExistsException(Exception):
+        pass
+
+
+class _Events:
+    def register(self, *args, **kwargs):
+        pass
+
+
+class _Meta:
+    events = _Events()
+
+
+class FakeAwsClient:
+    """
+    One fake client serving every service. State lives in files under FAKE_STATE, shared with the fake eksctl
+    and helm commands, and each call takes FAKE_SLEEP seconds.
+    """
+    exceptions = _Exceptions
+    meta = _Meta()
+    calls = []
+    _lock = threading.Lock()
+
+    def __init__(self, service: str, endpoint: str) -> None:
+        self.service = service
+        self.endpoint = endpoint
+        self.state = os.environ["FAKE_STATE"]
+
+    def _call(self, operation: str):
+        with self._lock:
+            self.calls.append(f"{self.service}.{operation}")
+        time.sleep(float(os.environ.get("FAKE_SLEEP", "0")))
+
+    def get_caller_identity(self):
+        self._call("get_caller_identity")
+        return {"Account": ACCOUNT_ID}
+
+    def generate_presigned_url(self, operation: str, Params: dict, ExpiresIn: int, HttpMethod: str):
+        self._call("generate_presigned_url")
+        return f"https://sts.amazonaws.com/?Action=GetCallerIdentity&Version=2011-06-15&cluster={Params['x-k8s-aws-id']}"
+
+    def describe_cluster(self, name: str):
+        self._call("describe_cluster")
+        return {"cluster": {
+            "name": name,
+            "endpoint": self.endpoint,
+            "certificateAuthority": {"data": "ZmFrZQ=="},
+            "identity": {"oidc": {"issuer": f"https://{OIDC_ISSUER}"}}
+        }}
+
+    def list_open_id_connect_providers(self):
+        self._call("list_open_id_connect_providers")
+        if not os.path.exists(os.path.join(self.state, "oidc")):
+            return {"OpenIDConnectProviderList": []}
+        return {"OpenIDConnectProviderList": [{"Arn": f"arn:aws:iam::{ACCOUNT_ID}:oidc-provider/{OIDC_ISSUER}"}]}
+
+    def get_policy(self, PolicyArn: str):
+        self._call("get_policy")
+        if not os.path.exists(os.path.join(self.state, "policy")):
+            raise self.exceptions.NoSuchEntityException(PolicyArn)
+        return {"Policy": {"Arn": PolicyArn}}
+
+    def create_policy(self, PolicyName: str, PolicyDocument: str):
+        self._call("create_policy")
+        with open(os.path.join(self.state, "policy"), "w") as file:
+            file.write(PolicyDocument)
+        return {"Policy": {"PolicyName": PolicyName}}
+
+
+def client_factory(endpoint: str):
+    """
+    :param endpoint: URL of the fake Kubernetes API the fake EKS cluster points at
+    :return: Replacement for utils.aws_clients.get_client
+    """
+    def get_client(service: str, region: str = None) -> FakeAwsClient:
+        return FakeAwsClient(service, endpoint)
+    return get_client
@@ -0,0 +1,129 @@
+# Minimal stand-in for the Kubernetes namespace API, enough for create_namespaces and the primer end to end
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+NAMESPACES_PATH = "/api/v1/namespaces"
+
+
+class FakeNamespaceApi:
+    """
+    Serves the namespace list, read, create and patch calls of the Kubernetes API from memory on a local port
+    """
+    def __init__(self, namespaces: dict = None, hidden: set = (), failing: set = (), create_latency: float = 0.0):
+        """Constructor for the FakeNamespaceApi class
+
+        :param namespaces: Existing namespaces, name to labels. default and kube-system exist by default.
+        :param hidden: Existing namespaces left out of the list, so creating them conflicts (409)
+        :param failing: Namespaces whose create and patch calls fail with a 500
+        :param create_latency: Seconds each create call takes
+        """
+        self.namespaces = {"default": {}, "kube-system": {}} if namespaces is None else dict(namespaces)
+        self.namespaces.update({name: {} for name in hidden if name not in self.namespaces})
+        self.hidden = set(hidden)
+        self.failing = set(failing)
+        self.create_latency = create_latency
+        self.calls = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(self))
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self) -> "FakeNamespaceApi":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def record(self, method: str, path: str):
+        with self._lock:
+            self.calls.append((method, path))
+
+
+def _handler(api: FakeNamespaceApi):
+    """
+    ->Internal method<-
+    :return: Request handler class serving api
+    """
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            api.record("GET", url.path)
+            if url.path == NAMESPACES_PATH:
+                self._send_list(parse_qs(url.query))
+            elif url.path.startswith(NAMESPACES_PATH + "/"):
+                name = url.path.rsplit("/", 1)[-1]
+                if name not in api.namespaces:
+                    return self._send_status(404, "NotFound")
+                self._send(200, _namespace(name, api.namespaces[name]))
+            else:
+                self._send_status(404, "NotFound")
+
+        def do_POST(self):
+            metadata = self._read_body()["metadata"]
+            name = metadata["name"]
+            api.record("POST", name)
+            time.sleep(api.create_latency)
+            if name in api.failing:
+                return self._send_status(500, "InternalError")
+            with api._lock:
+                if name in api.namespaces:
+                    return self._send_status(409, "AlreadyExists")
+                api.namespaces[name] = dict(metadata.get("labels") or {})
+            self._send(201, _namespace(name, api.namespaces[name]))
+
+        def do_PATCH(self):
+            name = urlparse(self.path).path.rsplit("/", 1)[-1]
+            labels = self._read_body()["metadata"]["labels"]
+            api.record("PATCH", name)
+            if name in api.failing:
+                return self._send_status(500, "InternalError")
+            with api._lock:
+                api.namespaces[name].update(labels)
+            self._send(200, _namespace(name, api.namespaces[name]))
+
+        def _send_list(self, query: dict):
+            # The continue token is simply the offset of the next page
+            names = [name for name in api.namespaces if name not in api.hidden]
+            start = int(query.get("continue", ["0"])[0])
+            limit = int(query.get("limit", [str(len(names))])[0])
+            end = start + limit
+            self._send(200, {
+                "kind": "NamespaceList",
+                "apiVersion": "v1",
+                "metadata": {"continue": str(end) if end < len(names) else None},
+                "items": [_namespace(name, api.namespaces[name]) for name in names[start:end]]
+            })
+
+        def _send_status(self, code: int, reason: str):
+            self._send(code, {"kind": "Status", "apiVersion": "v1", "status": "Failure", "reason": reason,
+                              "code": code})
+
+        def _send(self, code: int, body: dict):
+            data = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _read_body(self) -> dict:
+            return json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def _namespace(name: str, labels: dict) -> dict:
+    """
+    ->Internal method<-
+    """
+    return {"kind": "Namespace", "apiVersion": "v1", "metadata": {"name": name, "labels": labels}}
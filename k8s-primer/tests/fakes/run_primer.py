@@ -0,0 +1,38 @@
+# Runs the primer end to end against the fakes: eksctl and helm from tests/fakes/bin, the fake AWS clients and
+# a fake namespace API. Takes the primer's arguments, i.e.
+#   FAKE_SLEEP=1 python tests/fakes/run_primer.py config.yml --workers 4
+# FAKE_STATE keeps what was created between runs (a new temporary directory if unset), see fake_cli for the
+# other variables. Prints the wall time and the namespaces in the fake cluster when done.
+import os
+import runpy
+import sys
+import tempfile
+import time
+
+FAKES_DIR = os.path.dirname(os.path.abspath(__file__))
+PRIMER_DIR = os.path.dirname(os.path.dirname(FAKES_DIR))
+sys.path.insert(0, PRIMER_DIR)
+
+from tests.fakes.fake_aws import client_factory  # noqa: E402
+from tests.fakes.namespace_api import FakeNamespaceApi  # noqa: E402
+import utils.aws_clients  # noqa: E402
+
+
+def main():
+    os.environ.setdefault("FAKE_STATE", tempfile.mkdtemp(prefix="k8s-primer-fakes-"))
+    os.environ["PATH"] = os.path.join(FAKES_DIR, "bin") + os.pathsep + os.environ["PATH"]
+    api = FakeNamespaceApi().start()
+    # Patched before app.py imports the facades, which import get_client by name
+    utils.aws_clients.get_client = client_factory(api.url)
+
+    sys.argv = [os.path.join(PRIMER_DIR, "app.py")] + sys.argv[1:]
+    start = time.perf_counter()
+    try:
+        runpy.run_path(sys.argv[0], run_name="__main__")
+    finally:
+        print(f"Primer took {time.perf_counter() - start:.2f}s, namespaces: {sorted(api.namespaces)}", file=sys.stderr)
+        api.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+from utils import command_runner
+from utils.command_runner import CommandError, CommandTimeout, run_command
+
+
+def _python(code: str) -> list:
+    return [sys.executable, "-c", code]
+
+
+def _process_gone(pid: int, timeout: float = 5) -> bool:
+    """
+    Waits for a killed process to exit. Its pipes close slightly before it does, so this polls.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            # A killed orphan not yet reaped by init shows up as a zombie
+            with open(f"/proc/{pid}/stat") as file:
+                if file.read().split()[2] == "Z":
+                    return True
+        except FileNotFoundError:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+class RunCommandTest(unittest.TestCase):
+    def test_logs_output_and_returns_result(self):
+        with self.assertLogs(command_runner.logger, "INFO") as logs:
+            result = run_command(_python("print('hello'); import sys; print('warning', file=sys.stderr)"))
+
+        self.assertEqual(0, result.returncode)
+        self.assertIsNone(result.stdout)
+        self.assertIn(f"[{os.path.basename(sys.executable)}] hello", "\n".join(logs.output))
+        self.assertIn("warning", "\n".join(logs.output))
+
+    def test_capture_returns_stdout(self):
+        result = run_command(_python("print('{\"a\": 1}')"), capture=True)
+
+        self.assertEqual('{"a": 1}\n', result.stdout)
+
+    def test_non_zero_exit_raises_with_output_tail(self):
+        with self.assertRaises(CommandError) as raised:
+            run_command(_python("import sys; print('bad flag', file=sys.stderr); sys.exit(3)"))
+
+        self.assertIn("exited with 3", str(raised.exception))
+        self.assertEqual(["bad flag"], raised.exception.output_tail)
+
+    def test_non_zero_exit_without_check(self):
+        result = run_command(_python("import sys; sys.exit(2)"), check=False)
+
+        self.assertEqual(2, result.returncode)
+
+    def test_missing_binary(self):
+        with self.assertRaisesRegex(CommandError, "could not be started"):
+            run_command(["k8s-primer-no-such-command"])
+
+    def test_timeout_kills_process_group(self):
+        # The child prints the pid of a grandchild that would outlive it
+        code = ("import subprocess, sys, time; "
+                "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']); "
+                "print(child.pid, flush=True); time.sleep(60)")
+        start = time.perf_counter()
+        with self.assertRaises(CommandTimeout) as raised:
+            run_command(_python(code), timeout=1)
+
+        self.assertLess(time.perf_counter() - start, 10)
+        self.assertIn("timed out after 1s", str(raised.exception))
+        grandchild = int(raised.exception.output_tail[0])
+        self.assertTrue(_process_gone(grandchild))
+
+    def test_background_child_holding_output_is_killed(self):
+        # The command exits at once, but a background child keeps its stdout open
+        code = ("import subprocess, sys; "
+                "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']); "
+                "print(child.pid, flush=True)")
+        start = time.perf_counter()
+        with self.assertLogs(command_runner.logger, "WARNING"):
+            result = run_command(_python(code), timeout=1, capture=True)
+
+        self.assertLess(time.perf_counter() - start, 10)
+        self.assertEqual(0, result.returncode)
+        self.assertTrue(_process_gone(int(result.stdout)))
+
+    def test_kill_ignores_exited_process_group(self):
+        process = mock.Mock(pid=12345)
+
+        with mock.patch.object(command_runner.os, "killpg", side_effect=ProcessLookupError) as killpg:
+            command_runner._kill(process)
+
+        killpg.assert_called_once_with(12345, command_runner.signal.SIGKILL)
+        process.wait.assert_called_once_with()
+
+
+if __name__ == "__main__":
+    unittest.main()
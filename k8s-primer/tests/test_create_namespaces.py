@@ -0,0 +1,74 @@
+import unittest
+from unittest import mock
+
+from kubernetes import client as k8s_client
+
+from facade import create_namespaces as namespaces_module
+from facade.create_namespaces import CREATED, LABELLED, UNCHANGED, create_namespaces
+from tests.fakes.namespace_api import FakeNamespaceApi
+
+
+class CreateNamespacesTest(unittest.TestCase):
+    def start_api(self, **kwargs) -> FakeNamespaceApi:
+        api = FakeNamespaceApi(**kwargs).start()
+        self.addCleanup(api.stop)
+        configuration = k8s_client.Configuration()
+        configuration.host = api.url
+        k8s_client.Configuration.set_default(configuration)
+        self.addCleanup(k8s_client.Configuration.set_default, None)
+        return api
+
+    def test_creates_missing_and_labels_existing(self):
+        api = self.start_api(namespaces={"default": {}, "web": {"name": "web"}})
+
+        results = create_namespaces(["apps", "default", "web", "apps"])
+
+        self.assertEqual([("apps", CREATED), ("default", LABELLED), ("web", UNCHANGED)],
+                         [(result.name, result.action) for result in results])
+        self.assertEqual({"name": "apps"}, api.namespaces["apps"])
+        self.assertEqual({"name": "default"}, api.namespaces["default"])
+        self.assertEqual(1, api.calls.count(("POST", "apps")))
+        self.assertNotIn(("PATCH", "web"), api.calls)
+
+    def test_label_patch_keeps_other_labels(self):
+        api = self.start_api(namespaces={"apps": {"team": "payments", "name": "old"}})
+
+        results = create_namespaces(["apps"])
+
+        self.assertEqual(LABELLED, results[0].action)
+        self.assertEqual({"team": "payments", "name": "apps"}, api.namespaces["apps"])
+
+    def test_conflict_reads_and_labels_namespace(self):
+        # Created by someone else after the list: the create returns 409
+        api = self.start_api(hidden={"apps"})
+
+        results = create_namespaces(["apps"])
+
+        self.assertEqual(LABELLED, results[0].action)
+        self.assertIn(("POST", "apps"), api.calls)
+        self.assertIn(("GET", "/api/v1/namespaces/apps"), api.calls)
+        self.assertEqual({"name": "apps"}, api.namespaces["apps"])
+
+    def test_failures_are_aggregated_after_every_namespace(self):
+        api = self.start_api(namespaces={"default": {}, "web": {}}, failing={"apps", "web"})
+
+        with self.assertRaisesRegex(RuntimeError, "Failed to reconcile namespaces apps, web"):
+            create_namespaces(["apps", "web", "default", "tools"])
+
+        self.assertEqual({"name": "tools"}, api.namespaces["tools"])
+        self.assertEqual({"name": "default"}, api.namespaces["default"])
+
+    def test_lists_every_page(self):
+        existing = {f"team{index}": {"name": f"team{index}"} for index in range(7)}
+        api = self.start_api(namespaces=existing)
+
+        with mock.patch.object(namespaces_module, "NAMESPACE_LIST_PAGE_SIZE", 3):
+            results = create_namespaces(list(existing))
+
+        self.assertTrue(all(result.action == UNCHANGED for result in results))
+        self.assertEqual(3, api.calls.count(("GET", "/api/v1/namespaces")))
+        self.assertFalse([call for call in api.calls if call[0] == "POST"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+RUN_PRIMER = os.path.join(TESTS_DIR, "fakes", "run_primer.py")
+CONFIG = """cluster_name: demo
+aws_region: eu-west-2
+ingress_type: aws
+cluster_namespaces: [apps, web, default]
+"""
+
+
+class PrimerTest(unittest.TestCase):
+    """
+    Runs app.py end to end against the fake eksctl, helm, AWS clients and namespace API
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.config_file = os.path.join(self.directory.name, "config.yml")
+        with open(self.config_file, "w") as file:
+            file.write(CONFIG)
+        self.state = os.path.join(self.directory.name, "state")
+        os.mkdir(self.state)
+        self.log = os.path.join(self.directory.name, "calls.log")
+
+    def run_primer(self, **env) -> subprocess.CompletedProcess:
+        open(self.log, "w").close()
+        return subprocess.run([sys.executable, RUN_PRIMER, self.config_file], capture_output=True, text=True,
+                              timeout=60, env={**os.environ, "FAKE_STATE": self.state, "FAKE_LOG": self.log, **env})
+
+    def calls(self) -> list:
+        with open(self.log) as file:
+            return file.read().splitlines()
+
+    def test_primes_and_reruns_without_changes(self):
+        first = self.run_primer()
+        self.assertEqual(0, first.returncode, first.stderr)
+        self.assertIn("Priming complete", first.stderr)
+        self.assertIn("namespaces: ['apps', 'default', 'kube-system', 'web']", first.stderr)
+        first_calls = self.calls()
+        self.assertTrue(any(call.startswith("eksctl create iamserviceaccount") for call in first_calls))
+        self.assertTrue(any(call.startswith("helm upgrade --install") for call in first_calls))
+
+        second = self.run_primer()
+        self.assertEqual(0, second.returncode, second.stderr)
+        # Only lookups, everything was created by the first run
+        changes = [call for call in self.calls()
+                   if call.startswith(("eksctl create", "eksctl utils", "helm upgrade"))]
+        self.assertEqual([], changes)
+        self.assertIn("helm list -n kube-system --filter ^aws-load-balancer-controller$ --output json", self.calls())
+        self.assertIn("helm get values aws-load-balancer-controller -n kube-system --output json", self.calls())
+
+    def test_changed_values_upgrade_release(self):
+        self.assertEqual(0, self.run_primer().returncode)
+        # Release deployed with another region than the config's
+        release_file = os.path.join(self.state, "helm_release")
+        with open(release_file) as file:
+            release = file.read().replace("region=eu-west-2", "region=eu-west-1")
+        with open(release_file, "w") as file:
+            file.write(release)
+
+        result = self.run_primer()
+
+        self.assertEqual(0, result.returncode, result.stderr)
+        self.assertTrue(any(call.startswith("helm upgrade --install") for call in self.calls()))
+
+    def test_failed_task_skips_dependents(self):
+        result = self.run_primer(FAKE_FAIL="eksctl utils associate-iam-oidc-provider")
+
+        self.assertEqual(1, result.returncode)
+        self.assertIn("aws-load-balancer-controller.create_service_account - Skipped", result.stderr)
+        self.assertIn("create_namespaces - succeeded", result.stderr)
+        self.assertFalse([call for call in self.calls() if call.startswith("helm")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import threading
+import time
+import unittest
+
+from utils.task_graph import FAILED, SKIPPED, SUCCEEDED, Task, run_tasks
+
+
+class RunTasksTest(unittest.TestCase):
+    def test_dependencies_run_first(self):
+        order = []
+        tasks = [
+            Task("install", lambda: order.append("install"), ("connect", "policy")),
+            Task("connect", lambda: order.append("connect")),
+            Task("policy", lambda: order.append("policy"), ("connect",)),
+        ]
+        results = run_tasks(tasks)
+
+        self.assertEqual(["connect", "policy", "install"], order)
+        self.assertEqual(["install", "connect", "policy"], [result.name for result in results])
+        self.assertTrue(all(result.status == SUCCEEDED for result in results))
+
+    def test_independent_tasks_run_concurrently(self):
+        barrier = threading.Barrier(3, timeout=5)
+        tasks = [Task(f"task{index}", barrier.wait) for index in range(3)]
+
+        results = run_tasks(tasks, max_workers=3)
+
+        self.assertTrue(all(result.status == SUCCEEDED for result in results))
+
+    def test_max_workers_limits_concurrency(self):
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def task():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.pop()
+
+        run_tasks([Task(f"task{index}", task) for index in range(6)], max_workers=2)
+
+        self.assertEqual(2, max(peak))
+
+    def test_failure_skips_dependents_only(self):
+        def fail():
+            raise RuntimeError("boom")
+
+        ran = []
+        tasks = [
+            Task("eksctl", fail),
+            Task("oidc", lambda: ran.append("oidc"), ("eksctl",)),
+            Task("service_account", lambda: ran.append("service_account"), ("oidc",)),
+            Task("namespaces", lambda: ran.append("namespaces")),
+        ]
+        results = {result.name: result for result in run_tasks(tasks)}
+
+        self.assertEqual(FAILED, results["eksctl"].status)
+        self.assertEqual("RuntimeError: boom", results["eksctl"].message)
+        self.assertEqual(SKIPPED, results["oidc"].status)
+        self.assertEqual(SKIPPED, results["service_account"].status)
+        self.assertEqual(SUCCEEDED, results["namespaces"].status)
+        self.assertEqual(["namespaces"], ran)
+
+    def test_unknown_dependency_is_rejected(self):
+        with self.assertRaisesRegex(ValueError, "unknown tasks missing"):
+            run_tasks([Task("install", lambda: None, ("missing",))])
+
+    def test_cycle_is_rejected(self):
+        tasks = [
+            Task("a", lambda: None, ("c",)),
+            Task("b", lambda: None, ("a",)),
+            Task("c", lambda: None, ("b",)),
+        ]
+        with self.assertRaisesRegex(ValueError, "depend on each other"):
+            run_tasks(tasks)
+
+
+if __name__ == "__main__":
+    unittest.main()
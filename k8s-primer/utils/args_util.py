@@ -1,5 +1,6 @@
 import argparse
 import logging
+from constants.configs import MAX_TASK_WORKERS
 
 
 logger = logging.getLogger(__name__)
@@ -17,4 +18,8 @@ def load_args():
     """
     parser = argparse.ArgumentParser(description="Kubernetes Primer")
     parser.add_argument("config_file", help="Path to config file")
+    parser.add_argument("--timings-file",
+                        help="Write how long each stage took to this file on exit (JSON for .json, else OpenMetrics)")
+    parser.add_argument("--workers", type=int, default=MAX_TASK_WORKERS,
+                        help=f"Maximum number of primer tasks running at the same time (default {MAX_TASK_WORKERS})")
     return parser.parse_args()
\ No newline at end of file
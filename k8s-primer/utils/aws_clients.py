@@ -0,0 +1,64 @@
+# Pooled boto3 clients shared across threads. tf-generator, k8s-primer and deployment-validator each carry an
+# identical copy of this module, keep them in sync.
+import threading
+
+import boto3
+from botocore.config import Config
+
+from constants.configs import AWS_MAX_ATTEMPTS, AWS_MAX_POOL_CONNECTIONS, AWS_RETRY_MODE
+
+# Process-wide boto3 session and clients. Clients are thread-safe once created, sessions are not,
+# so creation happens under a lock and every caller afterwards shares the same client.
+_lock = threading.Lock()
+_session = None
+_clients = {}
+_client_config = Config(
+    max_pool_connections=AWS_MAX_POOL_CONNECTIONS,
+    retries={"mode": AWS_RETRY_MODE, "max_attempts": AWS_MAX_ATTEMPTS}
+)
+
+
+def get_client(service: str, region: str = None):
+    """
+    Returns the shared boto3 client for a service and region, creating it on first use
+    :param service: AWS service name
+    :param region: AWS region
+    :return: boto3 client
+    """
+    key = (service, region)
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _get_session().client(service, region_name=region, config=_client_config)
+                _clients[key] = client
+    return client
+
+
+def configure_clients(max_pool_connections: int = None, retry_mode: str = None, max_attempts: int = None):
+    """
+    Changes the connection pool and retry settings used for clients. Clients created before the call are
+    discarded, so this should be called before any lookups are made.
+    :param max_pool_connections: Maximum number of pooled HTTP connections per client
+    :param retry_mode: botocore retry mode (legacy, standard or adaptive)
+    :param max_attempts: Maximum number of attempts per request, including the first
+    """
+    global _client_config
+    with _lock:
+        _client_config = Config(
+            max_pool_connections=max_pool_connections or AWS_MAX_POOL_CONNECTIONS,
+            retries={"mode": retry_mode or AWS_RETRY_MODE, "max_attempts": max_attempts or AWS_MAX_ATTEMPTS}
+        )
+        _clients.clear()
+
+
+def _get_session():
+    """
+    ->Internal method<-
+    Returns the shared session, must be called while holding the lock
+    """
+    global _session
+    if _session is None:
+        _session = boto3.session.Session()
+    return _session
@@ -0,0 +1,138 @@
+import logging
+import os
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import NamedTuple
+
+from constants.configs import COMMAND_KILL_GRACE, COMMAND_OUTPUT_TAIL, COMMAND_TIMEOUT
+from utils.timing import span
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] (k8s-primer) %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+
+
+class CommandError(Exception):
+    """
+    Raised when a command cannot be started, exits non-zero or times out
+    """
+    def __init__(self, args: list, message: str, output_tail: list = ()) -> None:
+        self.args_list = list(args)
+        self.output_tail = list(output_tail)
+        details = "\n".join(self.output_tail)
+        super().__init__(f"{' '.join(self.args_list)}: {message}" + (f"\n{details}" if details else ""))
+
+
+class CommandTimeout(CommandError):
+    """
+    Raised when a command runs longer than its timeout
+    """
+
+
+class CommandResult(NamedTuple):
+    args: list
+    returncode: int
+    duration: float
+    stdout: str = None
+
+
+def run_command(args: list, timeout: float = COMMAND_TIMEOUT, check: bool = True, capture: bool = False,
+                env: dict = None, cwd: str = None) -> CommandResult:
+    """
+    Runs a command without a shell, logging its output line by line while it runs. Safe to call from several
+    threads at once, i.e. from concurrent primer tasks.
+    :param args: The command and its arguments
+    :param timeout: Seconds after which the command and its child processes are killed
+    :param check: Whether to raise CommandError if the command exits non-zero
+    :param capture: Whether to return stdout instead of logging it, i.e. for JSON output. stderr of captured
+    commands is logged at debug level, as such commands are usually lookups expected to fail at times.
+    :param env: Environment of the command, defaults to the environment of the primer
+    :param cwd: Working directory of the command
+    :return: CommandResult with the exit code, duration and, if captured, stdout
+    """
+    name = os.path.basename(args[0])
+    start = time.perf_counter()
+    with span("command", command=name):
+        try:
+            # A new session lets a timeout kill the whole process group, not only the direct child
+            process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                                       env=env, cwd=cwd, start_new_session=True)
+        except OSError as e:
+            raise CommandError(args, f"could not be started ({e.strerror})")
+
+        captured = [] if capture else None
+        tail = deque(maxlen=COMMAND_OUTPUT_TAIL)
+        stderr_level = logging.DEBUG if capture else logging.INFO
+        readers = [
+            threading.Thread(target=_read_lines, args=(process.stdout, name, captured, tail), daemon=True),
+            threading.Thread(target=_read_lines, args=(process.stderr, name, None, tail, stderr_level), daemon=True)
+        ]
+        for reader in readers:
+            reader.start()
+
+        try:
+            returncode = process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _kill(process)
+            _join_readers(readers, COMMAND_KILL_GRACE)
+            raise CommandTimeout(args, f"timed out after {timeout:g}s", tail)
+        # A background child still holding stdout / stderr open keeps the readers waiting after the command exited
+        if not _join_readers(readers, max(0.0, timeout - (time.perf_counter() - start))):
+            logger.warning(f"{name} exited but its output stayed open until the timeout, killing its child processes")
+            _kill(process)
+            _join_readers(readers, COMMAND_KILL_GRACE)
+
+    duration = time.perf_counter() - start
+    logger.debug(f"{name} exited with {returncode} after {duration:.2f}s")
+    if check and returncode != 0:
+        raise CommandError(args, f"exited with {returncode}", tail)
+    return CommandResult(list(args), returncode, duration, "".join(captured) if capture else None)
+
+
+def _read_lines(stream, name: str, captured: list, tail: deque, level: int = logging.INFO):
+    """
+    ->Internal method<-
+    Reads a stream line by line until it closes, collecting the lines if captured is a list and logging them
+    at level otherwise. The last logged lines are kept in tail for error messages.
+    """
+    with stream:
+        for line in stream:
+            if captured is not None:
+                captured.append(line)
+                continue
+            line = line.rstrip()
+            if line:
+                tail.append(line)
+                logger.log(level, f"[{name}] {line}")
+
+
+def _join_readers(readers: list, timeout: float) -> bool:
+    """
+    ->Internal method<-
+    Waits up to timeout seconds in total for the output readers to finish. Readers still blocked afterwards,
+    i.e. on a pipe held open by a process outside the process group, are daemon threads and left behind.
+    :return: True if all readers finished
+    """
+    deadline = time.perf_counter() + timeout
+    for reader in readers:
+        reader.join(max(0.0, deadline - time.perf_counter()))
+    return not any(reader.is_alive() for reader in readers)
+
+
+def _kill(process: subprocess.Popen):
+    """
+    ->Internal method<-
+    Kills a command and every process it started
+    """
+    try:
+        # The group outlives the command while its children run, so this also works after the command exited
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    process.wait()
@@ -0,0 +1,123 @@
+# Authenticates against EKS clusters in-process, the same way `aws eks get-token` does, without the aws cli
+# k8s-primer and deployment-validator each carry a copy of this module (differing only in the aws_clients
+# import path), keep them in sync.
+import atexit
+import base64
+import os
+import tempfile
+import threading
+import time
+
+from kubernetes import client as k8s_client
+
+from constants.configs import EKS_TOKEN_REFRESH
+from utils.aws_clients import get_client
+
+TOKEN_PREFIX = "k8s-aws-v1."
+CLUSTER_ID_HEADER = "x-k8s-aws-id"
+# Only limits how long the signed URL itself is valid, EKS accepts the token for 15 minutes after signing
+PRESIGNED_URL_EXPIRY = 60
+
+
+class EksToken:
+    """
+    Bearer token for an EKS cluster, generated again once it is older than EKS_TOKEN_REFRESH seconds so it is
+    replaced before EKS stops accepting it
+    """
+    def __init__(self, cluster_name: str, region: str, refresh_after: float = EKS_TOKEN_REFRESH) -> None:
+        """Constructor for the EksToken class
+
+        :param cluster_name: The name of the EKS cluster
+        :param region: The AWS region the cluster is in
+        :param refresh_after: Age in seconds after which the token is generated again
+        """
+        self.cluster_name = cluster_name
+        self.region = region
+        self.refresh_after = refresh_after
+        self._token = None
+        self._created = None
+        self._lock = threading.Lock()
+
+    def get(self) -> str:
+        """
+        :return: A token EKS accepts, generating a new one if there is none yet or it is due for a refresh
+        """
+        with self._lock:
+            if self._token is None or time.monotonic() - self._created >= self.refresh_after:
+                self._token = generate_token(self.cluster_name, self.region)
+                self._created = time.monotonic()
+            return self._token
+
+
+def generate_token(cluster_name: str, region: str) -> str:
+    """
+    Generates an EKS bearer token: a presigned STS GetCallerIdentity URL, signed with the cluster name in the
+    x-k8s-aws-id header, which EKS calls to find out who the caller is
+    :param cluster_name: The name of the EKS cluster
+    :param region: The AWS region the cluster is in
+    :return: The token
+    """
+    sts = get_client("sts", region)
+    # Handlers are registered per client, the unique ids keep them from being added twice to a shared client
+    sts.meta.events.register("provide-client-params.sts.GetCallerIdentity", _retrieve_cluster_id,
+                             unique_id="eks-auth-retrieve-cluster-id")
+    sts.meta.events.register("before-sign.sts.GetCallerIdentity", _inject_cluster_id_header,
+                             unique_id="eks-auth-inject-cluster-id")
+    url = sts.generate_presigned_url("get_caller_identity", Params={CLUSTER_ID_HEADER: cluster_name},
+                                     ExpiresIn=PRESIGNED_URL_EXPIRY, HttpMethod="GET")
+    return TOKEN_PREFIX + base64.urlsafe_b64encode(url.encode()).decode().rstrip("=")
+
+
+def client_configuration(cluster: dict, region: str) -> k8s_client.Configuration:
+    """
+    Creates a Kubernetes client configuration for an EKS cluster, authenticating with tokens that are
+    refreshed before they expire
+    :param cluster: The cluster as returned by eks.describe_cluster
+    :param region: The AWS region the cluster is in
+    :return: The client configuration
+    """
+    token = EksToken(cluster["name"], region)
+
+    def refresh_token(configuration: k8s_client.Configuration):
+        configuration.api_key["authorization"] = token.get()
+
+    configuration = k8s_client.Configuration()
+    configuration.host = cluster["endpoint"]
+    configuration.ssl_ca_cert = _write_ca_file(cluster["certificateAuthority"]["data"])
+    configuration.api_key_prefix["authorization"] = "Bearer"
+    # Called before every request, copies of the configuration share the token
+    configuration.refresh_api_key_hook = refresh_token
+    refresh_token(configuration)
+    return configuration
+
+
+def _retrieve_cluster_id(params: dict, context: dict, **kwargs):
+    """
+    ->Internal method<-
+    Moves the cluster name out of the request parameters, which STS would reject, into the request context
+    """
+    if CLUSTER_ID_HEADER in params:
+        context[CLUSTER_ID_HEADER] = params.pop(CLUSTER_ID_HEADER)
+
+
+def _inject_cluster_id_header(request, **kwargs):
+    """
+    ->Internal method<-
+    Adds the cluster name from the request context as a header before the request is signed
+    """
+    if CLUSTER_ID_HEADER in request.context:
+        request.headers[CLUSTER_ID_HEADER] = request.context[CLUSTER_ID_HEADER]
+
+
+def _write_ca_file(ca_data: str) -> str:
+    """
+    ->Internal method<-
+    Writes the base64 encoded cluster CA certificate to a file removed on exit, as the Kubernetes client and
+    helm only read CA certificates from files
+    :return: Path of the file
+    """
+    descriptor, path = tempfile.mkstemp(prefix="eks-ca-", suffix=".crt")
+    with os.fdopen(descriptor, "wb") as file:
+        file.write(base64.b64decode(ca_data))
+    atexit.register(os.remove, path)
+    return path
@@ -0,0 +1,116 @@
+# Runs primer tasks as a dependency graph. The scheduling loop mirrors deployment-validator/facade/check_runner.py
+# (keep fixes to it in sync), but the two are kept apart: every tool is deployed on its own, and tasks fail by
+# raising and are traced as timing spans, while checks return whether they passed and report errors separately.
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, NamedTuple
+
+from constants.configs import MAX_TASK_WORKERS
+from utils.timing import span
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] (k8s-primer) %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+class Task(NamedTuple):
+    name: str
+    func: Callable[[], None]
+    depends_on: tuple = ()
+
+
+class TaskResult(NamedTuple):
+    name: str
+    status: str
+    duration: float
+    message: str = None
+
+
+def run_tasks(tasks: list, max_workers: int = MAX_TASK_WORKERS) -> list:
+    """
+    Runs primer tasks concurrently, starting each task as soon as every task it depends on has succeeded.
+    A task fails by raising an exception, tasks depending on it are skipped.
+    :param tasks: List of Task, dependencies must refer to tasks in the list
+    :param max_workers: Maximum number of tasks running at the same time
+    :return: List of TaskResult, in the order of tasks
+    """
+    by_name = {task.name: task for task in tasks}
+    _check_graph(by_name)
+
+    results = {}
+    pending = dict(by_name)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running = {}
+        while pending or running:
+            for name, task in list(pending.items()):
+                dependency_results = [results.get(dependency) for dependency in task.depends_on]
+                not_succeeded = [result.name for result in dependency_results
+                                 if result is not None and result.status != SUCCEEDED]
+                if not_succeeded:
+                    results[name] = TaskResult(name, SKIPPED, 0.0, f"Skipped, {', '.join(not_succeeded)} did not succeed")
+                    logger.warning(f"{name} - {results[name].message}")
+                    del pending[name]
+                elif all(result is not None for result in dependency_results):
+                    running[executor.submit(_run_task, task)] = name
+                    del pending[name]
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                results[result.name] = result
+                del running[future]
+
+    return [results[task.name] for task in tasks]
+
+
+def _run_task(task: Task) -> TaskResult:
+    """
+    ->Internal method<-
+    Runs a single task, turning exceptions into a failed result
+    """
+    start = time.perf_counter()
+    message = None
+    try:
+        with span(task.name):
+            task.func()
+        status = SUCCEEDED
+    except Exception as e:
+        status, message = FAILED, f"{type(e).__name__}: {e}"
+        logger.error(f"{task.name} - {message}")
+    duration = time.perf_counter() - start
+    logger.info(f"{task.name} - {status} in {duration:.3f}s")
+    return TaskResult(task.name, status, duration, message)
+
+
+def _check_graph(by_name: dict):
+    """
+    ->Internal method<-
+    Rejects dependencies on unknown tasks and dependency cycles
+    """
+    for task in by_name.values():
+        unknown = [dependency for dependency in task.depends_on if dependency not in by_name]
+        if unknown:
+            raise ValueError(f"Task {task.name} depends on unknown tasks {', '.join(unknown)}")
+
+    visited = set()
+
+    def visit(name: str, path: tuple):
+        if name in path:
+            raise ValueError(f"Tasks depend on each other: {' -> '.join(path + (name,))}")
+        if name in visited:
+            return
+        for dependency in by_name[name].depends_on:
+            visit(dependency, path + (name,))
+        visited.add(name)
+
+    for name in by_name:
+        visit(name, ())
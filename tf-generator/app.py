@@ -1,8 +1,10 @@
-import yaml
 import logging
 from util.args_util import load_args
-from util.yaml_validator import validate_yaml
-from facade.tf_gen import generate_tf_from_yaml
+from util.aws_cache import cache_stats, configure_cache
+from util.catalog_snapshot import export_snapshot, load_snapshot
+from util.timing import export_at_exit
+from facade.tf_batch import find_config_files, find_config_regions, generate_batch, is_batch_target, run_config, \
+    validate_batch
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(
@@ -13,21 +15,49 @@ logging.basicConfig(
 
 if __name__ == "__main__":
     args = load_args()
-    try:
-        with open(args.config_file, "r") as file:
-            config = yaml.safe_load(file)
-    except FileNotFoundError as e:
-        logger.error(f"yaml_safe_load - File Not found - {e}")
+    if args.timings_file:
+        export_at_exit(args.timings_file)
+    configure_cache(args.cache_dir, refresh=args.refresh_cache, offline=args.offline)
+
+    batch = is_batch_target(args.config_file)
+    config_files = find_config_files(args.config_file) if batch else [args.config_file]
+    if not config_files:
+        logger.error(f"find_config_files - No config files found for {args.config_file}")
         exit(1)
 
-    try:
-        validate_yaml(config)
-    except ValueError as e:
-        logger.error(f"validate_yaml - Invalid configuration file provided - {e}")
-        exit(2)
-
-    try:
-        generate_tf_from_yaml(config)
-    except Exception as e:
-        logger.error(f"generate_tf_from_yaml - Error caught - {e}")
-        exit(3)
+    if args.export_snapshot:
+        try:
+            export_snapshot(args.export_snapshot, args.snapshot_regions or sorted(find_config_regions(config_files)))
+        except ValueError as e:
+            logger.error(f"export_snapshot - {e}")
+            exit(1)
+        exit(0)
+
+    snapshot = None
+    if args.snapshot:
+        try:
+            snapshot = load_snapshot(args.snapshot)
+        except ValueError as e:
+            logger.error(f"load_snapshot - {e}")
+            exit(1)
+
+    if batch and args.validate_only:
+        results = validate_batch(config_files, snapshot)
+        exit(max(result.exit_code for result in results))
+
+    if batch:
+        try:
+            results = generate_batch(config_files, args.output_dir, args.workers,
+                                     args.cache_dir, args.refresh_cache, args.offline, args.split_files)
+        except ValueError as e:
+            logger.error(f"generate_batch - {e}")
+            exit(1)
+        exit(max(result.exit_code for result in results))
+
+    exit_code = run_config(args.config_file, args.output_dir, not args.refresh_cache, args.split_files,
+                           snapshot, args.validate_only)
+    if exit_code != 0:
+        exit(exit_code)
+
+    stats = cache_stats()
+    logger.info(f"AWS catalog cache - {stats['hits']} hits, {stats['misses']} misses")
@@ -0,0 +1,95 @@
+# Benchmarks the shared boto3 clients of util/aws_clients.py against creating a client for every call, as the AWS
+# helpers used to. The clients talk to a local stand-in for the EC2 API through AWS_ENDPOINT_URL, so the
+# benchmark also counts how many TCP connections each approach opens once warmed up.
+#   python benchmarks/bench_aws_clients.py [number of calls] [number of threads]
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bench_common import measure, report
+
+import boto3
+
+from util import aws_clients
+
+REGION = "eu-west-1"
+DESCRIBE_REGIONS_RESPONSE = (b'<?xml version="1.0" encoding="UTF-8"?>'
+                             b'<DescribeRegionsResponse xmlns="http://ec2.amazonaws.com/doc/2016-11-15/">'
+                             b'<requestId>benchmark</requestId><regionInfo><item><regionName>eu-west-1</regionName>'
+                             b'</item></regionInfo></DescribeRegionsResponse>')
+
+
+class FakeEc2Server(ThreadingHTTPServer):
+    """
+    Answers every request with a DescribeRegions response over keep-alive connections, counting connections
+    """
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    def count_connection(self):
+        with self._lock:
+            self.connections += 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.count_connection()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/xml")
+        self.send_header("Content-Length", str(len(DESCRIBE_REGIONS_RESPONSE)))
+        self.end_headers()
+        self.wfile.write(DESCRIBE_REGIONS_RESPONSE)
+
+    def log_message(self, *args):
+        pass
+
+
+def client_per_call():
+    boto3.client("ec2", region_name=REGION).describe_regions()
+
+
+def shared_client():
+    aws_clients.get_client("ec2", REGION).describe_regions()
+
+
+def run(lookup, calls: int, threads: int):
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for future in [executor.submit(lookup) for _ in range(calls)]:
+            future.result()
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+    server = FakeEc2Server()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ.update(AWS_ENDPOINT_URL=f"http://127.0.0.1:{server.server_address[1]}",
+                      AWS_ACCESS_KEY_ID="benchmark", AWS_SECRET_ACCESS_KEY="benchmark")
+    # Warm up botocore's loaders, which cache the service models after the first client
+    client_per_call()
+    shared_client()
+
+    rows = []
+    for label, lookup in [("client per call", client_per_call), ("shared client", shared_client)]:
+        rows.append((f"{label}, time", measure(lambda: run(lookup, calls, threads), repeat=3)))
+        server.connections = 0
+        run(lookup, calls, threads)
+        rows.append((f"{label}, new TCP connections", server.connections))
+    report(f"{calls} EC2 calls from {threads} threads against a local endpoint, fastest of 3 runs", rows)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# Shared helpers of the benchmark scripts in this directory. Each script runs with plain python from the
+# tf-generator directory, i.e. `python benchmarks/bench_render.py`, needs no AWS credentials and prints a table.
+import logging
+import os
+import sys
+import time
+
+# Makes the tf-generator packages importable when a script is run by path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The generator logs every step at INFO, which would drown the results
+logging.disable(logging.INFO)
+
+
+def measure(func, repeat: int = 5) -> float:
+    """
+    Runs func repeat times
+    :param func: Callable without arguments
+    :param repeat: Number of runs
+    :return: The fastest run in seconds, the least disturbed by other load on the machine
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def report(title: str, rows: list):
+    """
+    Prints a table of results
+    :param title: Heading of the table
+    :param rows: List of (label, value) tuples, floats are printed as milliseconds
+    """
+    print(title)
+    width = max(len(label) for label, _ in rows)
+    for label, value in rows:
+        text = f"{value * 1000:10.1f} ms" if isinstance(value, float) else f"{value:>10}"
+        print(f"  {label.ljust(width)}  {text}")
+
+
+def report_table(title: str, headers: list, rows: list):
+    """
+    Prints a table with a column per header
+    :param title: Heading of the table
+    :param headers: Column headings
+    :param rows: List of rows, each a list of already formatted cells
+    """
+    print(title)
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *rows)]
+    for row in [headers, *rows]:
+        print("  " + "  ".join(str(cell).rjust(width) for cell, width in zip(row, widths)))
@@ -0,0 +1,58 @@
+# Benchmarks generate_tf_from_yaml with its steps run one at a time and concurrently, against fake AWS clients
+# adding a fixed latency per call. The config leaves out availability_zones, so the VPC step looks them up
+# while the IAM step looks up the cluster roles.
+#   python benchmarks/bench_generation_steps.py [latency per AWS call in seconds]
+import os
+import sys
+import tempfile
+
+import yaml
+
+from bench_common import measure, report
+from fake_aws import FakeAws
+
+from constants.configs import MAX_GENERATION_WORKERS
+from facade import tf_gen
+from util.aws_cache import configure_cache
+from util.yaml_validator import validate_structure
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "config.yml")
+
+
+def load_config() -> dict:
+    with open(CONFIG_FILE, "r") as file:
+        config = yaml.safe_load(file)
+    del config["availability_zones"]
+    errors = validate_structure(config)
+    if errors:
+        raise ValueError(errors)
+    return config
+
+
+def generate(config: dict, output_dir: str, workers: int):
+    # A refreshed catalog cache and no step cache, so every run makes its AWS calls
+    tf_gen.MAX_GENERATION_WORKERS = workers
+    configure_cache(os.path.join(output_dir, "catalog"), refresh=True)
+    tf_gen.generate_tf_from_yaml(config, output_dir, use_cache=False)
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+    aws = FakeAws(latency, role_names=["ca_cluster_admin"]).install()
+    config = load_config()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # STEP_CACHE_DIR is under the home directory, keep the benchmark's entries out of it
+        os.environ["HOME"] = directory
+        rows = []
+        for label, workers in [("steps one at a time", 1), (f"steps concurrently ({MAX_GENERATION_WORKERS})",
+                                                            MAX_GENERATION_WORKERS)]:
+            rows.append((label, measure(lambda: generate(config, directory, workers), repeat=3)))
+        aws.reset()
+        generate(config, directory, MAX_GENERATION_WORKERS)
+        rows.append(("AWS calls per run", sum(aws.calls.values())))
+        report(f"generate_tf_from_yaml with {latency * 1000:g} ms per AWS call, fastest of 3 runs", rows)
+
+
+if __name__ == "__main__":
+    main()
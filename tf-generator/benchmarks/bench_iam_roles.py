@@ -0,0 +1,56 @@
+# Benchmarks the IAM role lookups of util/aws.py on an account with many roles, against fake IAM clients adding a
+# fixed latency per call. Compares a single list_roles call (the previous behaviour, which missed roles), listing
+# every role, and find_aws_roles for a few and for many names.
+#   python benchmarks/bench_iam_roles.py [number of roles] [latency per AWS call in seconds]
+import sys
+
+from bench_common import measure, report
+from fake_aws import FakeAws
+
+from constants.configs import IAM_DIRECT_LOOKUP_LIMIT, IAM_ROLES_PAGE_SIZE
+import util.aws
+from util.aws import find_aws_roles, get_aws_roles
+
+REGION = "eu-west-1"
+
+
+def single_list_call(wanted: set) -> set:
+    # A single list_roles call, which returns at most 100 roles
+    iam = util.aws.get_client("iam", REGION)
+    return {role["RoleName"] for role in iam.list_roles(PathPrefix="/")["Roles"]} & wanted
+
+
+def full_listing(wanted: set) -> set:
+    return {role["RoleName"] for role in get_aws_roles(REGION)} & wanted
+
+
+def main():
+    role_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.1
+    role_names = [f"role-{index:05d}" for index in range(role_count)]
+    aws = FakeAws(latency, role_names).install()
+
+    # The generator looks up the admin and dev role, one of which is past the first page
+    few = {role_names[10], role_names[-1]}
+    # More names than IAM_DIRECT_LOOKUP_LIMIT are found by paging, which stops at the page of the last one
+    many = set(role_names[IAM_ROLES_PAGE_SIZE:IAM_ROLES_PAGE_SIZE + 2 * IAM_DIRECT_LOOKUP_LIMIT])
+
+    rows = []
+    for label, lookup, wanted in [
+        ("single list_roles call, 2 names", single_list_call, few),
+        ("every page, 2 names", full_listing, few),
+        ("find_aws_roles, 2 names", find_aws_roles, few),
+        (f"find_aws_roles, {len(many)} names on page 2", find_aws_roles, many),
+    ]:
+        def run():
+            return lookup(wanted, REGION) if lookup is find_aws_roles else lookup(wanted)
+        seconds = measure(run, repeat=3)
+        aws.reset()
+        found = run()
+        rows.append((label, seconds))
+        rows.append(("  roles found / AWS calls", f"{len(found)}/{len(wanted)} in {sum(aws.calls.values())}"))
+    report(f"IAM role lookups on {role_count} roles with {latency * 1000:g} ms per AWS call, fastest of 3 runs", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# Benchmarks how rendering terraform blocks with TFStringBuilder scales with the number of blocks and the number of
+# tags per block: into one string, streamed straight into a file, and with the previous approach of every nesting
+# level building and returning its own string. Time per MB of output staying flat as the input grows means linear
+# scaling. CPython appends in place to a string nothing else references, which keeps the concatenating renderer
+# close to linear too. Rendering to a string collects every chunk in a list before joining them, so its peak
+# memory is a multiple of the output, while streaming into a file keeps it flat.
+#   python benchmarks/bench_render.py
+import os
+import tempfile
+import tracemalloc
+
+from bench_common import measure, report_table
+
+from constants.configs import LINE_ENDINGS
+from util.tf_ast import Block, ListValue, MapValue, NestedBlock
+from util.tf_string_builder import TFStringBuilder, _SCALAR_FORMATTERS
+
+
+BLOCK_COUNTS = (250, 1000, 4000, 16000)
+TAG_COUNTS = (10, 100, 1000)
+RENDERERS = ("concatenation", "to a string", "into a file")
+
+
+def make_blocks(count: int, tags: int = 10) -> list:
+    """
+    :return: count resource blocks, each with scalars, a map of tags, a list of maps and a nested block
+    """
+    return [
+        Block.resource("aws_security_group_rule", f"rule_{index}", {
+            "type": "ingress",
+            "from_port": index % 65535,
+            "to_port": index % 65535,
+            "protocol": "tcp",
+            "cidr_blocks": [f"10.{index % 256}.{octet}.0/24" for octet in range(8)],
+            "tags": {f"tag_{tag}": f"value_{index}_{tag}" for tag in range(tags)},
+            "rules": [{"name": f"rule_{rule}", "priority": rule, "enabled": rule % 2 == 0} for rule in range(5)],
+            "timeouts": NestedBlock({"create": "5m", "delete": "10m"}),
+        })
+        for index in range(count)
+    ]
+
+
+def render_by_concatenation(blocks: list) -> str:
+    """
+    The rendering approach before the shared writer: every map, list and nested block returns its own string,
+    which its parent appends to its own
+    """
+    output = ""
+    for block in blocks:
+        labels = "".join(f" \"{label}\"" for label in block.labels)
+        output += f"{block.type_}{labels} {{{LINE_ENDINGS}" + _attributes_string(block.attributes, "  ")
+        output += "}" + LINE_ENDINGS
+    return output
+
+
+def _attributes_string(attributes: tuple, indent: str) -> str:
+    output = ""
+    max_key_len = max((len(attribute.key) for attribute in attributes), default=0)
+    for attribute in attributes:
+        output += f"{indent}{attribute.key}{' ' * (max_key_len - len(attribute.key))} "
+        value = attribute.value
+        if isinstance(value, NestedBlock):
+            output += "{" + LINE_ENDINGS + _attributes_string(value.attributes, indent + "  ") + indent + "}" + LINE_ENDINGS
+        elif isinstance(value, MapValue):
+            output += "= {" + LINE_ENDINGS + _attributes_string(value.attributes, indent + "  ") + indent + "}" + LINE_ENDINGS
+        elif isinstance(value, ListValue):
+            output += "= [" + LINE_ENDINGS + _items_string(value.items, indent + "  ") + indent + "]" + LINE_ENDINGS
+        else:
+            output += f"= {_SCALAR_FORMATTERS[type(value)](value)}{LINE_ENDINGS}"
+    return output
+
+
+def _items_string(items: tuple, indent: str) -> str:
+    output = ""
+    for value in items:
+        if isinstance(value, MapValue):
+            output += indent + "{" + LINE_ENDINGS + _attributes_string(value.attributes, indent + "  ") + indent + "}," + LINE_ENDINGS
+        elif isinstance(value, ListValue):
+            output += indent + "[" + LINE_ENDINGS + _items_string(value.items, indent + "  ") + indent + "]," + LINE_ENDINGS
+        else:
+            output += f"{indent}{_SCALAR_FORMATTERS[type(value)](value)},{LINE_ENDINGS}"
+    return output
+
+
+def render_to_file(blocks: list, path: str):
+    with open(path, "w") as file:
+        TFStringBuilder.render(blocks, file)
+
+
+def peak_memory(func) -> int:
+    """
+    :return: Peak memory allocated while running func, in bytes
+    """
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure_renderers(blocks: list, path: str) -> list:
+    """
+    :return: One table row: the output size, then time per MB of output and peak memory of every renderer
+    """
+    output = TFStringBuilder.render(blocks)
+    if render_by_concatenation(blocks) != output:
+        raise AssertionError("The concatenating renderer does not match TFStringBuilder")
+    renderers = [
+        lambda: render_by_concatenation(blocks),
+        lambda: TFStringBuilder.render(blocks),
+        lambda: render_to_file(blocks, path),
+    ]
+    # Fewer runs for the large inputs, the fastest run barely changes
+    repeat = 5 if len(output) < 10_000_000 else 2
+    row = [f"{len(output) / 1e6:.1f} MB"]
+    row += [f"{measure(render, repeat) / (len(output) / 1e6) * 1000:.1f} ms" for render in renderers]
+    row += [f"{peak_memory(render) / 1e6:.1f} MB" for render in renderers]
+    return row
+
+
+def main():
+    headers = ["input", "output"] + [f"{renderer} / MB" for renderer in RENDERERS] + \
+              [f"{renderer} peak" for renderer in RENDERERS]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "main.tf")
+        rows = [[f"{count} blocks, 10 tags"] + measure_renderers(make_blocks(count), path)
+                for count in BLOCK_COUNTS]
+        rows += [[f"1000 blocks, {tags} tags"] + measure_renderers(make_blocks(1000, tags), path)
+                 for tags in TAG_COUNTS if tags != 10]
+    report_table("Rendering time per MB of output (fastest run) and peak memory", headers, rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# Benchmarks plan_subnets from a typical three zone VPC up to thousands of subnets of mixed sizes in a /8,
+# with reserved ranges and a secondary CIDR block
+#   python benchmarks/bench_subnet_planner.py
+from bench_common import measure, report
+
+from util.subnet_planner import plan_subnets
+
+SMALL_VPC_SIZES = {"private": 19, "public": 22, "intra": 24, "database": 24}
+MIXED_SIZES = {"private": 20, "public": 22, "intra": 24, "database": 26}
+
+
+def zones(count: int) -> list:
+    return [f"zone-{index}" for index in range(count)]
+
+
+def main():
+    cases = [
+        ("3 zones in a /16, default sizes", "10.0.0.0/16", zones(3), {}),
+        ("3 zones in a /16, mixed sizes", "10.0.0.0/16", zones(3), {"subnet_sizes": SMALL_VPC_SIZES}),
+        ("250 zones in a /8, mixed sizes", "10.0.0.0/8", zones(250), {"subnet_sizes": MIXED_SIZES}),
+        ("1000 zones in a /8, mixed sizes", "10.0.0.0/8", zones(1000), {"subnet_sizes": MIXED_SIZES}),
+        ("1000 zones, reserved ranges and a secondary block", "10.0.0.0/8", zones(1000), {
+            "subnet_sizes": MIXED_SIZES,
+            "reserved_cidrs": [f"10.{octet}.0.0/16" for octet in range(0, 256, 16)],
+            "secondary_cidr_blocks": ["100.64.0.0/10"],
+        }),
+    ]
+    rows = []
+    for label, cidr, azs, options in cases:
+        plan = plan_subnets(cidr, azs, **options)
+        subnet_count = sum(len(subnets) for subnets in plan.values() if subnets)
+        rows.append((f"{label} ({subnet_count} subnets)", measure(lambda: plan_subnets(cidr, azs, **options))))
+    report("plan_subnets, fastest of 5 runs", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# Stand-in for the boto3 clients of util/aws.py, adding a fixed latency to every call in place of the round trip
+# to AWS, so benchmarks show how many calls are made and which of them overlap
+import threading
+import time
+
+import util.aws
+import util.aws_cache
+
+REGIONS = ["eu-west-1", "eu-west-2", "us-east-1"]
+
+
+class _Exceptions:
+    class NoSuchEntityException(Exception):
+        pass
+
+
+class FakeAws:
+    """
+    Serves EC2, STS and IAM calls from memory and counts them
+    """
+    def __init__(self, latency: float = 0.0, role_names=()) -> None:
+        """Constructor for the FakeAws class
+
+        :param latency: Seconds every call takes
+        :param role_names: Names of the IAM roles on the fake account
+        """
+        self.latency = latency
+        self.role_names = list(role_names)
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def install(self) -> "FakeAws":
+        """
+        Replaces the clients util.aws and util.aws_cache get from util.aws_clients with this fake
+        """
+        util.aws.get_client = self.get_client
+        util.aws_cache.get_client = self.get_client
+        return self
+
+    def get_client(self, service: str, region: str = None) -> "FakeClient":
+        return FakeClient(self, service, region)
+
+    def call(self, operation: str):
+        with self._lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+        time.sleep(self.latency)
+
+    def reset(self):
+        self.calls.clear()
+
+
+class FakeClient:
+    exceptions = _Exceptions
+
+    def __init__(self, aws: FakeAws, service: str, region: str) -> None:
+        self.aws = aws
+        self.service = service
+        self.region = region
+
+    def describe_regions(self):
+        self.aws.call("ec2.describe_regions")
+        return {"Regions": [{"RegionName": region} for region in REGIONS]}
+
+    def describe_availability_zones(self, Filters: list):
+        self.aws.call("ec2.describe_availability_zones")
+        return {"AvailabilityZones": [{"ZoneName": f"{self.region}{zone}"} for zone in "abc"]}
+
+    def get_caller_identity(self):
+        self.aws.call("sts.get_caller_identity")
+        return {"Account": "123456789012"}
+
+    def list_roles(self, PathPrefix: str = "/", MaxItems: int = 100):
+        self.aws.call("iam.list_roles")
+        return {"Roles": [{"RoleName": name, "Path": "/"} for name in self.aws.role_names[:MaxItems]]}
+
+    def get_paginator(self, operation: str) -> "_ListRolesPaginator":
+        if operation != "list_roles":
+            raise NotImplementedError(operation)
+        return _ListRolesPaginator(self)
+
+    def get_role(self, RoleName: str):
+        self.aws.call("iam.get_role")
+        if RoleName not in self.aws.role_names:
+            raise self.exceptions.NoSuchEntityException(RoleName)
+        return {"Role": {"RoleName": RoleName}}
+
+
+class _ListRolesPaginator:
+    """
+    Pages through the roles like the list_roles paginator, one call per page. IAM returns at most 1000 roles
+    per page.
+    """
+    def __init__(self, client: FakeClient) -> None:
+        self.client = client
+
+    def paginate(self, PathPrefix: str = "/", PaginationConfig: dict = None):
+        page_size = min((PaginationConfig or {}).get("PageSize", 100), 1000)
+        role_names = self.client.aws.role_names
+        for start in range(0, len(role_names), page_size):
+            self.client.aws.call("iam.list_roles")
+            yield {"Roles": [{"RoleName": name, "Path": "/"} for name in role_names[start:start + page_size]]}
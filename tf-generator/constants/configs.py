@@ -1,3 +1,42 @@
+import os
+
 # Has constants for config generation
-MAX_RECURSIONS = 5
 LINE_ENDINGS = "\n"
+
+# Upper bound on generation steps run concurrently by generate_tf_from_yaml
+MAX_GENERATION_WORKERS = 6
+
+# Upper bound on concurrent AWS lookups made while validating a config
+MAX_AWS_LOOKUP_WORKERS = 6
+
+# Settings for the shared boto3 clients in util/aws_clients.py
+AWS_MAX_POOL_CONNECTIONS = 10
+AWS_RETRY_MODE = "standard"
+AWS_MAX_ATTEMPTS = 5
+
+# Settings for the on-disk AWS catalog cache in util/aws_cache.py
+CATALOG_CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME", "~/.cache"), "container-accelerator")
+CATALOG_CACHE_MAX_ENTRIES = 256
+CATALOG_CACHE_TTLS = {
+    "regions": 7 * 24 * 60 * 60,
+    "availability_zones": 24 * 60 * 60,
+    "instance_type_architectures": 24 * 60 * 60
+}
+
+# Format version of exported catalog snapshots (see util/catalog_snapshot.py)
+CATALOG_SNAPSHOT_VERSION = 2
+
+# IAM role lookups: up to this many names are checked with get_role, more than that pages through list_roles
+IAM_DIRECT_LOOKUP_LIMIT = 5
+IAM_ROLES_PAGE_SIZE = 1000
+
+# Directory and file names generated terraform files are written to
+DEFAULT_OUTPUT_DIR = "./terraform-files"
+MAIN_FILE = "main.tf"
+OUTPUTS_FILE = "outputs.tf"
+
+# Per-step generation cache, one file per output directory. Kept out of the output directory so it never ends
+# up in the terraform module or the files uploaded by the pipelines. LEGACY_STEP_CACHE_FILE is the name it had
+# inside the output directory, removed when found.
+STEP_CACHE_DIR = os.path.join(CATALOG_CACHE_DIR, "steps")
+LEGACY_STEP_CACHE_FILE = ".tf-gen-cache.json"
@@ -13,3 +13,9 @@ VALID_EKS_VERSIONS = [
 VALID_INGRESS_TYPES = [
     "aws"
 ]
+
+# Node group architectures and the EKS AMI type used for each
+VALID_ARCHITECTURES = {
+    "x86_64": "AL2_x86_64",
+    "arm64": "AL2_ARM_64"
+}
@@ -0,0 +1,205 @@
+import glob
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import NamedTuple
+
+import yaml
+
+from constants.configs import MAX_AWS_LOOKUP_WORKERS
+from facade.tf_gen import generate_tf_from_yaml
+from util.aws import get_aws_availability_zones, get_aws_instance_types, get_aws_regions
+from util.aws_cache import configure_cache
+from util.catalog_snapshot import CatalogSnapshot
+from util.timing import span
+from util.yaml_validator import validate_yaml
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] (tf_gen - batch) %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+
+
+class BatchResult(NamedTuple):
+    config_file: str
+    output_dir: str
+    exit_code: int
+    duration: float
+
+
+def is_batch_target(path: str) -> bool:
+    """
+    Checks whether the config path given on the command line refers to several configs
+    :param path: Path from the command line
+    :return: True for a directory or glob pattern
+    """
+    return os.path.isdir(path) or any(char in path for char in "*?[")
+
+
+def find_config_files(path: str) -> list:
+    """
+    Resolves a directory or glob pattern to the config files it contains
+    :param path: Directory or glob pattern
+    :return: Sorted list of config file paths
+    """
+    if os.path.isdir(path):
+        files = glob.glob(os.path.join(path, "*.yml")) + glob.glob(os.path.join(path, "*.yaml"))
+    else:
+        files = [file for file in glob.glob(path) if os.path.isfile(file)]
+    return sorted(files)
+
+
+def run_config(config_file: str, output_dir: str, use_cache: bool = True, split_files: bool = False,
+               snapshot: CatalogSnapshot = None, validate_only: bool = False) -> int:
+    """
+    Loads, validates and generates the terraform files for a single config
+    :param config_file: Path to the config file
+    :param output_dir: Directory to write the terraform files to
+    :param use_cache: Whether unchanged generation steps may be served from the step cache
+    :param split_files: Whether to write one file per generation step instead of a single main.tf
+    :param snapshot: Optional catalog snapshot to validate against instead of AWS
+    :param validate_only: Whether to stop after validating the config
+    :return: Exit code, 0 on success, 1 if the file is missing, 2 if it is invalid, 3 if generation failed
+    """
+    try:
+        with span("load_config"), open(config_file, "r") as file:
+            config = yaml.safe_load(file)
+    except FileNotFoundError as e:
+        logger.error(f"yaml_safe_load - File Not found - {e}")
+        return 1
+
+    try:
+        with span("validate_config"):
+            validate_yaml(config, snapshot)
+    except ValueError as e:
+        logger.error(f"validate_yaml - Invalid configuration file provided - {e}")
+        return 2
+    if validate_only:
+        logger.info(f"validate_yaml - {config_file} is valid")
+        return 0
+
+    try:
+        with span("generate_config"):
+            generate_tf_from_yaml(config, output_dir, use_cache, split_files)
+    except Exception as e:
+        logger.error(f"generate_tf_from_yaml - Error caught - {e}")
+        return 3
+
+    return 0
+
+
+def generate_batch(config_files: list, output_root: str, workers: int = None,
+                   cache_dir: str = None, refresh: bool = False, offline: bool = False,
+                   split_files: bool = False) -> list:
+    """
+    Validates and generates several configs in a process pool, each into its own output directory
+    (output_root/<config file name>). Catalog lookups are fetched once per region up front so the workers
+    are served from the shared on-disk cache.
+    :param config_files: List of config file paths
+    :param output_root: Directory to create the per-config output directories in
+    :param workers: Number of worker processes, defaults to the number of CPUs
+    :param cache_dir: Directory of the AWS catalog cache
+    :param refresh: Whether cached lookups and generation steps were asked to be refreshed
+    :param offline: Whether the workers may only use cached catalog lookups
+    :param split_files: Whether to write one file per generation step instead of a single main.tf
+    :return: List of BatchResult, in the order of config_files
+    """
+    output_dirs = {}
+    for config_file in config_files:
+        name = os.path.splitext(os.path.basename(config_file))[0]
+        if name in output_dirs.values():
+            raise ValueError(f"Several config files are named {name}, output directories would clash")
+        output_dirs[config_file] = os.path.join(output_root, name)
+
+    _prefetch_catalogs(config_files)
+
+    results = {}
+    # Spawned workers do not inherit the parent's boto3 clients and their connections
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=configure_cache, initargs=(cache_dir, False, offline)) as executor:
+        futures = {
+            executor.submit(_timed_run_config, config_file, output_dirs[config_file], not refresh, split_files):
+                config_file
+            for config_file in config_files
+        }
+        for future in as_completed(futures):
+            config_file = futures[future]
+            try:
+                exit_code, duration = future.result()
+            except Exception as e:
+                logger.error(f"generate_batch - {config_file} - Worker failed - {e}")
+                exit_code, duration = 3, 0.0
+            results[config_file] = BatchResult(config_file, output_dirs[config_file], exit_code, duration)
+            status = "ok" if exit_code == 0 else f"failed (exit code {exit_code})"
+            logger.info(f"generate_batch - {config_file} {status} in {duration:.2f}s")
+
+    ordered = [results[config_file] for config_file in config_files]
+    failed = [result for result in ordered if result.exit_code != 0]
+    logger.info(f"generate_batch - {len(ordered) - len(failed)} of {len(ordered)} configs generated successfully")
+    for result in failed:
+        logger.error(f"generate_batch - Failed: {result.config_file} (exit code {result.exit_code})")
+    return ordered
+
+
+def validate_batch(config_files: list, snapshot: CatalogSnapshot) -> list:
+    """
+    Validates several configs without generating them. Validation is cheap next to generation (well under a
+    millisecond per config against a snapshot), so the configs are validated in turn instead of paying for
+    a process pool.
+    :param config_files: List of config file paths
+    :param snapshot: Optional catalog snapshot to validate against instead of AWS
+    :return: List of BatchResult (without output directory), in the order of config_files
+    """
+    results = []
+    for config_file in config_files:
+        exit_code, duration = _timed_run_config(config_file, None, False, False, snapshot, True)
+        results.append(BatchResult(config_file, None, exit_code, duration))
+    failed = [result for result in results if result.exit_code != 0]
+    logger.info(f"validate_batch - {len(results) - len(failed)} of {len(results)} configs are valid")
+    return results
+
+
+def _timed_run_config(config_file: str, output_dir: str, use_cache: bool, split_files: bool,
+                      snapshot: CatalogSnapshot = None, validate_only: bool = False) -> tuple:
+    start = time.perf_counter()
+    exit_code = run_config(config_file, output_dir, use_cache, split_files, snapshot, validate_only)
+    return exit_code, time.perf_counter() - start
+
+
+def find_config_regions(config_files: list) -> set:
+    """
+    Collects the AWS regions used by the given configs, skipping files that cannot be read
+    :param config_files: List of config file paths
+    :return: Set of AWS regions
+    """
+    regions = set()
+    for config_file in config_files:
+        try:
+            with open(config_file, "r") as file:
+                config = yaml.safe_load(file)
+            if isinstance(config, dict) and config.get("aws_region"):
+                regions.add(config["aws_region"])
+        except (OSError, yaml.YAMLError):
+            # Reported when the config itself is processed
+            continue
+    return regions
+
+
+def _prefetch_catalogs(config_files: list):
+    """
+    Fetches the catalog lookups for every region used by the configs once, populating the on-disk cache
+    :param config_files: List of config file paths
+    """
+    regions = find_config_regions(config_files)
+    lookups = [get_aws_regions, get_aws_availability_zones, get_aws_instance_types]
+    with ThreadPoolExecutor(max_workers=MAX_AWS_LOOKUP_WORKERS) as executor:
+        futures = [executor.submit(lookup, region) for region in sorted(regions) for lookup in lookups]
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                logger.warning(f"generate_batch - Catalog prefetch failed, workers will retry - {e}")
@@ -1,11 +1,21 @@
-import ipaddress
+import functools
+import glob
+import hashlib
+import json
 import logging
-import math
 import os
-
-from constants.defaults import DEFAULT_CIDR_BLOCK
-from util.aws import get_aws_availability_zones, get_aws_roles
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, NamedTuple
+
+from constants.configs import DEFAULT_OUTPUT_DIR, LEGACY_STEP_CACHE_FILE, MAIN_FILE, MAX_GENERATION_WORKERS, \
+    OUTPUTS_FILE, STEP_CACHE_DIR
+from constants.defaults import DEFAULT_CIDR_BLOCK, VALID_ARCHITECTURES
+from util.aws import find_aws_roles, get_aws_availability_zones
+from util.file_util import atomic_write, remove_if_exists, stream_if_changed, write_if_changed
+from util.subnet_planner import plan_subnets
+from util.tf_ast import Block, NestedBlock, Reference
 from util.tf_string_builder import TFStringBuilder
+from util.timing import span
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(
@@ -14,55 +24,191 @@ logging.basicConfig(
     datefmt="%Y-%m-%d %H:%M:%S"
 )
 
-_steps_registry = [
-    "_generate_tf_header",
-    "_generate_aws_provider",
-    "_generate_eks_modules",
-    "_generate_vpc_modules",
-    "_generate_ingress_controller_resources",
-    "_generate_iam_roles"
-]
 
+# Packages whose sources make up the generator fingerprint of the step cache. constants is included as
+# constants/defaults.py (VALID_ARCHITECTURES, DEFAULT_CIDR_BLOCK) feeds straight into the generated HCL.
+_FINGERPRINT_PACKAGES = ("constants", "facade", "util")
 
-def generate_tf_from_yaml(config: dict) -> str:
+
+class _Step(NamedTuple):
+    """
+    A generation step. inputs lists the config keys the step reads; the step only ever sees those keys.
+    file is the name of the step's own file when writing split output. Steps whose output also depends on live
+    AWS state the cache key cannot see are not cacheable and run every time.
+    """
+    name: str
+    func: Callable[[dict], list]
+    inputs: tuple
+    file: str
+    cacheable: bool = True
+
+
+def generate_tf_from_yaml(config: dict, output_dir: str = DEFAULT_OUTPUT_DIR, use_cache: bool = True,
+                          split_files: bool = False) -> None:
     """
     Main Generation Method Called from entrypoint with the configuration as a dictionary.
+    Steps are independent of each other, so they run concurrently (overlapping the AWS lookups some of them
+    make) and their blocks are reassembled in registry order to keep the output deterministic.
+    Steps whose declared config inputs are unchanged since the last run into output_dir are served from the
+    step cache, and files are only rewritten if their content changed.
     :param config: Dictionary of the configuration file
-    :return: String containing the output configuration data
+    :param output_dir: Directory to write the terraform files to
+    :param use_cache: Whether unchanged steps may be served from the step cache
+    :param split_files: Write one file per step plus outputs.tf, streamed to disk as each step finishes,
+                        instead of a single main.tf
     """
-    output_buffer = ""
+    mode = "split" if split_files else "single"
+    step_cache = _load_step_cache(output_dir, mode) if use_cache else {}
+    step_keys = {step.name: _step_key(step, config) for step in _steps_registry}
+    stale_steps = [step for step in _steps_registry if not _is_cached(step, step_cache, step_keys, output_dir)]
+
+    new_cache = {}
+    with ThreadPoolExecutor(max_workers=min(MAX_GENERATION_WORKERS, len(_steps_registry))) as executor:
+        futures = {
+            executor.submit(_run_step, step, config, output_dir if split_files else None): step
+            for step in stale_steps
+        }
+        for future in as_completed(futures):
+            step = futures[future]
+            new_cache[step.name] = {"key": step_keys[step.name], **future.result()}
     for step in _steps_registry:
-        logger.info(f"generate_tf_from_yaml - On Step: {step}")
-        output_buffer += eval(f"{step}(config)")  # Execute each step in the registry passing the dictionary to each
-    _output_to_tf_file(output_buffer, config["aws_region"])
+        if step.name not in new_cache:
+            new_cache[step.name] = step_cache[step.name]
+    new_cache = {step.name: new_cache[step.name] for step in _steps_registry}
+
+    stale_names = [step.name for step in stale_steps]
+    reused = [step.name for step in _steps_registry if step.name not in stale_names]
+    logger.info(f"generate_tf_from_yaml - Recomputed steps: {', '.join(stale_names) or 'none'}")
+    logger.info(f"generate_tf_from_yaml - Reused steps: {', '.join(reused) or 'none'}")
+
+    if split_files:
+        _output_to_tf_file("".join(entry["outputs"] for entry in new_cache.values()), config["aws_region"],
+                           output_dir, OUTPUTS_FILE)
+        # Definitions must not be duplicated across files of the same terraform module
+        remove_if_exists(os.path.join(output_dir, MAIN_FILE))
+    else:
+        output_string = "".join(entry["body"] + entry["outputs"] for entry in new_cache.values())
+        _output_to_tf_file(output_string, config["aws_region"], output_dir)
+        for file in {step.file for step in _steps_registry} | {OUTPUTS_FILE}:
+            remove_if_exists(os.path.join(output_dir, file))
+    _save_step_cache(output_dir, mode, new_cache)
+
+
+def _run_step(step: _Step, config: dict, output_dir: str = None) -> dict:
+    """
+    Run a single generation step against the subset of the config it declares. Output blocks are kept
+    apart from the rest so they can be gathered into their own file.
+    :param step: The step to run
+    :param config: Dictionary of the configuration file
+    :param output_dir: If given, the step's blocks are streamed straight into its own file in this directory
+    :return: Dictionary with the rendered output blocks, and the other blocks unless written to a file
+    """
+    logger.info(f"generate_tf_from_yaml - On Step: {step.name}")
+    with span("generate_step", step=step.name):
+        blocks = step.func(_step_inputs(step, config))
+    with span("render_step", step=step.name):
+        body = [block for block in blocks if block.type_ != "output"]
+        outputs = TFStringBuilder.render(block for block in blocks if block.type_ == "output")
+        if output_dir is None:
+            return {"body": TFStringBuilder.render(body), "outputs": outputs}
+
+        path = os.path.join(output_dir, step.file)
+        if not body:
+            remove_if_exists(path)
+        elif stream_if_changed(path, lambda file: TFStringBuilder.render(body, file)):
+            logger.info(f"generate_tf_from_yaml - Wrote {step.file}")
+        return {"outputs": outputs, "empty": not body}
+
+
+def _step_inputs(step: _Step, config: dict) -> dict:
+    return {key: config[key] for key in step.inputs if key in config}
+
+
+def _step_key(step: _Step, config: dict) -> str:
+    """
+    Content hash of everything a step's output depends on: the generator code and the step's config inputs
+    :param step: The step to hash
+    :param config: Dictionary of the configuration file
+    :return: Hex digest
+    """
+    inputs = json.dumps(_step_inputs(step, config), sort_keys=True, default=str)
+    return hashlib.sha256(f"{_generator_fingerprint()}|{step.name}|{inputs}".encode()).hexdigest()
+
+
+def _is_cached(step: _Step, step_cache: dict, step_keys: dict, output_dir: str) -> bool:
+    """
+    Checks whether a step can be served from the step cache. In split mode the step's file is its cached
+    output, so it has to still exist.
+    """
+    entry = step_cache.get(step.name)
+    if not step.cacheable or entry is None or entry["key"] != step_keys[step.name]:
+        return False
+    return "body" in entry or entry["empty"] or os.path.exists(os.path.join(output_dir, step.file))
+
+
+@functools.cache
+def _generator_fingerprint() -> str:
+    """
+    Hash of the generator sources, so cached step outputs are invalidated whenever the generation code changes.
+    Every module of the packages in _FINGERPRINT_PACKAGES is hashed rather than a hand-kept list of the modules
+    the steps import, which went stale as soon as a step started using a new helper.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    digest = hashlib.sha256()
+    for package in _FINGERPRINT_PACKAGES:
+        for module_file in sorted(glob.glob(os.path.join(root, package, "*.py"))):
+            digest.update(os.path.relpath(module_file, root).encode())
+            with open(module_file, "rb") as file:
+                digest.update(file.read())
+    return digest.hexdigest()
+
+
+def _step_cache_path(output_dir: str) -> str:
+    """
+    ->Internal method<-
+    :return: Path of the step cache of an output directory, outside of that directory
+    """
+    output_key = hashlib.sha256(os.path.abspath(output_dir).encode()).hexdigest()
+    return os.path.join(os.path.expanduser(STEP_CACHE_DIR), output_key + ".json")
 
 
-def _generate_tf_header(config: dict) -> str:
+def _load_step_cache(output_dir: str, mode: str) -> dict:
+    try:
+        with open(_step_cache_path(output_dir), "r") as file:
+            step_cache = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    # Entries written for the other output mode do not carry what this mode needs
+    return step_cache.get("steps", {}) if step_cache.get("mode") == mode else {}
+
+
+def _save_step_cache(output_dir: str, mode: str, step_cache: dict):
+    atomic_write(_step_cache_path(output_dir), json.dumps({"mode": mode, "steps": step_cache}))
+    remove_if_exists(os.path.join(output_dir, LEGACY_STEP_CACHE_FILE))
+
+
+def _generate_tf_header(config: dict) -> list:
     """
     Generates the terraform configuration object
     :param config: Dictionary of the configuration file
-    :return: String containing terraform configuration data
+    :return: List containing the terraform configuration block
     """
     header_args = {
-        "required_providers": (
-            {
-                "aws": {
-                    "source": "hashicorp/aws",
-                    "version": "~> 5.19.0"
-                }
-            },
-            "header"),
-        "backend \"s3\"": (
-            {
-                "bucket": config["bucket_name"],
-                "key": "state/terraform.state",
-                "region": config["aws_region"],
-                "encrypt": "true",
-                "dynamodb_table": config["dynamodb_table_name"]
-            },
-            "header")
+        "required_providers": NestedBlock({
+            "aws": {
+                "source": "hashicorp/aws",
+                "version": "~> 5.19.0"
+            }
+        }),
+        "backend \"s3\"": NestedBlock({
+            "bucket": config["bucket_name"],
+            "key": "state/terraform.state",
+            "region": config["aws_region"],
+            "encrypt": "true",
+            "dynamodb_table": config["dynamodb_table_name"]
+        })
     }
-    return TFStringBuilder.generate_tf_header(header_args)
+    return [Block.terraform(header_args)]
 
 
 def _generate_eks_modules(config):
@@ -72,8 +218,8 @@ def _generate_eks_modules(config):
     eks_config = {}
     eks_config["cluster_name"] = config["cluster_name"]
     eks_config["cluster_version"] = str(config["eks_version"]) if "eks_version" in config else "1.28"
-    eks_config["subnet_ids"] = ("module.vpc.private_subnets", "ref")
-    eks_config["vpc_id"] = ("module.vpc.vpc_id", "ref")
+    eks_config["subnet_ids"] = Reference("module.vpc.private_subnets")
+    eks_config["vpc_id"] = Reference("module.vpc.vpc_id")
     eks_config["tags"] = _get_tags(config)
     eks_config["cluster_endpoint_public_access"] = True
 
@@ -84,6 +230,7 @@ def _generate_eks_modules(config):
                 "max_size": group["max_size"],
                 "desired_capacity": group["desired_capacity"],
                 "instance_type": group["instance_type"],
+                "ami_type": VALID_ARCHITECTURES.get(group.get("architecture")),
                 "name": group["name"]
             }
             for group in config["node_groups"]
@@ -97,27 +244,27 @@ def _generate_eks_modules(config):
             }
         }
 
-    output_block = TFStringBuilder.generate_module("eks", source, version, eks_config)
-    output_block += TFStringBuilder.generate_output("eks_cluster_name", "module.eks.cluster_name", description="EKS Cluster Name")
-    output_block += TFStringBuilder.generate_output("eks_cluster_endpoint", "module.eks.cluster_endpoint", description="EKS Cluster Endpoint")
-
-    return output_block
+    return [
+        Block.module("eks", source, version, eks_config),
+        Block.output("eks_cluster_name", "module.eks.cluster_name", description="EKS Cluster Name"),
+        Block.output("eks_cluster_endpoint", "module.eks.cluster_endpoint", description="EKS Cluster Endpoint")
+    ]
 
 
 def _generate_ingress_controller_resources(config):
     match config["ingress_type"]:
         case "aws":
             # Resources are created through k8s API at later stage
-            return ""
+            return []
         case _:
-            return ""
+            return []
 
 
 def _generate_vpc_modules(config):
     """
     Method for generating a vpc object
     :param config: Dictionary representation of  config file
-    :return: Dictionary of the vpc's config options
+    :return: List of the vpc module and output blocks
     """
     source = "terraform-aws-modules/vpc/aws"
     version = "5.1.2"
@@ -126,10 +273,14 @@ def _generate_vpc_modules(config):
     vpc_config["name"] = f"vpc-{config['cluster_name']}"
     vpc_config["cidr"] = str(config["cidr_block"]) if "cidr_block" in config else DEFAULT_CIDR_BLOCK
     vpc_config["azs"] = config["availability_zones"] if "availability_zones" in config else \
-                        get_aws_availability_zones(config["aws_region"])
-    subnet_cidr = _generate_subnet_cidrs(vpc_config["cidr"], vpc_config["azs"])
-    vpc_config["private_subnets"] = subnet_cidr[::2]
-    vpc_config["public_subnets"] = subnet_cidr[1::2]
+                        list(get_aws_availability_zones(config["aws_region"]))
+    vpc_config["secondary_cidr_blocks"] = config.get("secondary_cidr_blocks")
+    subnets = plan_subnets(vpc_config["cidr"], vpc_config["azs"], config.get("subnet_sizes"),
+                           config.get("reserved_cidrs"), config.get("secondary_cidr_blocks"))
+    vpc_config["private_subnets"] = subnets["private"]
+    vpc_config["public_subnets"] = subnets["public"]
+    vpc_config["intra_subnets"] = subnets.get("intra")
+    vpc_config["database_subnets"] = subnets.get("database")
     vpc_config["enable_nat_gateway"] = True
 
     vpc_config["private_subnet_tags"] = {
@@ -140,53 +291,12 @@ def _generate_vpc_modules(config):
     }
     vpc_config["tags"] = _get_tags(config)
 
-    output_block = TFStringBuilder.generate_module("vpc", source, version, vpc_config)
-    output_block += TFStringBuilder.generate_output("vpc_id", "module.vpc.vpc_id", description="VPC ID")
-    output_block += TFStringBuilder.generate_output("private_subnets", "module.vpc.private_subnets", description="Private subnets")
-    output_block += TFStringBuilder.generate_output("public_subnets", "module.vpc.public_subnets", description="Public subnets")
-
-    return output_block
-
-
-def _generate_subnet_cidrs(cidr, azs):
-    subnets = []
-    network = ipaddress.ip_network(cidr)
-    availability_zones = azs
-
-    # Calculate number of Addresses to allocate to each block (rounded to nearest power of 2)
-    addresses_per_subnet = 2 ** math.floor(
-        (math.log(network.num_addresses / (2 * len(availability_zones))) / math.log(2)))
-
-    # Determine the minimum netmask to allocate that number of addresses
-    subnet_net_mask \
-        = int(32 - math.log2(addresses_per_subnet))
-
-    # Difference between new masks and old masks
-    num_modifiable_bits = int(subnet_net_mask - network.prefixlen)
-
-    # Convert the address to an integer for calculations of subnets
-    network_as_int = int(network.network_address)
-
-    for i in range(len(availability_zones)*2):
-
-        base_address = _generate_base_address(i, network, num_modifiable_bits,
-                                                       network_as_int)
-        cidr_block = f"{ipaddress.ip_address(base_address)}/{subnet_net_mask}"
-        subnets.append(cidr_block)
-
-    return subnets
-
-
-def _generate_base_address(sub_network_index, network, num_modifiable_bits, network_as_int):
-    """
-    :param sub_network_index: The index of which subnet is being generated
-    :param network: The IP network object for the VPC network
-    :param num_modifiable_bits: The number of modifiable bits available for subnet generation
-    :param network_as_int: The network address of the VPC as an integer
-    :return: The base address of the new subnet
-    """
-    return ((sub_network_index << (network.prefixlen - int(num_modifiable_bits))) |
-            network_as_int)
+    return [
+        Block.module("vpc", source, version, vpc_config),
+        Block.output("vpc_id", "module.vpc.vpc_id", description="VPC ID"),
+        Block.output("private_subnets", "module.vpc.private_subnets", description="Private subnets"),
+        Block.output("public_subnets", "module.vpc.public_subnets", description="Public subnets")
+    ]
 
 
 def _get_tags(config):
@@ -201,7 +311,7 @@ def _get_tags(config):
     return tags
 
 
-def _generate_iam_roles(config: dict) -> str:
+def _generate_iam_roles(config: dict) -> list:
     """
     Generate the required blocks for 2 IAM roles that can interact with the generated EKS cluster
     :param config: YAML Config dict
@@ -213,107 +323,124 @@ def _generate_iam_roles(config: dict) -> str:
     role_name_dev = config['ca_cluster_dev_role_name'] if config['ca_cluster_dev_role_name'] is not None else \
         "ca_cluster_dev"
     # Check if roles exist
-    admin_exists = False
-    dev_exists = False
-    roles = get_aws_roles(region=config["aws_region"])
-    for role in roles:
-        admin_exists |= (role["RoleName"] == role_name_admin)
-        dev_exists |= (role["RoleName"] == role_name_dev)
+    existing_roles = find_aws_roles({role_name_admin, role_name_dev}, region=config["aws_region"])
+    admin_exists = role_name_admin in existing_roles
+    dev_exists = role_name_dev in existing_roles
 
     # Generate the policy documents for Administrator, Developer, and Service account
-    output_block = TFStringBuilder.generate_data("aws_iam_policy_document", "cluster_admin_policy_doc", {
-        "statement": ({
-                          "actions": ["eks:*"],
-                          "resources": [("module.eks.cluster_arn", "ref")],
-                          "effect": "Allow",
-                      }, "header")
-    })
-    output_block += TFStringBuilder.generate_data("aws_iam_policy_document", "cluster_dev_policy_doc", {
-        "statement": ({
-                          "actions": ["eks:AccessKubernetesApi"],
-                          "resources": [("module.eks.cluster_arn", "ref")],
-                          "effect": "Allow",
-                      }, "header")
-    })
-    output_block += TFStringBuilder.generate_data("aws_iam_policy_document", "cluster_policy_doc_assume_role", {
-        "statement": ({
-                          "actions": ["sts:AssumeRole"],
-                          "effect": "Allow",
-                          "principals": ({
-                              "type": "AWS",
-                              "identifiers": ["*"]
-                          }, "header")
-                      }, "header")
-    })
-
-    # Generate the Policies for the roles
-    output_block += TFStringBuilder.generate_resource("aws_iam_policy", "ca_cluster_admin_policy", {
-        "name": "cluster-admin-policy",
-        "description": "All Access to Cluster",
-        "policy": ("data.aws_iam_policy_document.cluster_admin_policy_doc.json", "ref"),
-        "tags": _get_tags(config)
-    })
-    output_block += TFStringBuilder.generate_resource("aws_iam_policy", "ca_cluster_dev_policy", {
-        "name": "cluster-dev-policy",
-        "description": "Access to K8s CLI for Cluster",
-        "policy": ("data.aws_iam_policy_document.cluster_dev_policy_doc.json", "ref"),
-        "tags": _get_tags(config)
-    })
+    output_blocks = [
+        Block.data("aws_iam_policy_document", "cluster_admin_policy_doc", {
+            "statement": NestedBlock({
+                "actions": ["eks:*"],
+                "resources": [Reference("module.eks.cluster_arn")],
+                "effect": "Allow",
+            })
+        }),
+        Block.data("aws_iam_policy_document", "cluster_dev_policy_doc", {
+            "statement": NestedBlock({
+                "actions": ["eks:AccessKubernetesApi"],
+                "resources": [Reference("module.eks.cluster_arn")],
+                "effect": "Allow",
+            })
+        }),
+        Block.data("aws_iam_policy_document", "cluster_policy_doc_assume_role", {
+            "statement": NestedBlock({
+                "actions": ["sts:AssumeRole"],
+                "effect": "Allow",
+                "principals": NestedBlock({
+                    "type": "AWS",
+                    "identifiers": ["*"]
+                })
+            })
+        }),
+
+        # Generate the Policies for the roles
+        Block.resource("aws_iam_policy", "ca_cluster_admin_policy", {
+            "name": "cluster-admin-policy",
+            "description": "All Access to Cluster",
+            "policy": Reference("data.aws_iam_policy_document.cluster_admin_policy_doc.json"),
+            "tags": _get_tags(config)
+        }),
+        Block.resource("aws_iam_policy", "ca_cluster_dev_policy", {
+            "name": "cluster-dev-policy",
+            "description": "Access to K8s CLI for Cluster",
+            "policy": Reference("data.aws_iam_policy_document.cluster_dev_policy_doc.json"),
+            "tags": _get_tags(config)
+        })
+    ]
 
     # If either of the roles already exist, add the policy to the existing role, otherwise create a new role
     if not admin_exists:
-        output_block += TFStringBuilder.generate_resource("aws_iam_role", "ca_cluster_admin_role", {
+        output_blocks.append(Block.resource("aws_iam_role", "ca_cluster_admin_role", {
             "name": role_name_admin,
-            "managed_policy_arns": [("aws_iam_policy.ca_cluster_admin_policy.arn", "ref")],
-            "assume_role_policy": ("data.aws_iam_policy_document.cluster_policy_doc_assume_role.json", "ref"),
+            "managed_policy_arns": [Reference("aws_iam_policy.ca_cluster_admin_policy.arn")],
+            "assume_role_policy": Reference("data.aws_iam_policy_document.cluster_policy_doc_assume_role.json"),
             "tags": _get_tags(config)
-        })
+        }))
     else:
-        output_block += TFStringBuilder.generate_resource("aws_iam_policy_attachment",
-                                                    "ca_cluster_admin_role_attach", {
-                                                        "name": "cluster admin role",
-                                                        "roles": [role_name_admin],
-                                                        "policy_arn":
-                                                            ("aws_iam_policy.ca_cluster_admin_policy.arn", "ref")
-                                                    })
+        output_blocks.append(Block.resource("aws_iam_policy_attachment", "ca_cluster_admin_role_attach", {
+            "name": "cluster admin role",
+            "roles": [role_name_admin],
+            "policy_arn": Reference("aws_iam_policy.ca_cluster_admin_policy.arn")
+        }))
     if not dev_exists:
-        output_block += TFStringBuilder.generate_resource("aws_iam_role", "ca_cluster_dev_role", {
+        output_blocks.append(Block.resource("aws_iam_role", "ca_cluster_dev_role", {
             "name": role_name_dev,
-            "managed_policy_arns": [("aws_iam_policy.ca_cluster_dev_policy.arn", "ref")],
-            "assume_role_policy": ("data.aws_iam_policy_document.cluster_policy_doc_assume_role.json", "ref"),
+            "managed_policy_arns": [Reference("aws_iam_policy.ca_cluster_dev_policy.arn")],
+            "assume_role_policy": Reference("data.aws_iam_policy_document.cluster_policy_doc_assume_role.json"),
             "tags": _get_tags(config)
-        })
+        }))
     else:
-        output_block += TFStringBuilder.generate_resource("aws_iam_policy_attachment",
-                                                    "ca_cluster_dev_role_attach", {
-                                                        "name": "cluster dev role",
-                                                        "roles": [role_name_dev],
-                                                        "policy_arn":
-                                                            ("aws_iam_policy.ca_cluster_dev_policy.arn", "ref")
-                                                    })
-    
-    return output_block
-
-
-def _generate_aws_provider(config: dict) -> str:
+        output_blocks.append(Block.resource("aws_iam_policy_attachment", "ca_cluster_dev_role_attach", {
+            "name": "cluster dev role",
+            "roles": [role_name_dev],
+            "policy_arn": Reference("aws_iam_policy.ca_cluster_dev_policy.arn")
+        }))
+
+    return output_blocks
+
+
+def _generate_aws_provider(config: dict) -> list:
     """
     Generate the AWS Provider Block
     :param config: YAML Config dict
     :return: Block of Provider
     """
-    return TFStringBuilder.generate_provider("aws", {
+    return [Block.provider("aws", {
         "region": config['aws_region']
-    })
+    })]
 
 
-def _output_to_tf_file(output_string, region_name):
+def _output_to_tf_file(output_string, region_name, output_dir=DEFAULT_OUTPUT_DIR, file_name=MAIN_FILE):
     """
     Method for outputting the final string to a terraform file
     :param output_string: The string to output
     :param region_name: The region the infrastructure is deployed to
+    :param output_dir: The directory to write the file to
+    :param file_name: The name of the file to write
     """
-    logger.info("Writing output to file")
-    if not os.path.exists(f"./terraform-files"):
-        os.makedirs(f"./terraform-files")
-    with open(f"./terraform-files/main.tf", "w+") as file:
-        file.write(output_string)
+    if write_if_changed(os.path.join(output_dir, file_name), output_string):
+        logger.info(f"Writing output to {file_name}")
+    else:
+        logger.info(f"Output unchanged, {file_name} not rewritten")
+
+
+_TAG_INPUTS = ("resource_owner", "environment", "additional_tags")
+
+_steps_registry = [
+    _Step("_generate_tf_header", _generate_tf_header, ("bucket_name", "aws_region", "dynamodb_table_name"),
+          "versions.tf"),
+    _Step("_generate_aws_provider", _generate_aws_provider, ("aws_region",), "providers.tf"),
+    _Step("_generate_eks_modules", _generate_eks_modules,
+          ("cluster_name", "eks_version", "fargate", "node_groups", "cluster_namespaces", *_TAG_INPUTS), "eks.tf"),
+    _Step("_generate_vpc_modules", _generate_vpc_modules,
+          ("cluster_name", "cidr_block", "availability_zones", "aws_region", "subnet_sizes", "reserved_cidrs",
+           "secondary_cidr_blocks", *_TAG_INPUTS), "vpc.tf"),
+    _Step("_generate_ingress_controller_resources", _generate_ingress_controller_resources, ("ingress_type",),
+          "ingress.tf"),
+    _Step("_generate_iam_roles", _generate_iam_roles,
+          ("ca_cluster_admin_role_name", "ca_cluster_dev_role_name", "aws_region", *_TAG_INPUTS), "iam.tf",
+          # Which roles already exist is looked up in IAM on every run, roles can be created or deleted outside
+          # this tool at any time
+          cacheable=False)
+]
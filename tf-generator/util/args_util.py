@@ -1,6 +1,8 @@
 import argparse
 import logging
 
+from constants.configs import DEFAULT_OUTPUT_DIR
+
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(
@@ -16,5 +18,30 @@ def load_args():
     :return: The args object
     """
     parser = argparse.ArgumentParser(description="Terraform Generator")
-    parser.add_argument("config_file", help="Path to config file")
-    return parser.parse_args()
\ No newline at end of file
+    parser.add_argument("config_file",
+                        help="Path to config file, or a directory or glob pattern of config files for batch mode")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR,
+                        help="Directory to write terraform files to (one sub-directory per config in batch mode)")
+    parser.add_argument("--split-files", action="store_true",
+                        help="Write one file per generation step (versions.tf, eks.tf, ...) instead of main.tf")
+    parser.add_argument("--workers", type=int, help="Number of worker processes in batch mode")
+    parser.add_argument("--cache-dir", help="Directory for the AWS catalog cache")
+    cache_mode = parser.add_mutually_exclusive_group()
+    cache_mode.add_argument("--refresh-cache", action="store_true",
+                            help="Ignore cached AWS catalog lookups and generation steps and compute them again")
+    cache_mode.add_argument("--offline", action="store_true",
+                            help="Never call AWS: only use cached catalog lookups and skip the bucket and DynamoDB table "
+                                 "checks. Generation needs IAM, so combine it with --validate-only")
+    parser.add_argument("--snapshot",
+                        help="Validate against a catalog snapshot file instead of AWS (implies --validate-only)")
+    parser.add_argument("--validate-only", action="store_true", help="Only validate the config, do not generate")
+    parser.add_argument("--export-snapshot",
+                        help="Write a catalog snapshot of the regions used by the config(s) to this file and exit")
+    parser.add_argument("--snapshot-regions", nargs="+",
+                        help="Regions to include in the exported snapshot instead of those used by the config(s)")
+    parser.add_argument("--timings-file",
+                        help="Write how long each phase took to this file on exit (JSON for .json, else OpenMetrics)")
+    args = parser.parse_args()
+    if args.snapshot:
+        args.validate_only = True
+    return args
\ No newline at end of file
@@ -1,23 +1,49 @@
-import boto3
+from constants.configs import IAM_DIRECT_LOOKUP_LIMIT, IAM_ROLES_PAGE_SIZE
+from util.aws_cache import cached_lookup, is_offline
+from util.aws_clients import get_client
+from util.catalog import Catalog, InstanceTypeCatalog
+from util.timing import timed
 
 
-def get_aws_regions(region: str):
+@timed("aws.get_aws_regions")
+def get_aws_regions(region: str) -> Catalog:
     """
-    Returns list of AWS regions
-    :return: list of AWS regions
+    Returns the AWS regions
+    :return: Catalog of AWS regions
     """
-    ec2 = boto3.client("ec2", region_name=region)
-    regions = [region["RegionName"] for region in ec2.describe_regions()["Regions"]]
-    return regions
+    return Catalog(_describe_regions(region))
+
+
+@timed("aws.get_aws_availability_zones")
+def get_aws_availability_zones(region: str) -> Catalog:
+    """
+    Returns the AWS availability zones for a given region
+    :param region: AWS region
+    :return: Catalog of AWS availability zones, in AWS order
+    """
+    return Catalog(_describe_availability_zones(region))
 
 
-def get_aws_availability_zones(region: str):
+@timed("aws.get_aws_instance_types")
+def get_aws_instance_types(region: str) -> InstanceTypeCatalog:
     """
-    Returns list of AWS availability zones for a given region
+    Returns the AWS instance types offered in a given region
     :param region: AWS region
-    :return: list of AWS availability zones
+    :return: Catalog of AWS instance types, indexed by family, size and architecture
     """
-    ec2 = boto3.client("ec2", region_name=region)
+    return InstanceTypeCatalog(_describe_instance_types(region))
+
+
+@cached_lookup("regions")
+def _describe_regions(region: str) -> list:
+    ec2 = get_client("ec2", region)
+    regions = [region["RegionName"] for region in ec2.describe_regions()["Regions"]]
+    return regions
+
+
+@cached_lookup("availability_zones")
+def _describe_availability_zones(region: str) -> list:
+    ec2 = get_client("ec2", region)
     response = ec2.describe_availability_zones(Filters=[
         {
             'Name': 'region-name',
@@ -28,62 +54,110 @@ def get_aws_availability_zones(region: str):
     return zones
 
 
-def get_aws_instance_types(region: str):
+@cached_lookup("instance_type_architectures")
+def _describe_instance_types(region: str) -> dict:
     """
-    Returns list of AWS instance types
-    :return: list of AWS instance types
+    ->Internal method<-
+    Lists the instance types offered in the region of the client with their supported architectures
+    :return: Dictionary of instance type to list of architectures
     """
-    ec2 = boto3.client("ec2", region_name=region)
-    response = ec2.describe_instance_type_offerings(
-        LocationType='region',
-        Filters=[
-            {
-                'Name': 'location',
-                'Values': [region]
-            }
-        ]
-    )
-    types = [type["InstanceType"] for type in response["InstanceTypeOfferings"]]
-    return types
+    ec2 = get_client("ec2", region)
+    architectures = {}
+    for page in ec2.get_paginator("describe_instance_types").paginate():
+        for instance_type in page["InstanceTypes"]:
+            architectures[instance_type["InstanceType"]] = instance_type["ProcessorInfo"]["SupportedArchitectures"]
+    return architectures
 
 
+@timed("aws.get_bucket_names")
 def get_bucket_names(region: str) -> list:
     """
     Returns list of AWS S3 bucket names
     :return: List of AWS S3 bucket names 
     """
-    s3 = boto3.client("s3", region_name=region)
+    s3 = get_client("s3", region)
     return list(map(lambda bucket: bucket["Name"], s3.list_buckets()["Buckets"]))
 
 
+@timed("aws.get_dynamodb_tables")
 def get_dynamodb_tables(region: str) -> list:
     """
     Returns list of AWS DynamoDB Tables
     :return: List of AWS DynamoDB Tables
     """
-    dynamodb = boto3.client("dynamodb", region_name=region)
+    dynamodb = get_client("dynamodb", region)
 
     return dynamodb.list_tables()["TableNames"]
 
 
+@timed("aws.get_table_partition_key")
 def get_table_partition_key(table_name: str, region: str) -> str:
     """
     Gets the partition key of a given DynamoDB table
     :param table_name: The name of the DynamoDB Table
     :return: The partition key of the table
     """
-    dynamodb = boto3.client("dynamodb", region_name=region)
+    dynamodb = get_client("dynamodb", region)
     keys = filter(lambda key: (key["KeyType"] == "HASH"), dynamodb.describe_table(TableName=table_name)["Table"][
         "KeySchema"])
     key = list(map(lambda key: key["AttributeName"], keys))[0]
     return key
 
 
-def get_aws_roles(region: str, prefix: str = "/") -> dict:
+def iter_aws_roles(region: str, prefix: str = "/"):
+    """
+    Yields the roles that match the optional prefix, one page at a time so callers can stop early.
+    :param prefix: Optional prefix to search for
+    :return: Generator of roles on the account
+    """
+    iam = get_client("iam", region)
+    pages = iam.get_paginator("list_roles").paginate(
+        PathPrefix=prefix,
+        PaginationConfig={"PageSize": IAM_ROLES_PAGE_SIZE}
+    )
+    for page in pages:
+        yield from page["Roles"]
+
+
+@timed("aws.get_aws_roles")
+def get_aws_roles(region: str, prefix: str = "/") -> list:
     """
     Returns the list of roles that match the optional prefix.
     :param prefix: Optional prefix to search for
-    :return: Dictionary of roles on the account
+    :return: List of roles on the account
+    """
+    return list(iter_aws_roles(region, prefix))
+
+
+@timed("aws.find_aws_roles")
+def find_aws_roles(role_names, region: str) -> set:
+    """
+    Returns which of the given role names exist on the account. A handful of names are looked up directly,
+    otherwise the role list is paged through until every name has been found.
+    :param role_names: Iterable of role names to look for
+    :param region: AWS region
+    :return: Set of the role names that exist
     """
-    iam = boto3.client("iam", region_name=region)
-    return iam.list_roles(PathPrefix=prefix)["Roles"]
+    if is_offline():
+        raise ValueError("Offline mode: IAM roles cannot be looked up offline, generate without --offline "
+                         "or only validate with --validate-only")
+    wanted = set(role_names)
+    if len(wanted) <= IAM_DIRECT_LOOKUP_LIMIT:
+        iam = get_client("iam", region)
+        return {name for name in wanted if _role_exists(iam, name)}
+
+    found = set()
+    for role in iter_aws_roles(region):
+        if role["RoleName"] in wanted:
+            found.add(role["RoleName"])
+            if found == wanted:
+                break
+    return found
+
+
+def _role_exists(iam, role_name: str) -> bool:
+    try:
+        iam.get_role(RoleName=role_name)
+        return True
+    except iam.exceptions.NoSuchEntityException:
+        return False
@@ -0,0 +1,191 @@
+import functools
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from constants.configs import CATALOG_CACHE_DIR, CATALOG_CACHE_MAX_ENTRIES, CATALOG_CACHE_TTLS
+from util.aws_clients import get_client
+from util.file_util import atomic_write
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] (tf-generator) %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+
+
+class CatalogCache:
+    """
+    File-backed cache for AWS catalog lookups (regions, availability zones, instance types).
+    Entries are keyed by account, region and API, expire after a per-API TTL and the least recently used
+    entries are evicted once the cache holds more than max_entries.
+    """
+    def __init__(self, cache_dir: str, max_entries: int = CATALOG_CACHE_MAX_ENTRIES,
+                 refresh: bool = False, offline: bool = False) -> None:
+        """Constructor for the CatalogCache class
+
+        :param cache_dir: Directory to store cache entries in
+        :param max_entries: Maximum number of entries kept on disk
+        :param refresh: Ignore existing entries and always fetch (still storing the result)
+        :param offline: Never fetch, fail if an entry is missing (expired entries are still served). Lookups
+        outside the catalog check is_offline() themselves.
+        """
+        if refresh and offline:
+            raise ValueError("The catalog cache cannot be refreshed in offline mode")
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.refresh = refresh
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self._account = None
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    def get_or_fetch(self, api: str, region: str, fetch):
+        """
+        Returns the cached value for an API call, fetching and storing it on a miss
+        :param api: Name of the cached API, used for the key and TTL
+        :param region: AWS region of the call
+        :param fetch: Callable returning the fresh (JSON serialisable) value
+        :return: The cached or fetched value
+        """
+        key = f"{self._get_account(region)}/{region}/{api}"
+        if not self.refresh:
+            entry = self._memory.get(key) or self._read_entry(key)
+            if entry is not None and (self.offline or entry["expires"] > time.time()):
+                self._count(hit=True)
+                self._memory[key] = entry
+                return entry["value"]
+
+        if self.offline:
+            raise ValueError(f"Offline mode: no cached {api} for {region}, run once online to populate the cache")
+
+        self._count(hit=False)
+        value = fetch()
+        entry = {"key": key, "expires": time.time() + CATALOG_CACHE_TTLS[api], "value": value}
+        self._memory[key] = entry
+        self._write_entry(key, entry)
+        return value
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _get_account(self, region: str) -> str:
+        """
+        ->Internal method<-
+        Resolves the AWS account id once per process. The last resolved account is remembered on disk so
+        offline runs can key their lookups without calling STS.
+        """
+        # Lookups run from the validator's thread pool, resolve (and call STS) only once
+        with self._lock:
+            if self._account is None:
+                account_file = os.path.join(self.cache_dir, "account")
+                if self.offline:
+                    self._account = os.environ.get("AWS_ACCOUNT_ID") or _read_text(account_file) or "unknown"
+                else:
+                    self._account = get_client("sts", region).get_caller_identity()["Account"]
+                    atomic_write(account_file, self._account)
+            return self._account
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode()).hexdigest() + ".json")
+
+    def _read_entry(self, key: str):
+        """
+        ->Internal method<-
+        Reads an entry from disk, marking it as recently used. Returns None if it is missing or unreadable.
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, "r") as file:
+                entry = json.load(file)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("key") == key else None
+
+    def _write_entry(self, key: str, entry: dict):
+        """
+        ->Internal method<-
+        Atomically writes an entry to disk and evicts the least recently used entries over the size bound
+        """
+        try:
+            atomic_write(self._entry_path(key), json.dumps(entry))
+            self._evict()
+        except OSError as e:
+            logger.warning(f"CatalogCache - Failed to write cache entry {key} - {e}")
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.max_entries)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _read_text(path: str):
+    try:
+        with open(path, "r") as file:
+            return file.read().strip()
+    except OSError:
+        return None
+
+
+_cache = CatalogCache(os.path.expanduser(CATALOG_CACHE_DIR))
+
+
+def configure_cache(cache_dir: str = None, refresh: bool = False, offline: bool = False):
+    """
+    Replaces the process-wide catalog cache, should be called before any lookups are made
+    :param cache_dir: Directory to store cache entries in, defaults to CATALOG_CACHE_DIR
+    :param refresh: Ignore existing entries and always fetch
+    :param offline: Never fetch, fail if an entry is missing
+    """
+    global _cache
+    _cache = CatalogCache(os.path.expanduser(cache_dir or CATALOG_CACHE_DIR), refresh=refresh, offline=offline)
+
+
+def is_offline() -> bool:
+    """
+    :return: Whether the process-wide catalog cache is in offline mode, in which AWS must not be called at all
+    """
+    return _cache.offline
+
+
+def cache_stats() -> dict:
+    """
+    Returns the hit and miss counters of the process-wide catalog cache
+    :return: Dictionary with hits and misses
+    """
+    return {"hits": _cache.hits, "misses": _cache.misses}
+
+
+def cached_lookup(api: str):
+    """
+    Decorator caching a catalog lookup taking the region as its only argument
+    :param api: Name of the cached API, must have a TTL in CATALOG_CACHE_TTLS
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(region: str):
+            return _cache.get_or_fetch(api, region, lambda: func(region))
+        return wrapper
+    return decorator
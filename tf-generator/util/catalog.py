@@ -0,0 +1,109 @@
+# Indexed views of AWS catalog lookups, used for membership checks and "did you mean" suggestions
+import difflib
+from typing import Iterable
+
+
+class Catalog:
+    """
+    Ordered, immutable collection of catalog names (regions, availability zones) with constant time
+    membership checks
+    """
+    __slots__ = ("names", "_index")
+
+    def __init__(self, names: Iterable[str]) -> None:
+        """Constructor for the Catalog class
+
+        :param names: Names in catalog order
+        """
+        self.names = tuple(names)
+        self._index = frozenset(self.names)
+
+    def __contains__(self, name) -> bool:
+        return name in self._index
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def suggest(self, name: str, limit: int = 3) -> list:
+        """
+        Returns the catalog names closest to a name that is not in the catalog
+        :param name: The unknown name
+        :param limit: Maximum number of suggestions
+        :return: List of suggestions, best first
+        """
+        return difflib.get_close_matches(name, self.names, n=limit)
+
+
+class InstanceTypeCatalog(Catalog):
+    """
+    Catalog of the instance types offered in a region, indexed by family (t3), size (micro) and
+    supported architecture (x86_64, arm64)
+    """
+    __slots__ = ("architectures", "_families", "_sizes", "_by_architecture")
+
+    def __init__(self, architectures: dict) -> None:
+        """Constructor for the InstanceTypeCatalog class
+
+        :param architectures: Dictionary of instance type to list of supported architectures
+        """
+        super().__init__(sorted(architectures))
+        self.architectures = architectures
+        families, sizes, by_architecture = {}, {}, {}
+        for instance_type in self.names:
+            family, _, size = instance_type.partition(".")
+            families.setdefault(family, []).append(instance_type)
+            sizes.setdefault(size, []).append(instance_type)
+            for architecture in architectures[instance_type]:
+                by_architecture.setdefault(architecture, []).append(instance_type)
+        self._families = {family: frozenset(types) for family, types in families.items()}
+        self._sizes = {size: frozenset(types) for size, types in sizes.items()}
+        self._by_architecture = {arch: frozenset(types) for arch, types in by_architecture.items()}
+
+    def in_family(self, family: str) -> frozenset:
+        """
+        :param family: Instance family, i.e. m5
+        :return: The instance types of the family
+        """
+        return self._families.get(family, frozenset())
+
+    def with_size(self, size: str) -> frozenset:
+        """
+        :param size: Instance size, i.e. large
+        :return: The instance types of that size across families
+        """
+        return self._sizes.get(size, frozenset())
+
+    def with_architecture(self, architecture: str) -> frozenset:
+        """
+        :param architecture: Processor architecture, i.e. arm64
+        :return: The instance types supporting the architecture
+        """
+        return self._by_architecture.get(architecture, frozenset())
+
+    def supports(self, instance_type: str, architecture: str) -> bool:
+        """
+        :param instance_type: Instance type in the catalog
+        :param architecture: Processor architecture, i.e. arm64
+        :return: Whether the instance type supports the architecture
+        """
+        return instance_type in self.with_architecture(architecture)
+
+    def suggest(self, name: str, limit: int = 3, architecture: str = None) -> list:
+        """
+        Returns the instance types closest to a name that is not in the catalog. Types of the same family,
+        then of the same size, are preferred over the whole catalog.
+        :param name: The unknown instance type
+        :param limit: Maximum number of suggestions
+        :param architecture: Optional architecture the suggestions must support
+        :return: List of suggestions, best first
+        """
+        family, _, size = name.partition(".")
+        allowed = self.with_architecture(architecture) if architecture else self._index
+        for candidates in (self.in_family(family), self.with_size(size), self._index):
+            matches = difflib.get_close_matches(name, sorted(candidates & allowed), n=limit)
+            if matches:
+                return matches
+        return []
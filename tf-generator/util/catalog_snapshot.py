@@ -0,0 +1,96 @@
+import json
+import logging
+import time
+
+from constants.configs import CATALOG_SNAPSHOT_VERSION
+from util.aws import get_aws_availability_zones, get_aws_instance_types, get_aws_regions
+from util.catalog import Catalog, InstanceTypeCatalog
+from util.file_util import atomic_write
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] (tf-generator) %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+
+
+class CatalogSnapshot:
+    """
+    Exported copy of the AWS catalog (regions, and availability zones and instance types per region) used to
+    validate configs without AWS credentials or network access
+    """
+    def __init__(self, regions: list, catalogs: dict, created: float = None) -> None:
+        """Constructor for the CatalogSnapshot class
+
+        :param regions: List of every AWS region
+        :param catalogs: Dictionary of region to dictionary with the availability_zones list and the
+        instance_types dictionary of instance type to supported architectures
+        :param created: Unix time the snapshot was exported at
+        """
+        self.regions = regions
+        self.catalogs = catalogs
+        self.created = created
+
+    def lookup(self, api: str, region: str) -> Catalog:
+        """
+        Returns a catalog lookup from the snapshot, like the matching helper in util/aws.py
+        :param api: regions, availability_zones or instance_types
+        :param region: AWS region
+        :return: The snapshotted catalog
+        """
+        if api == "regions":
+            return Catalog(self.regions)
+        if region not in self.catalogs:
+            raise ValueError(f"The catalog snapshot has no entries for {region}, export it with --export-snapshot")
+        if api == "instance_types":
+            return InstanceTypeCatalog(self.catalogs[region][api])
+        return Catalog(self.catalogs[region][api])
+
+
+def export_snapshot(path: str, regions: list) -> CatalogSnapshot:
+    """
+    Fetches the catalog of the given regions (through the catalog cache) and writes it to a snapshot file
+    :param path: Path of the snapshot file
+    :param regions: AWS regions to include
+    :return: The exported snapshot
+    """
+    if not regions:
+        raise ValueError("At least one region is required to export a catalog snapshot")
+    all_regions = get_aws_regions(regions[0])
+    unknown = [region for region in regions if region not in all_regions]
+    if unknown:
+        raise ValueError(f"{', '.join(unknown)} is not a valid AWS region")
+
+    catalogs = {
+        region: {
+            "availability_zones": list(get_aws_availability_zones(region)),
+            "instance_types": get_aws_instance_types(region).architectures,
+        }
+        for region in sorted(set(regions))
+    }
+    snapshot = CatalogSnapshot(list(all_regions), catalogs, time.time())
+    atomic_write(path, json.dumps({
+        "version": CATALOG_SNAPSHOT_VERSION,
+        "created": snapshot.created,
+        "regions": snapshot.regions,
+        "catalogs": snapshot.catalogs,
+    }, indent=2, sort_keys=True))
+    logger.info(f"export_snapshot - Wrote catalog snapshot of {', '.join(catalogs)} to {path}")
+    return snapshot
+
+
+def load_snapshot(path: str) -> CatalogSnapshot:
+    """
+    Loads a snapshot file written by export_snapshot
+    :param path: Path of the snapshot file
+    :return: The snapshot
+    """
+    try:
+        with open(path, "r") as file:
+            data = json.load(file)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Could not read catalog snapshot {path} - {e}")
+    if not isinstance(data, dict) or data.get("version") != CATALOG_SNAPSHOT_VERSION:
+        raise ValueError(f"{path} is not a version {CATALOG_SNAPSHOT_VERSION} catalog snapshot, export it again")
+    return CatalogSnapshot(data["regions"], data["catalogs"], data.get("created"))
@@ -0,0 +1,174 @@
+# Declarative config schema, compiled once into validator closures that collect every error in one pass
+from typing import Any, Callable
+
+_MISSING = object()
+
+
+class ConfigValidationError(ValueError):
+    """
+    Raised when a config fails validation, carrying every error found
+    """
+    def __init__(self, errors: list) -> None:
+        """Constructor for the ConfigValidationError class
+
+        :param errors: List of error messages
+        """
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+_TYPE_NAMES = {
+    str: "string",
+    int: "number",
+    bool: "boolean",
+    list: "list",
+    dict: "map",
+}
+
+
+class Field:
+    """
+    Describes a single config field
+    """
+    __slots__ = ("type_", "required", "default", "choices", "coerce", "check", "items", "required_message")
+
+    def __init__(self, type_: type, required=False, default: Any = _MISSING, choices=None,
+                 coerce: Callable = None, check: Callable = None, items=None, required_message: str = None) -> None:
+        """Constructor for the Field class
+
+        :param type_: Expected python type of the value (after coercion)
+        :param required: True, or a callable taking the enclosing object and returning whether the field is required
+        :param default: Value applied when the field is missing or empty, a callable is called to create it
+        :param choices: Collection of allowed values
+        :param coerce: Callable converting the raw value before it is checked, i.e. str
+        :param check: Callable taking the value and returning an error message, or None if it is valid
+        :param items: Schema (for lists of maps) or type (for lists of scalars) of list items
+        :param required_message: Error message used instead of the generic one when the field is missing
+        """
+        self.type_ = type_
+        self.required = required
+        self.default = default
+        self.choices = choices
+        self.coerce = coerce
+        self.check = check
+        self.items = items
+        self.required_message = required_message
+
+
+class Schema:
+    """
+    Describes a map of fields, with optional checks across fields that run once every field is valid
+    """
+    __slots__ = ("fields", "checks")
+
+    def __init__(self, fields: dict, checks: tuple = ()) -> None:
+        """Constructor for the Schema class
+
+        :param fields: Dictionary of field name to Field
+        :param checks: Callables taking the object and returning a list of error messages
+        """
+        self.fields = fields
+        self.checks = checks
+
+
+def compile_schema(schema: Schema, context: str = None) -> Callable[[dict], list]:
+    """
+    Compiles a schema into a validator. The validator applies defaults to the object in place and returns
+    the list of every error found.
+    :param schema: The schema to compile
+    :param context: Name of the enclosing field, used in error messages of nested schemas
+    :return: Callable taking the object to validate and returning a list of error messages
+    """
+    validate_into = _compile_schema(schema, context)
+
+    def validate(obj: dict) -> list:
+        errors = []
+        validate_into(obj, errors)
+        return errors
+    return validate
+
+
+def _is_empty(value) -> bool:
+    return value is None or value == "" or value == []
+
+
+def _is_instance(value, expected_type: type) -> bool:
+    # bool is a subclass of int, but true is not a valid number in a config
+    return isinstance(value, expected_type) and not (expected_type is int and isinstance(value, bool))
+
+
+def _compile_schema(schema: Schema, context: str = None) -> Callable[[dict, list], None]:
+    field_validators = [_compile_field(name, field, context) for name, field in schema.fields.items()]
+    checks = schema.checks
+    where = f" in {context}" if context else ""
+
+    def validate(obj, errors: list):
+        if not isinstance(obj, dict):
+            errors.append(f"Expected a map{where}, got {obj!r}")
+            return
+        error_count = len(errors)
+        for validate_field in field_validators:
+            validate_field(obj, errors)
+        if len(errors) == error_count:
+            for check in checks:
+                errors.extend(check(obj))
+    return validate
+
+
+def _compile_field(name: str, field: Field, context: str = None) -> Callable[[dict, list], None]:
+    """
+    ->Internal method<-
+    Compiles a single field into a closure, resolving everything that does not depend on the value up front
+    """
+    where = f" in {context}" if context else ""
+    required_message = field.required_message or f"Field {name} is required{where}"
+    is_required = field.required if callable(field.required) else (lambda obj, required=field.required: required)
+    default = field.default
+    default_factory = default if callable(default) else None
+    expected_type = field.type_
+    type_name = _TYPE_NAMES.get(expected_type, expected_type.__name__)
+    coerce = field.coerce
+    choices = frozenset(field.choices) if field.choices is not None else None
+    check = field.check
+
+    validate_items = None
+    if isinstance(field.items, Schema):
+        validate_item = _compile_schema(field.items, name)
+
+        def validate_items(values, errors):
+            for item in values:
+                validate_item(item, errors)
+    elif field.items is not None:
+        item_type = field.items
+        item_type_name = _TYPE_NAMES.get(item_type, item_type.__name__)
+
+        def validate_items(values, errors):
+            for item in values:
+                if not _is_instance(item, item_type):
+                    errors.append(f"{item} is not a valid {item_type_name} in {name}")
+
+    def validate(obj: dict, errors: list):
+        value = obj.get(name)
+        if _is_empty(value):
+            if default is not _MISSING:
+                obj[name] = default_factory() if default_factory else default
+            elif is_required(obj):
+                errors.append(required_message)
+            return
+
+        if coerce is not None:
+            value = obj[name] = coerce(value)
+        if not _is_instance(value, expected_type):
+            errors.append(f"{value} is not a valid {type_name}{where}")
+            return
+        if choices is not None and value not in choices:
+            errors.append(f"{value} is not a valid {name}")
+            return
+        if check is not None:
+            message = check(value)
+            if message:
+                errors.append(message)
+                return
+        if validate_items is not None:
+            validate_items(value, errors)
+    return validate
@@ -0,0 +1,78 @@
+import filecmp
+import os
+import tempfile
+from typing import Callable, TextIO
+
+
+def atomic_write(path: str, content: str):
+    """
+    Writes a file by writing a temporary file next to it and renaming it into place, so readers never
+    see a partially written file
+    :param path: Path of the file to write
+    :param content: Content of the file
+    """
+    stream_if_changed(path, lambda file: file.write(content), only_if_changed=False)
+
+
+def write_if_changed(path: str, content: str) -> bool:
+    """
+    Atomically writes a file, unless it already has exactly the given content
+    :param path: Path of the file to write
+    :param content: Content of the file
+    :return: True if the file was written
+    """
+    try:
+        with open(path, "r") as file:
+            if file.read() == content:
+                return False
+    except OSError:
+        pass
+    atomic_write(path, content)
+    return True
+
+
+def stream_if_changed(path: str, write: Callable[[TextIO], object], only_if_changed: bool = True) -> bool:
+    """
+    Streams content into a temporary file next to path and renames it into place. Unless only_if_changed is
+    False, an existing file with identical content is left untouched and the temporary file discarded.
+    :param path: Path of the file to write
+    :param write: Callable writing the content to the file object it is given
+    :param only_if_changed: Whether to keep an existing file with identical content
+    :return: True if the file was replaced
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    try:
+        mode = os.stat(path).st_mode & 0o777
+        exists = True
+    except OSError:
+        mode = 0o644
+        exists = False
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as file:
+            write(file)
+        if only_if_changed and exists and filecmp.cmp(tmp_path, path, shallow=False):
+            os.remove(tmp_path)
+            return False
+        # mkstemp creates the file as 0600, keep the permissions of a normally written file
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+        return True
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def remove_if_exists(path: str) -> bool:
+    """
+    Removes a file if it exists
+    :param path: Path of the file to remove
+    :return: True if a file was removed
+    """
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
@@ -0,0 +1,163 @@
+import bisect
+import ipaddress
+from itertools import groupby
+
+SUBNET_TIERS = ("private", "public", "intra", "database")
+
+
+class IntervalIndex:
+    """
+    Sorted index of non-overlapping integer address ranges [start, end), rejecting overlapping inserts
+    in O(log n) per range
+    """
+    def __init__(self) -> None:
+        self._starts = []
+        self._ends = []
+        self._labels = []
+
+    def add(self, start: int, end: int, label: str):
+        """
+        Adds a range to the index
+        :param start: First address of the range
+        :param end: Address after the last address of the range
+        :param label: Description of the range used in error messages
+        """
+        position = bisect.bisect_right(self._starts, start)
+        if position > 0 and self._ends[position - 1] > start:
+            raise ValueError(f"{label} overlaps {self._labels[position - 1]}")
+        if position < len(self._starts) and self._starts[position] < end:
+            raise ValueError(f"{label} overlaps {self._labels[position]}")
+        self._starts.insert(position, start)
+        self._ends.insert(position, end)
+        self._labels.insert(position, label)
+
+
+def plan_subnets(cidr: str, azs: list, subnet_sizes: dict = None, reserved_cidrs: list = None,
+                 secondary_cidr_blocks: list = None) -> dict:
+    """
+    Plans one subnet per availability zone for each subnet tier (private, public, intra, database).
+    Without subnet_sizes, every subnet gets the same, largest power of two share of the VPC CIDR that fits
+    a private and a public subnet per zone. Subnets are carved largest first from the VPC CIDR and any
+    secondary CIDR blocks, skipping reserved ranges, using integer arithmetic on whole runs of equally sized
+    subnets at a time.
+    :param cidr: The VPC CIDR block
+    :param azs: List of availability zones
+    :param subnet_sizes: Optional dictionary of tier name to subnet prefix length
+    :param reserved_cidrs: Optional list of CIDR blocks no subnet may use
+    :param secondary_cidr_blocks: Optional list of additional CIDR blocks attached to the VPC
+    :return: Dictionary of tier name to list of subnet CIDR blocks, ordered like azs
+    """
+    network = ipaddress.ip_network(cidr)
+    max_prefixlen = network.max_prefixlen
+    if not azs:
+        raise ValueError("At least one availability zone is required to plan subnets")
+
+    # Address pools, checked for overlaps against each other
+    pools = IntervalIndex()
+    free = []
+    for pool_cidr in [cidr, *(secondary_cidr_blocks or [])]:
+        pool = ipaddress.ip_network(pool_cidr)
+        start = int(pool.network_address)
+        pools.add(start, start + pool.num_addresses, f"CIDR block {pool_cidr}")
+        free.append((start, start + pool.num_addresses))
+
+    for reserved_cidr in reserved_cidrs or []:
+        reserved = ipaddress.ip_network(reserved_cidr)
+        free = _subtract(free, int(reserved.network_address), int(reserved.network_address) + reserved.num_addresses)
+
+    sizes = _tier_sizes(network, len(azs), subnet_sizes)
+
+    # Zone-major request order keeps equally sized layouts interleaved (private, public, private, ...)
+    requests = [(tier, zone_index) for zone_index in range(len(azs)) for tier in sizes]
+    requests.sort(key=lambda request: sizes[request[0]])
+
+    allocated = {}
+    for prefixlen, group in groupby(requests, key=lambda request: sizes[request[0]]):
+        group = list(group)
+        starts, free = _allocate(free, 1 << (max_prefixlen - prefixlen), len(group))
+        if len(starts) < len(group):
+            raise ValueError(f"Not enough free address space in {cidr} for {len(group)} /{prefixlen} subnets")
+        for request, start in zip(group, starts):
+            allocated[request] = start
+
+    subnets = IntervalIndex()
+    plan = {}
+    for tier, prefixlen in sizes.items():
+        size = 1 << (max_prefixlen - prefixlen)
+        plan[tier] = []
+        for zone_index in range(len(azs)):
+            start = allocated[(tier, zone_index)]
+            block = f"{ipaddress.ip_address(start)}/{prefixlen}"
+            subnets.add(start, start + size, f"{tier} subnet {block}")
+            plan[tier].append(block)
+    return plan
+
+
+def _tier_sizes(network, zone_count: int, subnet_sizes: dict = None) -> dict:
+    """
+    ->Internal method<-
+    Resolves the prefix length of each tier, in SUBNET_TIERS order
+    """
+    if not subnet_sizes:
+        per_subnet = network.num_addresses // (2 * zone_count)
+        if per_subnet < 1:
+            raise ValueError(f"{network} is too small for {2 * zone_count} subnets")
+        prefixlen = network.max_prefixlen - (per_subnet.bit_length() - 1)
+        return {"private": prefixlen, "public": prefixlen}
+
+    unknown = set(subnet_sizes) - set(SUBNET_TIERS)
+    if unknown:
+        raise ValueError(f"Unknown subnet tiers {', '.join(sorted(unknown))}, valid tiers are {', '.join(SUBNET_TIERS)}")
+    for tier in ("private", "public"):
+        if tier not in subnet_sizes:
+            raise ValueError(f"subnet_sizes must include the {tier} tier")
+    sizes = {}
+    for tier in SUBNET_TIERS:
+        if tier in subnet_sizes:
+            prefixlen = subnet_sizes[tier]
+            if not isinstance(prefixlen, int) or isinstance(prefixlen, bool) or \
+                    not network.prefixlen <= prefixlen <= network.max_prefixlen:
+                raise ValueError(f"{prefixlen} is not a valid prefix length for {tier} subnets in {network}")
+            sizes[tier] = prefixlen
+    return sizes
+
+
+def _allocate(free: list, size: int, count: int) -> tuple:
+    """
+    ->Internal method<-
+    Takes up to count size-aligned blocks of size addresses from the free ranges, lowest addresses first
+    :return: Tuple of the list of block start addresses and the remaining free ranges
+    """
+    starts = []
+    remaining = []
+    for start, end in free:
+        needed = count - len(starts)
+        aligned = (start + size - 1) & ~(size - 1)
+        fitting = max(0, (end - aligned) // size)
+        taken = min(needed, fitting)
+        if taken == 0:
+            remaining.append((start, end))
+            continue
+        starts.extend(range(aligned, aligned + taken * size, size))
+        if start < aligned:
+            remaining.append((start, aligned))
+        if aligned + taken * size < end:
+            remaining.append((aligned + taken * size, end))
+    return starts, remaining
+
+
+def _subtract(free: list, start: int, end: int) -> list:
+    """
+    ->Internal method<-
+    Removes the range [start, end) from the free ranges
+    """
+    remaining = []
+    for free_start, free_end in free:
+        if free_end <= start or free_start >= end:
+            remaining.append((free_start, free_end))
+            continue
+        if free_start < start:
+            remaining.append((free_start, start))
+        if end < free_end:
+            remaining.append((end, free_end))
+    return remaining
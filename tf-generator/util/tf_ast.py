@@ -0,0 +1,192 @@
+# Typed node model for terraform blocks, built by the generation steps and rendered by TFStringBuilder
+class Node:
+    """
+    Base class for all nodes. Nodes are compact (__slots__), immutable by convention and compare by value,
+    so generated blocks can be diffed, hashed, cached and pickled.
+    """
+    __slots__ = ()
+
+    def _fields(self) -> tuple:
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and self._fields() == other._fields()
+
+    def __hash__(self) -> int:
+        return hash((type(self).__name__, self._fields()))
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{slot}={getattr(self, slot)!r}" for slot in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class Reference(Node):
+    """
+    A raw terraform expression, rendered without quotes (i.e. module.vpc.vpc_id)
+    """
+    __slots__ = ("expr",)
+
+    def __init__(self, expr: str) -> None:
+        self.expr = expr
+
+
+class Attribute(Node):
+    """
+    A single key/value entry inside a block or map
+    """
+    __slots__ = ("key", "value")
+
+    def __init__(self, key: str, value) -> None:
+        self.key = key
+        self.value = value
+
+
+class MapValue(Node):
+    """
+    A map attribute value, rendered as key = { ... }
+    """
+    __slots__ = ("attributes",)
+
+    def __init__(self, entries=(), _path: frozenset = frozenset()) -> None:
+        self.attributes = _to_attributes(entries, _path)
+
+
+class NestedBlock(Node):
+    """
+    A nested block, rendered as key { ... }
+    """
+    __slots__ = ("attributes",)
+
+    def __init__(self, entries=()) -> None:
+        self.attributes = _to_attributes(entries)
+
+
+class ListValue(Node):
+    """
+    A list attribute value, rendered as key = [ ... ]
+    """
+    __slots__ = ("items",)
+
+    def __init__(self, items=(), _path: frozenset = frozenset()) -> None:
+        self.items = tuple(to_node(item, _path) for item in items if item is not None)
+
+
+class Block(Node):
+    """
+    A top level block, i.e. module "eks" { ... }
+    """
+    __slots__ = ("type_", "labels", "attributes")
+
+    def __init__(self, type_: str, labels: tuple = (), entries=()) -> None:
+        self.type_ = type_
+        self.labels = tuple(labels)
+        self.attributes = _to_attributes(entries)
+
+    @classmethod
+    def module(cls, local_name: str, source: str, version: str, args: dict) -> "Block":
+        """
+        Build a module block
+        :param local_name: Module local name
+        :param source: Source of Module
+        :param version: Version of Module
+        :param args: Dictionary of arguments
+        :return: Block node
+        """
+        return cls("module", (local_name,), {"source": source, "version": version, **args})
+
+    @classmethod
+    def provider(cls, local_name: str, args: dict) -> "Block":
+        """
+        Build a provider block
+        :param local_name: Provider local name
+        :param args: Dictionary of arguments
+        :return: Block node
+        """
+        return cls("provider", (local_name,), args)
+
+    @classmethod
+    def resource(cls, type_: str, local_name: str, args: dict) -> "Block":
+        """
+        Build a resource block
+        :param type_: Resource type
+        :param local_name: Resource local name
+        :param args: Dictionary of arguments
+        :return: Block node
+        """
+        return cls("resource", (type_, local_name), args)
+
+    @classmethod
+    def data(cls, source: str, local_name: str, args: dict) -> "Block":
+        """
+        Build a data source block
+        :param source: Data Source
+        :param local_name: Data source local name
+        :param args: Dictionary of arguments
+        :return: Block node
+        """
+        return cls("data", (source, local_name), args)
+
+    @classmethod
+    def terraform(cls, args: dict) -> "Block":
+        """
+        Build the terraform settings block
+        :param args: Dictionary of arguments
+        :return: Block node
+        """
+        return cls("terraform", (), args)
+
+    @classmethod
+    def output(cls, local_name: str, value_ref: str, args: dict = None, description: str = None,
+               sensitive: bool = None, depends_on: list = None) -> "Block":
+        """
+        Build an output block
+        :param local_name: Local reusable name of output block
+        :param value_ref: Value's reference (passed as string)
+        :param args: Dictionary of arguments
+        :param description: Descriptive name of output
+        :param sensitive: Sensitive Flag
+        :param depends_on: Dependant IDs
+        :return: Block node
+        """
+        return cls("output", (local_name,), {
+            "value": Reference(value_ref),
+            "description": description,
+            "sensitive": sensitive,
+            "depends_on": depends_on,
+            **(args or {})
+        })
+
+
+_SCALAR_TYPES = (bool, str, int, float)
+
+
+def to_node(value, _path: frozenset = frozenset()):
+    """
+    Convert a plain python value into its node representation. Dicts become MapValues and lists become
+    ListValues, nodes and scalars are returned unchanged.
+    :param value: The value to convert
+    :param _path: ids of the containers currently being converted, used to reject cyclic values
+    :return: Node or scalar
+    """
+    if isinstance(value, Node) or type(value) in _SCALAR_TYPES:
+        return value
+    for scalar_type in _SCALAR_TYPES:
+        if isinstance(value, scalar_type):
+            # Normalise subclasses (i.e. str enums) so the renderer can dispatch on the exact type
+            return scalar_type(value)
+    if isinstance(value, (dict, list)):
+        if id(value) in _path:
+            raise ValueError("Cyclic value cannot be converted to terraform")
+        path = _path | {id(value)}
+        return MapValue(value, path) if isinstance(value, dict) else ListValue(value, path)
+    raise TypeError(f"Unsupported terraform value of type {type(value).__name__}")
+
+
+def _to_attributes(entries, _path: frozenset = frozenset()) -> tuple:
+    """
+    ->Internal method<-
+    Convert a mapping (or iterable of Attributes) into a tuple of Attributes, dropping None values
+    """
+    if isinstance(entries, dict):
+        return tuple(Attribute(key, to_node(value, _path)) for key, value in entries.items() if value is not None)
+    return tuple(entries)
@@ -1,5 +1,8 @@
-# Builds strings for module, resource, variable, and data blocks
-from constants.configs import MAX_RECURSIONS, LINE_ENDINGS
+# Renders typed terraform block nodes (see util/tf_ast.py) into TF config strings
+from typing import Callable, Iterable, TextIO
+
+from constants.configs import LINE_ENDINGS
+from util.tf_ast import Block, ListValue, MapValue, NestedBlock, Reference
 
 
 class TFStringBuilder:
@@ -7,198 +10,201 @@ class TFStringBuilder:
         super().__init__()
 
     @staticmethod
-    def generate_module(local_name: str, source: str, version: str, args: dict) -> str:
+    def render(blocks: Iterable[Block], stream: TextIO = None) -> str:
+        """
+        Render a sequence of blocks to TF config
+        :param blocks: Block nodes to render, in order
+        :param stream: Optional file-like object to write the blocks to instead of returning them
+        :return: TF Config string representation (empty if written to stream)
+        """
+        chunks = []
+        write = stream.write if stream is not None else chunks.append
+        for block in blocks:
+            TFStringBuilder._write_block(write, block)
+        return "".join(chunks)
+
+    @staticmethod
+    def generate_module(local_name: str, source: str, version: str, args: dict, stream: TextIO = None) -> str:
         """
         Generate the TF Config string for a module based on its type and arguments
         :param local_name: Module local name
         :param source: Source of Module
         :param version: Version of Module
         :param args: Dictionary of arguments
-        :return: TF Config string representation
-        """
-        output = f"module \"{local_name}" + "\" {" + LINE_ENDINGS
-        vars_ = {
-            "source": source,
-            "version": version,
-            **args
-        }
-        output += TFStringBuilder._dict_to_string(vars_, 1)
-        output += "}" + LINE_ENDINGS
-        return output
+        :param stream: Optional file-like object to write the block to instead of returning it
+        :return: TF Config string representation (empty if written to stream)
+        """
+        return TFStringBuilder.render([Block.module(local_name, source, version, args)], stream)
 
     @staticmethod
-    def generate_provider(local_name: str, args: dict) -> str:
+    def generate_provider(local_name: str, args: dict, stream: TextIO = None) -> str:
         """
         Generate the TF Config string for a provider based on its arguments
         :param local_name: Module local name
         :param args: Dictionary of arguments
-        :return: TF Config string representation
+        :param stream: Optional file-like object to write the block to instead of returning it
+        :return: TF Config string representation (empty if written to stream)
         """
-        output = f"provider \"{local_name}" + "\" {" + LINE_ENDINGS
-        vars_ = {
-            **args
-        }
-        output += TFStringBuilder._dict_to_string(vars_, 1)
-        output += "}" + LINE_ENDINGS
-        return output
+        return TFStringBuilder.render([Block.provider(local_name, args)], stream)
 
     @staticmethod
-    def generate_resource(type_: str, local_name: str, args: dict) -> str:
+    def generate_resource(type_: str, local_name: str, args: dict, stream: TextIO = None) -> str:
         """
         Generate the TF Config string for a resource based on its type and arguments
         :param type_: Module type
         :param local_name: Resource local name
         :param args: Dictionary of arguments
-        :return: TF Config string representation
+        :param stream: Optional file-like object to write the block to instead of returning it
+        :return: TF Config string representation (empty if written to stream)
         """
-        output = f"resource \"{type_}\" \"{local_name}\"" + " {" + LINE_ENDINGS
-        vars_ = {
-            **args
-        }
-        output += TFStringBuilder._dict_to_string(vars_, 1)
-        output += "}" + LINE_ENDINGS
-        return output
+        return TFStringBuilder.render([Block.resource(type_, local_name, args)], stream)
 
     @staticmethod
-    def generate_data(source: str, local_name: str, args: dict) -> str:
+    def generate_data(source: str, local_name: str, args: dict, stream: TextIO = None) -> str:
         """
         Generate the TF Config string for a data source based on its type and arguments
         :param source: Data Source
         :param local_name: Resource local name
         :param args: Dictionary of arguments
-        :return: TF Config string representation
+        :param stream: Optional file-like object to write the block to instead of returning it
+        :return: TF Config string representation (empty if written to stream)
         """
-        output = f"data \"{source}\" \"{local_name}\"" + " {" + LINE_ENDINGS
-        vars_ = {
-            **args
-        }
-        output += TFStringBuilder._dict_to_string(vars_, 1)
-        output += "}" + LINE_ENDINGS
-        return output
+        return TFStringBuilder.render([Block.data(source, local_name, args)], stream)
 
     @staticmethod
-    def generate_tf_header(args: dict) -> str:
+    def generate_tf_header(args: dict, stream: TextIO = None) -> str:
         """
         Generate the TF Config string for a Terraform header based on its arguments
         :param args: Dictionary of arguments
-        :return: TF Config string representation
+        :param stream: Optional file-like object to write the block to instead of returning it
+        :return: TF Config string representation (empty if written to stream)
         """
-        output = "terraform {" + LINE_ENDINGS
-        vars_ = {
-            **args
-        }
-        output += TFStringBuilder._dict_to_string(vars_, 1)
-        output += "}" + LINE_ENDINGS
-        return output
+        return TFStringBuilder.render([Block.terraform(args)], stream)
 
     @staticmethod
-    def _dict_to_string(dict_: dict, tab_level=1, recursion_count=1) -> str:
+    def generate_output(local_name: str, value_ref: str, args: dict = None, description: str = None,
+                        sensitive: bool = None, depends_on: list = None, stream: TextIO = None) -> str:
+        """
+        Generate the TF Config string for an Output Block based on its arguments
+        :param local_name: Local reusable name of output block
+        :param value_ref: Value's reference (passed as string)
+        :param args: Dictionary of arguments
+        :param description: Descriptive name of output
+        :param sensitive: Sensitive Flag
+        :param depends_on: Dependant IDs
+        :param stream: Optional file-like object to write the block to instead of returning it
+        :return: TF Config string representation (empty if written to stream)
+        """
+        block = Block.output(local_name, value_ref, args, description, sensitive, depends_on)
+        return TFStringBuilder.render([block], stream)
+
+    @staticmethod
+    def _write_block(write: Callable[[str], object], block: Block) -> None:
         """
         ->Internal method<-
-        Convert a dictionary recursively into a TF config string. (MAX RECURSIONS SET TO 5)
-        :param dict_: input dictionary
-        :param tab_level: number of levels deep to place the items
-        :param recursion_count: counter used to prevent infinite loops
-        :return: a string representation of the dictionary
-        """
-        if recursion_count > MAX_RECURSIONS:
-            raise Exception("Recursion Count Maximum Reached!")
-        max_key_len = 0
-        output = ""
-        for key in dict_:
-            if dict_[key] is not None:
-                max_key_len = max(max_key_len, len(key))
-
-        for key in dict_:
-            if dict_[key] is not None:
-                value = dict_[key]
-                output += f"{'  ' * tab_level}{key}{' ' * (max_key_len - len(key))} "
-                if isinstance(value, tuple):
-                    if value[1] == "ref":
-                        output += f"= {value[0]}{LINE_ENDINGS}"
-                    elif value[1] == "header":
-                        output += "{" + f"{LINE_ENDINGS}{TFStringBuilder._dict_to_string(value[0], tab_level + 1, recursion_count + 1)}"
-                        output += f"{'  ' * tab_level}" + "}" + LINE_ENDINGS
-                    continue
-                if isinstance(value, str):
-                    output += f"= \"{value}\"{LINE_ENDINGS}"
-                    continue
-                if isinstance(value, dict):
-                    output += "= {" + LINE_ENDINGS
-                    output += TFStringBuilder._dict_to_string(value, tab_level + 1, recursion_count + 1)
-                    output += f"{'  ' * tab_level}" + "}" + LINE_ENDINGS
-                    continue
-                if isinstance(value, list):
-                    output += "= [" + LINE_ENDINGS
-                    output += TFStringBuilder._list_to_string(value, tab_level + 1, recursion_count + 1)
-                    output += f"{'  ' * tab_level}]" + LINE_ENDINGS
-                    continue
-                if isinstance(value, bool):
-                    output += f"= {str(value).lower()}{LINE_ENDINGS}"
-                    continue
-                if isinstance(value, int) or isinstance(value, float) or value.isnumeric():
-                    output += f"= {value}{LINE_ENDINGS}"
-                    continue
-        return output
+        Write a single top level block
+        :param write: callable receiving each output chunk
+        :param block: the block to write
+        """
+        labels = "".join(f" \"{label}\"" for label in block.labels)
+        # Output blocks have historically been emitted without a space before the brace
+        separator = "" if block.type_ == "output" else " "
+        write(f"{block.type_}{labels}{separator}{{{LINE_ENDINGS}")
+        TFStringBuilder._write_attributes(write, block.attributes, "  ")
+        write("}" + LINE_ENDINGS)
 
     @staticmethod
-    def _list_to_string(list_: list, tab_level=1, recursion_count=1) -> str:
+    def _write_attributes(write: Callable[[str], object], attributes: tuple, indent: str) -> None:
         """
         ->Internal method<-
-        Convert List to a TF Config String
-        :param list_: input list for conversion
-        :param tab_level: number of levels deep to place the items
-        :param recursion_count: counter used to prevent infinite loops
-        :return: a string representation of the list
-        """
-        if recursion_count > MAX_RECURSIONS:
-            raise Exception("Recursion Count Maximum Reached!")
-        output = ""
-        for value in list_:
-            if value is not None:
-                if isinstance(value, tuple):
-                    if value[1] == "ref":
-                        output += f"{'  ' * tab_level}{value[0]},{LINE_ENDINGS}"
-                    continue
-                if isinstance(value, str):
-                    output += f"{'  ' * tab_level}\"{value}\",{LINE_ENDINGS}"
-                    continue
-                if isinstance(value, dict):
-                    output += f"{'  ' * tab_level}" + "{" + LINE_ENDINGS
-                    output += (TFStringBuilder._dict_to_string(value, tab_level + 1, recursion_count + 1))
-                    output += f"{'  ' * tab_level}" + "}," + LINE_ENDINGS
-                    continue
-                if isinstance(value, list):
-                    output += f"{'  ' * tab_level}[" + LINE_ENDINGS
-                    output += (TFStringBuilder._list_to_string(value, tab_level + 1, recursion_count + 1))
-                    output += f"{'  ' * tab_level}]," + LINE_ENDINGS
-                    continue
-                if isinstance(value, int) or isinstance(value, float) or value.isnumeric():
-                    output += f"{'  ' * tab_level}{value},{LINE_ENDINGS}"
-                    continue
-        return output
+        Write the attributes of a block or map, aligning the equals signs
+        :param write: callable receiving each output chunk
+        :param attributes: tuple of Attribute nodes
+        :param indent: indentation prefix of this level
+        """
+        max_key_len = max((len(attribute.key) for attribute in attributes), default=0)
+        for attribute in attributes:
+            write(f"{indent}{attribute.key}{' ' * (max_key_len - len(attribute.key))} ")
+            value = attribute.value
+            _ATTRIBUTE_WRITERS[type(value)](write, value, indent)
 
     @staticmethod
-    def generate_output(local_name: str, value_ref: str, args: dict = {}, description: str = None,
-                        sensitive: bool = None, depends_on: list = None) -> str:
+    def _write_items(write: Callable[[str], object], items: tuple, indent: str) -> None:
         """
-        Generate the TF Config string for an Output Block based on its arguments
-        :param local_name: Local reusable name of output block
-        :param value_ref: Value's reference (passed as string)
-        :param args: Dictionary of arguments
-        :param description: Descriptive name of output
-        :param sensitive: Sensitive Flag
-        :param depends_on: Dependant IDs
-        :return: TF Config string representation
-        """
-        output = f"output \"{local_name}\"" + "{" + LINE_ENDINGS
-        vars_ = {
-            "value": (value_ref, "ref"),
-            "description": description,
-            "sensitive": sensitive,
-            "depends_on": depends_on,
-            **args
-        }
-        output += TFStringBuilder._dict_to_string(vars_, 1)
-        output += "}" + LINE_ENDINGS
-        return output
+        ->Internal method<-
+        Write the items of a list
+        :param write: callable receiving each output chunk
+        :param items: tuple of values
+        :param indent: indentation prefix of this level
+        """
+        for value in items:
+            _ITEM_WRITERS[type(value)](write, value, indent)
+
+
+def _attribute_scalar(write, value, indent):
+    write(f"= {_SCALAR_FORMATTERS[type(value)](value)}{LINE_ENDINGS}")
+
+
+def _attribute_map(write, value, indent):
+    write("= {" + LINE_ENDINGS)
+    TFStringBuilder._write_attributes(write, value.attributes, indent + "  ")
+    write(indent + "}" + LINE_ENDINGS)
+
+
+def _attribute_nested_block(write, value, indent):
+    write("{" + LINE_ENDINGS)
+    TFStringBuilder._write_attributes(write, value.attributes, indent + "  ")
+    write(indent + "}" + LINE_ENDINGS)
+
+
+def _attribute_list(write, value, indent):
+    write("= [" + LINE_ENDINGS)
+    TFStringBuilder._write_items(write, value.items, indent + "  ")
+    write(indent + "]" + LINE_ENDINGS)
+
+
+def _item_scalar(write, value, indent):
+    write(f"{indent}{_SCALAR_FORMATTERS[type(value)](value)},{LINE_ENDINGS}")
+
+
+def _item_map(write, value, indent):
+    write(indent + "{" + LINE_ENDINGS)
+    TFStringBuilder._write_attributes(write, value.attributes, indent + "  ")
+    write(indent + "}," + LINE_ENDINGS)
+
+
+def _item_list(write, value, indent):
+    write(indent + "[" + LINE_ENDINGS)
+    TFStringBuilder._write_items(write, value.items, indent + "  ")
+    write(indent + "]," + LINE_ENDINGS)
+
+
+# Type-dispatch tables for the visitor. Node values are exact types, so bool never falls through to int.
+_SCALAR_FORMATTERS = {
+    str: lambda value: f"\"{value}\"",
+    bool: lambda value: str(value).lower(),
+    int: str,
+    float: str,
+    Reference: lambda value: value.expr,
+}
+
+_ATTRIBUTE_WRITERS = {
+    str: _attribute_scalar,
+    bool: _attribute_scalar,
+    int: _attribute_scalar,
+    float: _attribute_scalar,
+    Reference: _attribute_scalar,
+    MapValue: _attribute_map,
+    NestedBlock: _attribute_nested_block,
+    ListValue: _attribute_list,
+}
+
+_ITEM_WRITERS = {
+    str: _item_scalar,
+    bool: _item_scalar,
+    int: _item_scalar,
+    float: _item_scalar,
+    Reference: _item_scalar,
+    MapValue: _item_map,
+    ListValue: _item_list,
+}
@@ -0,0 +1,134 @@
+# Lightweight timing spans, exported as JSON or OpenMetrics text when the process exits
+# Each tool is deployed on its own, so tf-generator, k8s-primer and deployment-validator carry a copy of this
+# module. Keep the copies identical apart from TOOL_NAME.
+import atexit
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import NamedTuple
+
+TOOL_NAME = "tf-generator"
+
+
+class Span(NamedTuple):
+    name: str
+    labels: dict
+    start: float
+    duration: float
+    error: bool
+
+
+_lock = threading.Lock()
+_spans = []
+_origin = time.time() - time.perf_counter()
+
+
+@contextmanager
+def span(name: str, **labels):
+    """
+    Times the enclosed block and records it as a span
+    :param name: Name of the span, i.e. aws.get_aws_regions
+    :param labels: Labels further describing the span, i.e. step="_generate_vpc_module"
+    """
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        recorded = Span(name, labels, _origin + start, time.perf_counter() - start, error)
+        with _lock:
+            _spans.append(recorded)
+
+
+def timed(name: str = None):
+    """
+    Decorator recording every call of the decorated function as a span
+    :param name: Name of the span, defaults to the module and name of the function
+    """
+    def decorator(func):
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_spans() -> list:
+    """
+    :return: List of the spans recorded so far, in the order they ended
+    """
+    with _lock:
+        return list(_spans)
+
+
+def summarise(spans: list) -> list:
+    """
+    Aggregates spans by name and labels
+    :param spans: List of Span
+    :return: List of dictionaries with name, labels, count, errors, total and max seconds, slowest first
+    """
+    summary = {}
+    for recorded in spans:
+        key = (recorded.name, tuple(sorted(recorded.labels.items())))
+        entry = summary.setdefault(key, {"name": recorded.name, "labels": recorded.labels, "count": 0,
+                                         "errors": 0, "total": 0.0, "max": 0.0})
+        entry["count"] += 1
+        entry["errors"] += recorded.error
+        entry["total"] += recorded.duration
+        entry["max"] = max(entry["max"], recorded.duration)
+    return sorted(summary.values(), key=lambda entry: entry["total"], reverse=True)
+
+
+def to_json(spans: list) -> str:
+    """
+    :param spans: List of Span
+    :return: JSON document with every span and the per span summary
+    """
+    return json.dumps({
+        "tool": TOOL_NAME,
+        "spans": [recorded._asdict() for recorded in spans],
+        "summary": summarise(spans)
+    }, indent=2)
+
+
+def to_openmetrics(spans: list) -> str:
+    """
+    :param spans: List of Span
+    :return: OpenMetrics text exposition of the per span summary
+    """
+    lines = ["# TYPE span_seconds summary", "# UNIT span_seconds seconds",
+             "# HELP span_seconds Time spent in each span"]
+    max_lines = ["# TYPE span_max_seconds gauge", "# UNIT span_max_seconds seconds",
+                 "# HELP span_max_seconds Longest single occurrence of each span"]
+    for entry in summarise(spans):
+        labels = {"tool": TOOL_NAME, "span": entry["name"], **entry["labels"]}
+        label_text = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+        lines.append(f"span_seconds_count{{{label_text}}} {entry['count']}")
+        lines.append(f"span_seconds_sum{{{label_text}}} {entry['total']:.6f}")
+        max_lines.append(f"span_max_seconds{{{label_text}}} {entry['max']:.6f}")
+    return "\n".join(lines + max_lines + ["# EOF", ""])
+
+
+def export_at_exit(path: str):
+    """
+    Writes the recorded spans to a file when the process exits. Files ending in .json get the JSON export,
+    any other file the OpenMetrics text.
+    :param path: Path of the file to write
+    """
+    def export():
+        spans = get_spans()
+        with open(path, "w") as file:
+            file.write(to_json(spans) if path.endswith(".json") else to_openmetrics(spans))
+    atexit.register(export)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
@@ -1,150 +1,290 @@
 import ipaddress
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 
-from constants.defaults import DEFAULT_CIDR_BLOCK, VALID_EKS_VERSIONS, VALID_INGRESS_TYPES
+from constants.configs import MAX_AWS_LOOKUP_WORKERS
+from constants.defaults import DEFAULT_CIDR_BLOCK, VALID_ARCHITECTURES, VALID_EKS_VERSIONS, VALID_INGRESS_TYPES
 from util.aws import get_aws_regions, get_aws_availability_zones, get_aws_instance_types, get_dynamodb_tables, \
     get_bucket_names, get_table_partition_key
+from util.aws_cache import is_offline
+from util.catalog import InstanceTypeCatalog
+from util.catalog_snapshot import CatalogSnapshot
+from util.config_schema import ConfigValidationError, Field, Schema, compile_schema
+from util.subnet_planner import plan_subnets
 
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] (tf-generator) %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
 
-def validate_yaml(config: dict):
+
+def _check_cidr(value: str):
+    try:
+        ipaddress.ip_network(value)
+    except ValueError:
+        return f"{value} is not a valid CIDR block"
+    return None
+
+
+def _check_cidr_list(values: list):
+    for value in values:
+        message = _check_cidr(value) if isinstance(value, str) else f"{value} is not a valid CIDR block"
+        if message:
+            return message
+    return None
+
+
+def _check_node_group_sizes(group: dict) -> list:
+    errors = []
+    if group["min_size"] < 1 or group["min_size"] > group["max_size"]:
+        errors.append(f"min_size must be between 1 and max_size in node group {group['name']}")
+    desired_capacity = group.get("desired_capacity")
+    if desired_capacity is not None and not group["min_size"] <= desired_capacity <= group["max_size"]:
+        errors.append(f"desired_capacity must be between min_size and max_size in node group {group['name']}")
+    return errors
+
+
+NODE_GROUP_SCHEMA = Schema({
+    "name": Field(str, required=True),
+    "instance_type": Field(str, required=True),
+    "min_size": Field(int, required=True),
+    "max_size": Field(int, required=True),
+    "desired_capacity": Field(int),
+    "architecture": Field(str, choices=VALID_ARCHITECTURES),
+}, checks=(_check_node_group_sizes,))
+
+
+def _tag_text(value):
+    # Tag keys and values may be written as numbers or booleans in YAML, AWS stores every tag as a string.
+    # Lists and maps are left as they are, so the str type check reports them.
+    if isinstance(value, bool):
+        return str(value).lower()
+    if isinstance(value, (str, int, float)):
+        return str(value)
+    return value
+
+
+TAG_SCHEMA = Schema({
+    "key": Field(str, required=True, coerce=_tag_text, required_message="Additional tags must have a key and value"),
+    "value": Field(str, required=True, coerce=_tag_text,
+                   required_message="Additional tags must have a key and value"),
+})
+
+# Structural schema of config.yml. Checks that need AWS (regions, buckets, tables, zones, instance types)
+# run afterwards in _validate_aws_facts.
+CONFIG_SCHEMA = Schema({
+    # AWS configuration
+    "aws_region": Field(str, required=True),
+    "bucket_name": Field(str, required=True),
+    "dynamodb_table_name": Field(str, required=True),
+    # VPC and subnets
+    "cidr_block": Field(str, default=DEFAULT_CIDR_BLOCK, check=_check_cidr),
+    "availability_zones": Field(list, items=str),
+    "subnet_sizes": Field(dict),
+    "reserved_cidrs": Field(list, check=_check_cidr_list),
+    "secondary_cidr_blocks": Field(list, check=_check_cidr_list),
+    # EKS configuration
+    "cluster_name": Field(str, required=True),
+    "eks_version": Field(str, default="1.28", coerce=str, choices=VALID_EKS_VERSIONS),
+    "fargate": Field(bool, default=False),
+    "cluster_namespaces": Field(list, default=lambda: ["kube-system"], items=str),
+    "ingress_type": Field(str, default="aws", choices=VALID_INGRESS_TYPES),
+    "node_groups": Field(list, required=lambda config: not config.get("fargate"), items=NODE_GROUP_SCHEMA,
+                         required_message="Field node_groups is required in non-fargate clusters"),
+    # Public ingress
+    "enable_public_ingress": Field(bool, default=False),
+    "ingress_from_port": Field(int, default=80),
+    "ingress_to_port": Field(int, default=80),
+    "ingress_protocol": Field(str, default="tcp"),
+    # Tagging
+    "resource_owner": Field(str, required=True, required_message="Tag resource_owner is required"),
+    "environment": Field(str, default="dev"),
+    "additional_tags": Field(list, default=list, items=TAG_SCHEMA),
+    # Roles and permissions
+    "ca_cluster_admin_role_name": Field(str, default="ca_cluster_admin"),
+    "ca_cluster_dev_role_name": Field(str, default="ca_cluster_dev"),
+})
+
+_validate_structure = compile_schema(CONFIG_SCHEMA)
+
+
+def validate_structure(config: dict) -> list:
     """
-    Validates yaml config file against schema
+    Validates the config against CONFIG_SCHEMA without calling AWS, applying default values
     :param config: dictionary from yaml
+    :return: List of every structural error found
+    """
+    return _validate_structure(config)
+
+
+def validate_yaml(config: dict, snapshot: CatalogSnapshot = None):
+    """
+    Validates yaml config file against schema, then against AWS. Every error of a stage is reported at once.
+    :param config: dictionary from yaml
+    :param snapshot: Optional catalog snapshot to validate against instead of AWS. Account specific checks
+    (bucket, DynamoDB table) are skipped.
     :return: config with default values
     """
+    errors = validate_structure(config)
+    if errors:
+        raise ConfigValidationError(errors)
+
+    if snapshot is not None:
+        errors = _validate_aws_facts(config, _snapshot_facts(snapshot, config))
+        if errors:
+            raise ConfigValidationError(errors)
+        return
+
+    # All AWS lookups are independent of each other, so they are issued up front and the rules below only
+    # wait for the facts they need
+    executor = ThreadPoolExecutor(max_workers=MAX_AWS_LOOKUP_WORKERS)
+    try:
+        facts = _prefetch_aws_facts(executor, config)
+        errors = _validate_aws_facts(config, facts)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    if errors:
+        raise ConfigValidationError(errors)
+
+
+def _prefetch_aws_facts(executor: ThreadPoolExecutor, config: dict) -> dict:
+    """
+    Submits every AWS lookup needed to validate the config
+    :param executor: The executor to run the lookups on
+    :param config: dictionary from yaml
+    :return: Dictionary of lookup name to future
+    """
+    region = config["aws_region"]
+    lookups = {
+        "regions": (get_aws_regions, region),
+        "availability_zones": (get_aws_availability_zones, region),
+        "instance_types": (get_aws_instance_types, region),
+    }
+    # Only catalog lookups are cached, offline the account checks are skipped as they would need AWS
+    if not is_offline():
+        lookups["buckets"] = (get_bucket_names, region)
+        lookups["tables"] = (get_dynamodb_tables, region)
+        if config.get("dynamodb_table_name"):
+            # Speculative: if the table does not exist the failed lookup is never read
+            lookups["partition_key"] = (get_table_partition_key, config["dynamodb_table_name"], region)
+
+    return {
+        name: executor.submit(_timed_lookup, name, func, *args)
+        for name, (func, *args) in lookups.items()
+    }
+
+
+def _snapshot_facts(snapshot: CatalogSnapshot, config: dict) -> dict:
+    """
+    Resolves the catalog lookups needed to validate the config from a snapshot
+    :param snapshot: The catalog snapshot
+    :param config: dictionary from yaml
+    :return: Dictionary of lookup name to completed future, like _prefetch_aws_facts without account lookups
+    """
+    facts = {}
+    for name in ("regions", "availability_zones", "instance_types"):
+        future = Future()
+        try:
+            future.set_result(snapshot.lookup(name, config["aws_region"]))
+        except ValueError as e:
+            future.set_exception(e)
+        facts[name] = future
+    return facts
+
+
+def _timed_lookup(name: str, func, *args):
+    """
+    Runs a single AWS lookup and logs how long it took
+    :param name: Name of the lookup for logging
+    :param func: The lookup function
+    :return: The result of the lookup
+    """
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        logger.info(f"validate_yaml - Lookup {name} took {time.perf_counter() - start:.3f}s")
+
+
+def _validate_aws_facts(config: dict, facts: dict[str, Future]) -> list:
+    """
+    Validates a structurally valid config against the prefetched AWS facts, defaulting the availability zones
+    :param config: dictionary from yaml
+    :param facts: Dictionary of lookup name to future, as returned by _prefetch_aws_facts
+    :return: List of every error found
+    """
+    regions = facts["regions"].result()
+    if config["aws_region"] not in regions:
+        # Every other lookup is scoped to the region, so their results would only add noise
+        return [f"{config['aws_region']} is not a valid AWS region{_did_you_mean(regions.suggest(config['aws_region']))}"]
+
+    errors = []
+    if "buckets" in facts:
+        errors.extend(_validate_account_facts(config, facts))
+    else:
+        logger.warning("validate_yaml - Validating without calling AWS, bucket and DynamoDB table are not checked")
+
+    valid_zones = facts["availability_zones"].result()
+    if not config.get("availability_zones"):
+        config["availability_zones"] = list(valid_zones)
+    else:
+        errors.extend(f"{zone} is not a valid availability zone{_did_you_mean(valid_zones.suggest(zone))}"
+                      for zone in config["availability_zones"] if zone not in valid_zones)
 
-    # Validate AWS region
-    if "aws_region" not in config or config["aws_region"] == "":
-        raise ValueError("Field aws_region is required")
-    if config["aws_region"] not in get_aws_regions(region=config["aws_region"]):
-        raise ValueError(f"{config['aws_region']} is not a valid AWS region")
-    # Validate backend bucket name
-    if "bucket_name" not in config or config["bucket_name"] == "":
-        raise ValueError("Field bucket_name is required")
-    elif config["bucket_name"] not in get_bucket_names(region=config["aws_region"]):
-        raise ValueError(
+    try:
+        plan_subnets(config["cidr_block"], config["availability_zones"], config.get("subnet_sizes"),
+                     config.get("reserved_cidrs"), config.get("secondary_cidr_blocks"))
+    except (ValueError, TypeError) as e:
+        errors.append(f"Invalid subnet layout - {e}")
+
+    if config.get("node_groups"):
+        instance_types = facts["instance_types"].result()
+        for group in config["node_groups"]:
+            errors.extend(_validate_instance_type(group, instance_types))
+    return errors
+
+
+def _validate_instance_type(group: dict, instance_types: InstanceTypeCatalog) -> list:
+    """
+    ->Internal method<-
+    Validates the instance type of a node group against the instance types offered in the region,
+    and against the architecture of the node group if one is set
+    """
+    instance_type = group["instance_type"]
+    architecture = group.get("architecture")
+    if instance_type not in instance_types:
+        suggestions = instance_types.suggest(instance_type, architecture=architecture)
+        return [f"{instance_type} is not a valid instance type{_did_you_mean(suggestions)}"]
+    if architecture and not instance_types.supports(instance_type, architecture):
+        suggestions = instance_types.suggest(instance_type, architecture=architecture)
+        return [f"{instance_type} does not support the {architecture} architecture of node group "
+                f"{group['name']}{_did_you_mean(suggestions)}"]
+    return []
+
+
+def _did_you_mean(suggestions: list) -> str:
+    return f", did you mean {' or '.join(suggestions)}?" if suggestions else ""
+
+
+def _validate_account_facts(config: dict, facts: dict[str, Future]) -> list:
+    """
+    ->Internal method<-
+    Validates the account specific resources (state bucket and lock table) against the prefetched AWS facts
+    """
+    errors = []
+    if config["bucket_name"] not in facts["buckets"].result():
+        errors.append(
             f"{config['bucket_name']} is not a valid bucket name. You must create the bucket before running this program"
         )
 
-    # Validate dynamodb name
-    if "dynamodb_table_name" not in config or config["dynamodb_table_name"] == "":
-        raise ValueError("Field dynamodb_table_name is required")
-    elif config["dynamodb_table_name"] not in get_dynamodb_tables(region=config["aws_region"]):
-        raise ValueError(
+    if config["dynamodb_table_name"] not in facts["tables"].result():
+        errors.append(
             f"{config['dynamodb_table_name']} is not a valid DynamoDB name. You must create the table before running this program"
         )
-    elif get_table_partition_key(config["dynamodb_table_name"], region=config["aws_region"]) != "LockID":
-        raise KeyError(
+    elif facts["partition_key"].result() != "LockID":
+        errors.append(
             f"{config['dynamodb_table_name']} does not have the field 'LockID'. You must create this partition key in the table before running this program")
-    # Validate CIDR block
-    if "cidr_block" not in config or config["cidr_block"] == "":
-        config["cidr_block"] = DEFAULT_CIDR_BLOCK
-    try:
-        ipaddress.ip_network(config["cidr_block"])
-    except ValueError:
-        raise ValueError(f"{config['cidr_block']} is not a valid CIDR block")
-
-    # Validate availability zones
-    if "availability_zones" not in config or \
-            config["availability_zones"] == "" or \
-            config["availability_zones"] == []:
-        config["availability_zones"] = get_aws_availability_zones(config["aws_region"])
-    else:
-        valid_zones = get_aws_availability_zones(config["aws_region"])
-        for zone in config["availability_zones"]:
-            if zone not in valid_zones:
-                raise ValueError(f"{zone} is not a valid availability zone")
-
-    # Validate cluster name
-    if "cluster_name" not in config or config["cluster_name"] == "":
-        raise ValueError("Field cluster_name is required")
-
-    # Validate eks version
-    if "eks_version" not in config or config["eks_version"] == "":
-        config["eks_version"] = "1.28"
-    config["eks_version"] = str(config["eks_version"])
-    if config["eks_version"] not in VALID_EKS_VERSIONS:
-        raise ValueError(f"{config['eks_version']} is not a valid EKS version")
-
-    # Validate fargate flag
-    if "fargate" not in config or config["fargate"] == "":
-        config["fargate"] = False
-
-    # Validate cluster namespaces
-    if "cluster_namespaces" not in config or \
-            config["cluster_namespaces"] == "" or \
-            config["cluster_namespaces"] == []:
-        config["cluster_namespaces"] = ["kube-system"]
-
-    # Validate ingress type
-    if "ingress_type" not in config or config["ingress_type"] == "":
-        config["ingress_type"] = "alb"
-    if config["ingress_type"] not in VALID_INGRESS_TYPES:
-        raise ValueError(f"{config['ingress_type']} is not a valid ingress controller type")
-
-    # Check node groups exist
-    if config["fargate"] is False and \
-            "node_groups" not in config or \
-            config["node_groups"] == "" or \
-            config["node_groups"] == []:
-        raise ValueError("Field node_groups is required in non-fargate clusters")
-
-    valid_instance_types = get_aws_instance_types(config["aws_region"])
-    # Validate each node group
-    for group in config["node_groups"]:
-        if "name" not in group or group["name"] == "":
-            raise ValueError("Field name is required in node_groups")
-        if "instance_type" not in group or group["instance_type"] == "":
-            raise ValueError("Field instance_type is required in node_groups")
-        if "min_size" not in group or group["min_size"] == "":
-            raise ValueError("Field min_size is required in node_groups")
-        if "max_size" not in group or group["max_size"] == "":
-            raise ValueError("Field max_size is required in node_groups")
-
-        # Validate numbers
-        if not isinstance(group["min_size"], int):
-            raise ValueError(f"{group['min_size']} is not a valid number")
-        if not isinstance(group["max_size"], int):
-            raise ValueError(f"{group['max_size']} is not a valid number")
-
-        # Validate node group min and max sizes
-        if group["min_size"] < 1 or group["min_size"] > group["max_size"]:
-            raise ValueError(f"min_size must be between 1 and max_size")
-        if group["max_size"] < group["min_size"]:
-            raise ValueError(f"max_size must be greater than min_size")
-
-        # Validate desired capacity
-        if "desired_capacity" in group:
-            if not isinstance(group["desired_capacity"], int):
-                raise ValueError(f"{group['desired_capacity']} is not a valid number")
-            elif group["desired_capacity"] < group["min_size"] or \
-                    group["desired_capacity"] > group["max_size"]:
-                raise ValueError(f"desired_capacity must be between min_size and max_size")
-
-        # Validate instance type
-        if group["instance_type"] not in valid_instance_types:
-            raise ValueError(f"{group['instance_type']} is not a valid instance type")
-
-    # Validate public ingress
-    if "enable_public_ingress" not in config or config["enable_public_ingress"] == "":
-        config["enable_public_ingress"] = False
-    if "ingress_from_port" not in config or config["ingress_from_port"] == "":
-        config["ingress_from_port"] = 80
-    if not isinstance(config["ingress_from_port"], int):
-        raise ValueError(f"{config['ingress_from_port']} is not a valid ingress to port number")
-    if "ingress_to_port" not in config or config["ingress_to_port"] == "":
-        config["ingress_to_port"] = 80
-    if not isinstance(config["ingress_to_port"], int):
-        raise ValueError(f"{config['ingress_to_port']} is not a valid ingress from port number")
-    if "ingress_protocol" not in config or config["ingress_protocol"] == "":
-        config["ingress_protocol"] = "tcp"
-
-    # Validate tagging
-    if "resource_owner" not in config or config["resource_owner"] == "":
-        raise ValueError("Tag resource_owner is required")
-    if "environment" not in config or config["environment"] == "":
-        config["environment"] = "dev"
-
-    # Validate additional tags
-    for tag in config["additional_tags"]:
-        if "key" not in tag or tag["key"] == "" or "value" not in tag or tag["value"] == "":
-            raise ValueError("Additional tags must have a key and value")
+    return errors